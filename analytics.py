@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+"""
+@author:         stoberblog
+@detail:         Daily analytics over interval history, computed on
+                 NumPy column arrays rather than row by row, so reports
+                 and backfills can cover years of data and many devices
+                 in one call.
+
+                 The rise, fall, export fraction and maximum power follow
+                 the same definitions as dailyStats.py, which keeps them
+                 as intervals are captured. Energy is integrated from
+                 power with the trapezoidal rule.
+
+@created:     Sunday 18th October 2026
+@modified:    Sunday 18th October 2026
+@version:     0.1
+
+@change:
+
+@license:     MIT License
+
+                Copyright (c) 2017 stoberblog
+
+                Permission is hereby granted, free of charge, to any person obtaining a copy
+                of this software and associated documentation files (the "Software"), to deal
+                in the Software without restriction, including without limitation the rights
+                to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+                copies of the Software, and to permit persons to whom the Software is
+                furnished to do so, subject to the following conditions:
+
+                The above copyright notice and this permission notice shall be included in all
+                copies or substantial portions of the Software.
+
+                THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+                IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+                FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+                AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+                LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+                OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+                SOFTWARE.
+"""
+
+import sys
+import time
+
+import numpy
+
+import configuration
+import database
+
+
+"""
+@brief:        Loads columns of a table within a time range
+@detail:       Rows are streamed with database.iterRange(), a chunk at a
+               time, into one array per column. Missing values are NaN.
+@created:      18th Oct 2026
+@param:        Start epoch (inclusive)
+@param:        End epoch (inclusive)
+@param:        List of column names, "epoch" by default included
+@param:        Table name
+@return:       Dictionary of column name to float array, in epoch order
+"""
+def loadColumns(epochStart, epochEnd, fields=("pow_prod", "pow_feed"), table="interval"):
+    fields = ["epoch"]+[field for field in fields if field != "epoch"]
+    chunks = dict((field, []) for field in fields)
+    for chunk in database.iterRange(table, fields, epochStart, epochEnd, columns=True):
+        for field in fields:
+            chunks[field].append(numpy.array(chunk[field], dtype=float))
+    return dict((field, numpy.concatenate(chunks[field]) if chunks[field] else numpy.zeros(0)) for field in fields)
+
+"""
+@brief:        Lists local midnights covering a time range
+@detail:       Found with the local calendar, so days across a daylight
+               saving change are 23 or 25 hours long.
+@created:      18th Oct 2026
+@param:        First epoch
+@param:        Last epoch
+@return:       Array of epochs, from the midnight on or before the first
+               epoch to the midnight after the last
+"""
+def localMidnights(first, last):
+    day = time.localtime(first)
+    midnights = []
+    offset = 0
+    while True:
+        midnight = time.mktime((day.tm_year, day.tm_mon, day.tm_mday+offset, 0, 0, 0, 0, 0, -1))
+        midnights.append(midnight)
+        if midnight > last:
+            return numpy.array(midnights)
+        offset += 1
+
+"""
+@brief:        Sums a per-point array over each group
+@param:        Array
+@param:        Index of the first point of each group
+@return:       Array of sums, one per group
+"""
+def groupSum(values, starts):
+    return numpy.add.reduceat(values, starts) if len(starts) else numpy.zeros(0)
+
+"""
+@brief:        Integrates power over each group (trapezoidal rule)
+@detail:       Spans longer than maxGap seconds count as no energy,
+               rather than spreading the readings either side over the
+               gap.
+@param:        Epochs, sorted within each group
+@param:        Power (W)
+@param:        Index of the first point of each group
+@param:        Longest span to integrate over, None for no limit
+@return:       Array of energy (Wh), one per group
+"""
+def groupEnergy(epochs, power, starts, maxGap):
+    spans = numpy.zeros(len(epochs))
+    seconds = numpy.diff(epochs)
+    spans[:-1] = (power[1:]+power[:-1])/2*seconds
+    if maxGap is not None:
+        spans[:-1][seconds > maxGap] = 0.0
+    spans[starts[1:]-1] = 0.0   # Nothing between the last point of one group and the next
+    return groupSum(spans, starts)/3600
+
+"""
+@brief:        Computes the daily metrics of interval data
+@detail:       Intervals with production or feed in missing are left out,
+               as by dailyStats.py. Metrics are computed per local day,
+               and per device when devices are given, all at once.
+               Threshold metrics (POW_THERESHOLD):
+               rise:           epoch production first reached the threshold
+               fall:           epoch production last reached the threshold
+               exportFraction: fraction of intervals from rise up to fall
+                               with power exported (pow_feed below 0)
+               Energy metrics (Wh, trapezoidal rule):
+               energyProduced, energyExported, energyImported
+               selfConsumption:      energy produced and not exported
+               selfConsumptionRatio: selfConsumption/energyProduced
+@created:      18th Oct 2026
+@param:        Array of epochs
+@param:        Array of power produced (W)
+@param:        Array of power fed in (W, negative when exporting)
+@param:        Array of device keys (integers), None for a single device
+@param:        Production threshold, POW_THERESHOLD by default
+@param:        Longest span to integrate energy over (seconds), None for
+               no limit
+@return:       Dictionary of metric name to array, one element per
+               device and day, ordered by device then day. "device" and
+               "day" (epoch of local midnight) identify the element.
+               rise and fall are NaN, and exportFraction 0, for days
+               production never reached the threshold.
+"""
+def dailyMetrics(epochs, powProd, powFeed, devices=None, threshold=None, maxGap=None):
+    if threshold is None:
+        threshold = configuration.POW_THERESHOLD
+    epochs = numpy.asarray(epochs, dtype=float)
+    powProd = numpy.asarray(powProd, dtype=float)
+    powFeed = numpy.asarray(powFeed, dtype=float)
+    devices = numpy.zeros(len(epochs), dtype=int) if devices is None else numpy.asarray(devices)
+    valid = ~(numpy.isnan(epochs) | numpy.isnan(powProd) | numpy.isnan(powFeed))
+    epochs, powProd, powFeed, devices = epochs[valid], powProd[valid], powFeed[valid], devices[valid]
+    if len(epochs) == 0:
+        return dict((name, numpy.zeros(0)) for name in ["device", "day", "rise", "fall", "exportFraction", "powMax",
+                                                          "energyProduced", "energyExported", "energyImported",
+                                                          "selfConsumption", "selfConsumptionRatio"])
+    midnights = localMidnights(epochs.min(), epochs.max())
+    days = numpy.searchsorted(midnights, epochs, side="right")-1
+
+    order = numpy.lexsort((epochs, days, devices))
+    epochs, powProd, powFeed, devices, days = epochs[order], powProd[order], powFeed[order], devices[order], days[order]
+    count = len(epochs)
+    changed = numpy.ones(count, dtype=bool)
+    changed[1:] = (devices[1:] != devices[:-1]) | (days[1:] != days[:-1])
+    starts = numpy.flatnonzero(changed)
+    ends = numpy.append(starts[1:], count)
+
+    # Threshold crossings, as indexes into the sorted points
+    index = numpy.arange(count)
+    above = powProd >= threshold
+    riseIndex = numpy.minimum.reduceat(numpy.where(above, index, count), starts)
+    fallIndex = numpy.maximum.reduceat(numpy.where(above, index, -1), starts)
+    crossed = riseIndex < ends
+    riseIndex = numpy.where(crossed, riseIndex, 0)
+    fallIndex = numpy.where(crossed, fallIndex, 0)
+
+    exportCount = numpy.zeros(count+1)
+    numpy.cumsum(powFeed < 0, out=exportCount[1:])
+    intervals = fallIndex-riseIndex
+    exports = exportCount[fallIndex]-exportCount[riseIndex]
+
+    produced = groupEnergy(epochs, powProd, starts, maxGap)
+    exported = groupEnergy(epochs, numpy.maximum(-powFeed, 0.0), starts, maxGap)
+    imported = groupEnergy(epochs, numpy.maximum(powFeed, 0.0), starts, maxGap)
+    selfConsumption = numpy.maximum(produced-exported, 0.0)
+
+    with numpy.errstate(invalid="ignore", divide="ignore"):
+        return {"device":               devices[starts],
+                "day":                  midnights[days[starts]],
+                "rise":                 numpy.where(crossed, epochs[riseIndex], numpy.nan),
+                "fall":                 numpy.where(crossed, epochs[fallIndex], numpy.nan),
+                "exportFraction":       numpy.where(intervals > 0, exports/intervals, 0.0),
+                "powMax":               numpy.maximum.reduceat(powProd, starts),
+                "energyProduced":       produced,
+                "energyExported":       exported,
+                "energyImported":       imported,
+                "selfConsumption":      selfConsumption,
+                "selfConsumptionRatio": numpy.where(produced > 0, selfConsumption/produced, numpy.nan)}
+
+"""
+@brief:        Computes the daily metrics of the interval table
+@created:      18th Oct 2026
+@param:        Start epoch (inclusive)
+@param:        End epoch (inclusive)
+@param:        Longest span to integrate energy over (seconds), three
+               intervals by default
+@return:       See dailyMetrics()
+"""
+def dailyReport(epochStart, epochEnd, maxGap=None):
+    if maxGap is None:
+        maxGap = 3*configuration.SCHED_INTERVAL*60
+    columns = loadColumns(epochStart, epochEnd)
+    return dailyMetrics(columns["epoch"], columns["pow_prod"], columns["pow_feed"], maxGap=maxGap)
+
+
+"""
+@brief:        When run directly, print the daily metrics of the last
+               days (7, or as given)
+"""
+if __name__ == "__main__":
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 7
+    now = int(time.time())
+    database.openConnection()
+    report = dailyReport(now-days*86400, now)
+    database.closeConnection()
+    for i in range(len(report["day"])):
+        print("{} rise {} fall {} exported {:.0%} max {:.0f} W produced {:.0f} Wh exported {:.0f} Wh imported {:.0f} Wh self consumed {:.0f} Wh".format(
+              time.strftime("%Y-%m-%d", time.localtime(report["day"][i])),
+              time.strftime("%H:%M", time.localtime(report["rise"][i])) if not numpy.isnan(report["rise"][i]) else "-",
+              time.strftime("%H:%M", time.localtime(report["fall"][i])) if not numpy.isnan(report["fall"][i]) else "-",
+              report["exportFraction"][i], report["powMax"][i], report["energyProduced"][i],
+              report["energyExported"][i], report["energyImported"][i], report["selfConsumption"][i]))
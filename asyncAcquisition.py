@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+"""
+@author:         stoberblog
+@detail:         Polls many SunSpec devices at once using asyncio.
+                 Each device is read with the same point table, read
+                 plan and decoder as sunspecModbus.py, but every device
+                 is polled concurrently with its own timeout, so one
+                 slow or offline device does not hold up the rest.
+
+@created:     Sunday 18th October 2026
+@modified:    Sunday 18th October 2026
+@version:     0.1
+
+@change:
+
+@license:     MIT License
+
+                Copyright (c) 2017 stoberblog
+
+                Permission is hereby granted, free of charge, to any person obtaining a copy
+                of this software and associated documentation files (the "Software"), to deal
+                in the Software without restriction, including without limitation the rights
+                to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+                copies of the Software, and to permit persons to whom the Software is
+                furnished to do so, subject to the following conditions:
+
+                The above copyright notice and this permission notice shall be included in all
+                copies or substantial portions of the Software.
+
+                THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+                IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+                FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+                AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+                LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+                OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+                SOFTWARE.
+"""
+
+import asyncio
+import time
+
+import configuration
+import sunspecModbus
+
+
+"""
+@brief:        Modbus TCP connection to one address and port, shared by
+               every unit ID behind it
+@detail:       Opened on first use and kept open between polls. After a
+               failure or timeout it is closed, and reopened on the next
+               read.
+@created:      18th Oct 2026
+"""
+class AsyncModbusConnection:
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+        self.lock = asyncio.Lock()
+        self.transactionID = 0
+
+    """
+    @brief:        Closes the connection
+    @return:       none
+    """
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = None
+        self.writer = None
+
+    """
+    @brief:        Reads holding registers from one unit
+    @return:       (registers or None, error, exception)
+    """
+    async def read(self, unitID, address, count):
+        async with self.lock:
+            try:
+                if self.writer is None:
+                    self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+                self.transactionID = (self.transactionID+1) & 0xFFFF
+                self.writer.write(sunspecModbus.buildReadRequest(self.transactionID, unitID, address, count))
+                while True:
+                    header = await self.reader.readexactly(sunspecModbus.MBAP.size)
+                    transactionID, protocolID, length, unit = sunspecModbus.MBAP.unpack(header)
+                    if protocolID != 0 or length < 2:
+                        self.close()    # Not Modbus, so the stream position is unknown
+                        return (None, sunspecModbus.mbConst.MB_RECV_ERR, 0)
+                    pdu = await self.reader.readexactly(length-1)
+                    if transactionID == self.transactionID:
+                        break   # Anything else is a late reply to an abandoned request
+                return sunspecModbus.parseReadResponse(pdu, count)
+            except OSError:
+                self.close()
+                return (None, sunspecModbus.mbConst.MB_CONNECT_ERR, 0)
+            except asyncio.IncompleteReadError:
+                self.close()
+                return (None, sunspecModbus.mbConst.MB_RECV_ERR, 0)
+            except asyncio.CancelledError:
+                self.close()    # Timed out mid-request, so the stream position is unknown
+                raise
+
+
+"""
+@brief:        One device to poll
+@param:        Name used in records
+@param:        Device type ("inv" or "mtr")
+@param:        Connection the device is reached through
+@param:        Unit ID
+@created:      18th Oct 2026
+"""
+class Device:
+    def __init__(self, name, deviceType, connection, unitID):
+        self.name = name
+        self.type = deviceType
+        self.connection = connection
+        self.unitID = unitID
+        self.addresses = None
+        self.plan = None
+
+    """
+    @brief:        Reads registers from this device
+    @return:       Registers
+                   None when failed
+    """
+    async def read(self, address, count):
+        regs, error, excep = await self.connection.read(self.unitID, address, count)
+        return regs
+
+    """
+    @brief:        Runs sunspecModbus.walkModels() or checkIndex() on this
+                   device, see sunspecModbus.runReads()
+    @return:       The generator's result
+    """
+    async def runReads(self, reader):
+        try:
+            request = next(reader)
+            while True:
+                request = reader.send(await self.read(*request))
+        except StopIteration as stop:
+            return stop.value
+
+    """
+    @brief:        Finds the device's SunSpec models, using the same index
+                   cache file as sunspecModbus.py
+    @return:       none
+    """
+    async def loadIndex(self):
+        key = sunspecModbus.indexKey(self.connection.host, self.connection.port, self.unitID)
+        index = sunspecModbus.readIndexFile().get(key)
+        if index is not None and not await self.runReads(sunspecModbus.checkIndex(index)):
+            index = None
+        if index is None:
+            index = await self.runReads(sunspecModbus.walkModels())
+            if index is not None:
+                sunspecModbus.writeIndexFile(key, index)
+            else:
+                index = sunspecModbus.DEFAULT_INDEX[self.type]
+        self.addresses = sunspecModbus.resolveAddresses(self.type, index["models"])
+        self.plan = sunspecModbus.planReads(self.addresses)
+
+    """
+    @brief:        Reads and decodes every point of the device
+    @detail:       Scaled as by sunspecModbus.py, with the scale factors
+                   read in the same poll.
+    @return:       Dictionary of point name to value (None when missing)
+                   None when a read failed
+    """
+    async def poll(self):
+        if self.plan is None:
+            await self.loadIndex()
+        captured = []
+        for start, count in self.plan:
+            regs = await self.read(start, count)
+            if regs is None:
+                self.plan = None    # Check the model index again once it is back
+                return None
+            captured.append((start, count, sunspecModbus.packRegs(regs)))
+        values = sunspecModbus.decodeBlocks(self.addresses, captured)
+        return sunspecModbus.scaleValues(values, lambda value, scale: sunspecModbus.applyScale(value, values.get(scale)))
+
+
+"""
+@brief:        Builds devices from a list of device settings
+@detail:       Devices at the same address and port share a connection.
+@param:        List of dictionaries with "name", "type", "host", "port"
+               and "unit", as configuration.DEVICES
+@created:      18th Oct 2026
+@return:       List of Device
+"""
+def makeDevices(settings):
+    connections = {}
+    devices = []
+    for setting in settings:
+        place = (setting["host"], setting["port"])
+        if place not in connections:
+            connections[place] = AsyncModbusConnection(setting["host"], setting["port"])
+        devices.append(Device(setting["name"], setting["type"], connections[place], setting["unit"]))
+    return devices
+
+"""
+@brief:        Polls one device, giving up after DEVICE_TIMEOUT
+@return:       Record, {"device": name, "epoch": epoch, "values": values,
+               "error": None or message}
+"""
+async def pollDevice(device, epoch, limit):
+    async with limit:
+        try:
+            values = await asyncio.wait_for(device.poll(), configuration.DEVICE_TIMEOUT)
+        except asyncio.TimeoutError:
+            return {"device": device.name, "epoch": epoch, "values": None, "error": "timeout"}
+    if values is None:
+        return {"device": device.name, "epoch": epoch, "values": None, "error": "read failed"}
+    return {"device": device.name, "epoch": epoch, "values": values, "error": None}
+
+"""
+@brief:        Polls every device concurrently
+@param:        List of Device
+@param:        Timestamp for the records
+@param:        Semaphore limiting polls in flight
+@created:      18th Oct 2026
+@return:       List of records, one per device, in device order
+"""
+async def pollAll(devices, epoch, limit):
+    return await asyncio.gather(*[pollDevice(device, epoch, limit) for device in devices])
+
+"""
+@brief:        Polls every device once per interval until stopped
+@detail:       Polls start on interval boundaries of the wall clock, and
+               every record of a poll carries the boundary as its epoch.
+@param:        List of Device
+@param:        Seconds between polls
+@param:        Function called with the list of records of each poll
+@param:        Function returning True when polling should stop
+@created:      18th Oct 2026
+@return:       none
+"""
+async def run(devices, interval, handler, stopped=lambda: False):
+    limit = asyncio.Semaphore(configuration.DEVICE_CONCURRENCY)
+    while not stopped():
+        epoch = int(time.time()//interval*interval)
+        handler(await pollAll(devices, epoch, limit))
+        await asyncio.sleep(max(0, epoch+interval-time.time()))
+
+
+"""
+@brief:        When run directly, poll configuration.DEVICES and print
+               each record
+"""
+if __name__ == "__main__":
+    def printRecords(records):
+        for record in records:
+            print(str(record["epoch"])+" "+record["device"]+": "+str(record["error"] or record["values"]))
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(run(makeDevices(configuration.DEVICES), configuration.SCHED_INTERVAL*60, printRecords))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        loop.close()
@@ -35,7 +35,6 @@
                 
 @todo:        Database Library?
               Abort on not being able to connect to database
-              Use Configuartion log level
               Give more logging output
               Viewer session cleaner (viewerFunctions.py)
               
@@ -44,6 +43,11 @@
 
 import database
 import sunspecModbus
+import dailyStats
+import deadlineScheduler
+import eventLog
+import rollup
+import sampleBuffer
 import configuration
 
 
@@ -52,7 +56,7 @@ import configuration
 import threading
 import signal
 import math
-import datetime
+import os
 import sys
 import time # For sleep
 
@@ -69,8 +73,10 @@ class Device(Enum):
     METER        = 2
 
 
-stopAcquistion = False # Variable used to gracefully shutdown script
-sleeping = False # Variable used to gracefully shutdown script
+dayStats = dailyStats.DailyStats() # Statistics of the current day, see dailyData()
+dayStatsFile = os.path.join(os.path.dirname(os.path.abspath(__file__)), configuration.DAILY_STATE_FILE)
+stopAcquistion = threading.Event() # Set to gracefully shutdown script, also wakes the scheduler
+schedule = None # deadlineScheduler.DeadlineSchedule of the running scheduler
 
 """
 @brief:        When program told to terminate, do so gracefully
@@ -79,14 +85,12 @@ sleeping = False # Variable used to gracefully shutdown script
 """
 def sigterm_handler(_signo, _stack_frame):
     print("Termination signal recieved. Shutting down")
-    global stopAcquistion
-    global sleeping
-
-    stopAcquistion = True
-    while progThread.is_alive(): # Wait until thread has closed
-        if sleeping == True:
-            break
-        pass
+    stopAcquistion.set()
+    if schedule is not None:
+        print("Scheduler: "+schedule.summary())
+    progThread.join() # Wait until thread has closed, after a capture in progress
+    sunspecModbus.closeSession()
+    eventLog.stop()
     sys.exit()
 
 """
@@ -99,6 +103,12 @@ def configCheck():
     if not (configuration.SCHED_INTERVAL >= 1):
         print("Invalid Sampling (scheduler) interval")
         sys.exit()
+    if not (configuration.SAMPLE_INTERVAL == 0 or 0 < configuration.SAMPLE_INTERVAL < configuration.SCHED_INTERVAL*60):
+        print("Invalid Sampling interval for high rate mode")
+        sys.exit()
+    if database.backend is None:
+        print("Invalid database type")
+        sys.exit()
     if not (configuration.POW_THERESHOLD >= 1):
         print("Invalid Power Threshold")
         sys.exit()
@@ -119,76 +129,120 @@ def configCheck():
     '''
 """
 @brief:        Main loop that fires of capture at predefined intervals
+@detail:       Captures run on multiples of SCHED_INTERVAL, which are
+               also their epochs (unless EPOCH_INVERTER). Overruns are
+               handled as SCHED_OVERRUN, see deadlineScheduler.py.
 @created:      18th Feb 2017
 @return:       none 
 """
 def scheduler():
-    global sleeping
-    while stopAcquistion == False:
-        capture()
-        # The scheduler uses local time regardless of settings currently
-        sleeping = True
-        time.sleep(((configuration.SCHED_INTERVAL-1)- datetime.datetime.now().minute % configuration.SCHED_INTERVAL)*60+(60-datetime.datetime.now().second))
-        sleeping = False
+    global schedule
+    if configuration.SAMPLE_INTERVAL > 0:
+        highRateScheduler()
+        return
+    schedule = deadlineScheduler.DeadlineSchedule(configuration.SCHED_INTERVAL*60, configuration.SCHED_OVERRUN)
+    while True:
+        slot = schedule.wait(stopAcquistion)
+        if slot is None:
+            break
+        capture(int(slot))
         
 """
- @brief:     Structure to store captured data in
+@brief:        Main loop for high rate sampling
+@detail:       Samples every SAMPLE_INTERVAL seconds into a buffer, and
+               stores min/max/mean/last aggregates of each
+               SCHED_INTERVAL period once the period is over.
+@created:      18th Oct 2026
+@return:       none 
 """
-captureData=database.interval_struct()
+def highRateScheduler():
+    global schedule
+    period = configuration.SCHED_INTERVAL*60
+    samples = sampleBuffer.SampleBuffer()
+    schedule = deadlineScheduler.DeadlineSchedule(configuration.SAMPLE_INTERVAL, "skip") # A late sample is not worth taking
+    database.openConnection() # Kept open, as errors are logged on every sample
+    while True:
+        slot = schedule.wait(stopAcquistion)
+        if slot is None:
+            break
+        captureData = readSample(min(configuration.CAPTURE_BUDGET, configuration.SAMPLE_INTERVAL))
+        if configuration.EPOCH_INVERTER == False:
+            captureData.epoch = slot # The sample's grid point, sub-second for raw samples
+        if samples.count > 0 and captureData.epoch//period != samples.first.epoch//period:
+            storeCapture(samples.aggregate(int(samples.first.epoch//period*period)), time.time())
+            samples.clear()
+        samples.add(captureData)
+        if configuration.STORE_RAW_SAMPLES == True:
+            database.storeSamples([captureData])
+        database.flushWrites(False) # Write buffered rows once they are due
+    if samples.count > 0: # Keep the partial period on shutdown, without the end of day check
+        captureData = samples.aggregate(int(samples.first.epoch//period*period))
+        database.storeInterval(captureData)
+        dayStats.add(captureData.epoch, captureData.pow_prod, captureData.pow_feed)
+        dayStats.save(dayStatsFile)
+    database.closeConnection() # Also flushes buffered rows
 
 
 """
 @brief:        Aquires modbus data, and sends to database
 @created:      18th Feb 2017
+@param:        Epoch to store the sample with (the scheduled time), None
+               for the time read
 @return:       none 
 """
-def capture():
+def capture(epoch=None):
     database.openConnection()
+    captureData = readSample()
+    if epoch is not None and configuration.EPOCH_INVERTER == False:
+        captureData.epoch = epoch
+    storeCapture(captureData)
+    database.closeConnection()
+
+
+"""
+@brief:        Aquires one sample of modbus data
+@detail:       All reads share a time budget, so a hung inverter cannot
+               hold up the scheduler past the next interval.
+@created:      18th Feb 2017
+@param:        Seconds the sample may take, CAPTURE_BUDGET by default
+@return:       Sample (interval_struct)
+"""
+def readSample(budget=None):
+    captureData=database.interval_struct()
+    if budget is None:
+        budget = configuration.CAPTURE_BUDGET
+    sunspecModbus.startCapture(budget)
+    if configuration.MODBUS_BLOCK_READ == True:
+        # Read the register maps in a few requests; points are decoded from these
+        if configuration.METER_INSTALLED == True:
+            sunspecModbus.captureDevices(["inv", "mtr"])
+        else:
+            sunspecModbus.captureDevices(["inv"])
     #database.logMsg(ErrorLevels.NOTICE.value,"Woken up at "+str(datetime.datetime.now().strftime('%H:%M:%S on %d/%m/%Y')))
     #print("Woken up at "+datetime.datetime.now().strftime('%H:%M:%S on %d/%m/%Y')+", current epoch "+str(int(time.time())))
     if configuration.EPOCH_INVERTER == False:
         captureData.epoch = int(time.time()) # epoch Time in UTC. Based off computer time
     else:
-        captureData.epoch = sunspecModbus.inv_Time_s() # epoch Time in UTC. Based off inverter time
-        errorModbus(Device.INVERTER, "inv_Time_s()")
-    captureData.DC_s1_v = sunspecModbus.inv_DCs1Voltage_V() # (int32)
-    if errorModbus(Device.INVERTER, "inv_DCs1Voltage_V()"):
-        captureData.DC_s1_v = 0
-    captureData.DC_s2_v = sunspecModbus.inv_DCs2Voltage_V() # (int32)
-    if errorModbus(Device.INVERTER, "inv_DCs2Voltage_V()"):
-        captureData.DC_s2_v = 0
-    captureData.pf_inv = sunspecModbus.inv_ACPF_percent()/100 # (float)
-    if errorModbus(Device.INVERTER, "inv_ACPF_percent()") or math.isnan(captureData.pf_inv):
-        captureData.pf_inv = 0.0
-    captureData.pow_prod = sunspecModbus.inv_ACPower_W() # (float)
-    if errorModbus(Device.INVERTER, "inv_ACPower_W()") or math.isnan(captureData.pow_prod):
-        captureData.pow_prod = 0.0    
-    captureData.eng_tot_prod = sunspecModbus.inv_SiteEnergyTotal_Wh() # (uint64)
-    if errorModbus(Device.INVERTER, "inv_SiteEnergyTotal_Wh()"):
-        captureData.eng_tot_prod = 0
-    captureData.cur_inv = sunspecModbus.inv_ACCurrentTotal_A() # (float)
-    if errorModbus(Device.INVERTER, "inv_ACCurrentTotal_A()") or math.isnan(captureData.cur_inv):
-        captureData.cur_inv = 0.0
+        captureData.epoch = checkValue(sunspecModbus.inv_Time_s(), Device.INVERTER, "inv_Time_s()") # epoch Time in UTC. Based off inverter time
+        if captureData.epoch is None:
+            captureData.epoch = int(time.time())
+    # Points which could not be read are left as None, and stored as NULL
+    captureData.DC_s1_v = checkValue(sunspecModbus.inv_DCs1Voltage_V(), Device.INVERTER, "inv_DCs1Voltage_V()") # (int32)
+    captureData.DC_s2_v = checkValue(sunspecModbus.inv_DCs2Voltage_V(), Device.INVERTER, "inv_DCs2Voltage_V()") # (int32)
+    captureData.pf_inv = checkValue(sunspecModbus.inv_ACPF_percent(), Device.INVERTER, "inv_ACPF_percent()") # (float)
+    if captureData.pf_inv is not None:
+        captureData.pf_inv = captureData.pf_inv/100
+    captureData.pow_prod = checkValue(sunspecModbus.inv_ACPower_W(), Device.INVERTER, "inv_ACPower_W()") # (float)
+    captureData.eng_tot_prod = checkValue(sunspecModbus.inv_SiteEnergyTotal_Wh(), Device.INVERTER, "inv_SiteEnergyTotal_Wh()") # (uint64)
+    captureData.cur_inv = checkValue(sunspecModbus.inv_ACCurrentTotal_A(), Device.INVERTER, "inv_ACCurrentTotal_A()") # (float)
         
     if configuration.METER_INSTALLED == True:
-        captureData.pf_feed = sunspecModbus.mtr_ACPFAverage_cos() # (float)
-        if errorModbus(Device.METER, "mtr_ACPFAverage_cos()") or math.isnan(captureData.pf_feed):
-            captureData.pf_feed = 0.0
-        captureData.pow_feed = sunspecModbus.mtr_ACPowerTotal_W() # (float)
-        if errorModbus(Device.METER, "mtr_ACPowerTotal_W()") or math.isnan(captureData.pow_feed):
-            captureData.pow_feed = 0.0
-        captureData.eng_tot_out = sunspecModbus.mtr_ACTotalWattHoursExp_Wh() # (uint32)
-        if errorModbus(Device.METER, "mtr_ACTotalWattHoursExp_Wh()"):
-            captureData.eng_tot_out = 0
-        captureData.eng_tot_in = sunspecModbus.mtr_ACTotalWattHoursImp_Wh() # (uint32)
-        if errorModbus(Device.METER, "mtr_ACTotalWattHoursImp_Wh()"):
-            captureData.eng_tot_in = 0
-        captureData.volt_feed = sunspecModbus.mtr_ACVoltageAverage_V() # (float)
-        if errorModbus(Device.METER, "mtr_ACVoltageAverage_V()") or math.isnan(captureData.volt_feed):
-            captureData.volt_feed = 0.0
-        captureData.freq_feed = sunspecModbus.mtr_ACFreq_Hz() # (float)
-        if errorModbus(Device.METER, "mtr_ACFreq_Hz()") or math.isnan(captureData.freq_feed):
-            captureData.freq_feed = 50.0
+        captureData.pf_feed = checkValue(sunspecModbus.mtr_ACPFAverage_cos(), Device.METER, "mtr_ACPFAverage_cos()") # (float)
+        captureData.pow_feed = checkValue(sunspecModbus.mtr_ACPowerTotal_W(), Device.METER, "mtr_ACPowerTotal_W()") # (float)
+        captureData.eng_tot_out = checkValue(sunspecModbus.mtr_ACTotalWattHoursExp_Wh(), Device.METER, "mtr_ACTotalWattHoursExp_Wh()") # (uint32)
+        captureData.eng_tot_in = checkValue(sunspecModbus.mtr_ACTotalWattHoursImp_Wh(), Device.METER, "mtr_ACTotalWattHoursImp_Wh()") # (uint32)
+        captureData.volt_feed = checkValue(sunspecModbus.mtr_ACVoltageAverage_V(), Device.METER, "mtr_ACVoltageAverage_V()") # (float)
+        captureData.freq_feed = checkValue(sunspecModbus.mtr_ACFreq_Hz(), Device.METER, "mtr_ACFreq_Hz()") # (float)
     else:
         captureData.pf_feed = 0.0
         captureData.pow_feed = 0.0
@@ -196,28 +250,45 @@ def capture():
         captureData.eng_tot_in = 0
         captureData.volt_feed = 0.0
         captureData.freq_feed = 50.0
-        
+    for field in sampleBuffer.RANGE_FIELDS: # A single sample is its own range
+        setattr(captureData, field+"_min", getattr(captureData, field))
+        setattr(captureData, field+"_max", getattr(captureData, field))
     
+    sunspecModbus.endCapture()
+    sunspecModbus.releaseBlocks()
+    return captureData
+
+
+"""
+@brief:        Sends a sample, or aggregate of samples, to the database
+               and collects daily data at the end of the day
+@created:      18th Feb 2017
+@param:        Sample (interval_struct)
+@param:        Time to check for the end of day against, when it is not
+               the sample time (e.g. for an aggregate of a past period)
+@return:       none 
+"""
+def storeCapture(captureData, testTime=None):
     database.storeInterval(captureData)
+    dayStats.add(captureData.epoch, captureData.pow_prod, captureData.pow_feed)
+    dayStats.save(dayStatsFile)
     
     
     
-    if configuration.EPOCH_INVERTER == False:
-        testTime = captureData.epoch
-    else:
-        testTime =time.time()
+    if testTime is None:
+        if configuration.EPOCH_INVERTER == False:
+            testTime = captureData.epoch
+        else:
+            testTime =time.time()
     
     # Check to see if should sample/calculate Daily data
     # Maybe use an if statement to select if use computer time or inverter
     if (time.localtime(testTime).tm_wday) != (time.localtime(testTime+configuration.SCHED_INTERVAL*60+1).tm_wday):
         # We will be changing day soon, collect daily stats here!
-        database.logMsg(ErrorLevels.NOTICE.value,"Running Daily Sample")
+        eventLog.log(ErrorLevels.NOTICE.value,"Running Daily Sample")
         dailyData()
     
     #print("\t\tSeconds to next capture: "+str(((configuration.SCHED_INTERVAL-1)- datetime.datetime.now().minute % configuration.SCHED_INTERVAL)*60+(60-datetime.datetime.now().second) ))
-
-    database.closeConnection()
-    #print()
     
 
 """
@@ -235,48 +306,29 @@ def dailyData():
         captureDay.epoch = sunspecModbus.inv_Time_s() # epoch Time in UTC. Based off inverter time
         errorModbus(Device.INVERTER, "inv_Time_s()")
     
-    captureDay.eng_day = sunspecModbus.inv_SiteEnergyDay_Wh() # (float)
-    if errorModbus(Device.INVERTER, "inv_SiteEnergyDay_Wh()") or math.isnan(captureDay.eng_day):
+    captureDay.eng_day = checkValue(sunspecModbus.inv_SiteEnergyDay_Wh(), Device.INVERTER, "inv_SiteEnergyDay_Wh()") # (float)
+    if captureDay.eng_day is None:
         captureDay.eng_day = 0.0
         captureDay.error_flag = 1
-    captureDay.eng_tot_prod = sunspecModbus.inv_SiteEnergyTotal_Wh() # (uint32)
-    if errorModbus(Device.METER, "inv_SiteEnergyTotal_Wh()"):
+    captureDay.eng_tot_prod = checkValue(sunspecModbus.inv_SiteEnergyTotal_Wh(), Device.METER, "inv_SiteEnergyTotal_Wh()") # (uint32)
+    if captureDay.eng_tot_prod is None:
         captureDay.eng_tot_prod = 0
         captureDay.error_flag = 1
     if configuration.METER_INSTALLED == True:
-        captureDay.eng_tot_out = sunspecModbus.mtr_ACTotalWattHoursExp_Wh() # (uint32)
-        if errorModbus(Device.METER, "mtr_ACTotalWattHoursExp_Wh()"):
+        captureDay.eng_tot_out = checkValue(sunspecModbus.mtr_ACTotalWattHoursExp_Wh(), Device.METER, "mtr_ACTotalWattHoursExp_Wh()") # (uint32)
+        if captureDay.eng_tot_out is None:
             captureDay.eng_tot_out = 0
             captureDay.error_flag = 1
-        captureDay.eng_tot_in = sunspecModbus.mtr_ACTotalWattHoursImp_Wh() # (uint32)
-        if errorModbus(Device.METER, "mtr_ACTotalWattHoursImp_Wh()"):
+        captureDay.eng_tot_in = checkValue(sunspecModbus.mtr_ACTotalWattHoursImp_Wh(), Device.METER, "mtr_ACTotalWattHoursImp_Wh()") # (uint32)
+        if captureDay.eng_tot_in is None:
             captureDay.eng_tot_in = 0
             captureDay.error_flag = 1
     
-        powFeedArray = database.getPowEpoch(time.time()-86400, time.time())
-        thresholdIDrise=-1
-        thresholdIDfall=-1
-        captureDay.thres_rise_epoch=0
-        for i in range (0,len(powFeedArray)-1):
-            if (powFeedArray[i][3] >= configuration.POW_THERESHOLD):
-                captureDay.thres_rise_epoch=powFeedArray[i][1]
-                thresholdIDrise=i
-                break
-        captureDay.thres_fall_epoch=0
-        for i in range (0,len(powFeedArray)-1):
-            if (powFeedArray[len(powFeedArray)-1-i][3] >= configuration.POW_THERESHOLD):
-                captureDay.thres_fall_epoch=powFeedArray[len(powFeedArray)-1-i][1]
-                thresholdIDfall=len(powFeedArray)-1-i
-                break
-        
-        powFeedOutCount = 0
-        if thresholdIDrise >= 0 and thresholdIDfall >= 0:
-            for i in range(thresholdIDrise,thresholdIDfall):
-                if powFeedArray[i][2] < 0:
-                    powFeedOutCount = powFeedOutCount+1
-            captureDay.thres_perc_exp = float(powFeedOutCount/(thresholdIDfall-thresholdIDrise))
-    
-        captureDay.pow_max = database.maria_getMaxProduced(captureDay.thres_rise_epoch, captureDay.thres_fall_epoch) [0][0]
+        # Kept up to date by storeCapture()
+        captureDay.thres_rise_epoch = dayStats.rise or 0
+        captureDay.thres_fall_epoch = dayStats.fall or 0
+        captureDay.thres_perc_exp = dayStats.percentExported()
+        captureDay.pow_max = dayStats.powMax if dayStats.rise is not None else None
     
     else: # Not using smart meter, so set values to zero
             captureDay.eng_tot_out = 0
@@ -307,11 +359,27 @@ def errorModbus(modbusDevice, function):
     else:
         return(-1)
     if errorNo != 0:
-        database.logMsg(ErrorLevels.ERROR.value,str(function)+" failure")
+        eventLog.log(ErrorLevels.ERROR.value,str(function)+" failure")
         #print("** There was an error when using function "+str(function))
         return True
     else:
         return False
+
+"""
+@brief:        Checks a value read from a device
+@created:      18th Oct 2026
+@param:        Value read
+@param:        Device 
+@param:        String containing called function
+@return:        Value
+                None when the read failed or the value is missing (NaN)
+"""
+def checkValue(value, modbusDevice, function):
+    if errorModbus(modbusDevice, function) or value is None:
+        return None
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
         
         
         
@@ -321,10 +389,13 @@ def errorModbus(modbusDevice, function):
 """        
 print("Sunspec Modbus Script")
 configCheck()
+dayStats.load(dayStatsFile)
 progThread = threading.Thread(target=scheduler)
 signal.signal(signal.SIGTERM, sigterm_handler)
 signal.signal(signal.SIGINT, sigterm_handler)
 
 progThread.deamon = False
 progThread.start()
+rollup.start()
+eventLog.start()
     
\ No newline at end of file
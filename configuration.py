@@ -9,23 +9,74 @@ INVERTER_IP = "192.168.1.29"
 MODBUS_PORT = 7502
 METER_ADDR = 240
 MODBUS_TIMEOUT = 30 #seconds to wait before failure
+MODBUS_ATTEMPT_TIMEOUT = 5  # Seconds to wait for each attempt during a capture, failed attempts are retried
+MODBUS_RETRY_BASE = 0.5     # Seconds to wait before the first retry, doubling on each failure (with jitter)
+MODBUS_RETRY_MAX = 5        # Longest wait between retries, seconds
+MODBUS_HEDGE_DELAY = 0      # Seconds before a slow request is sent again when pipelining, 0 = off
+CAPTURE_BUDGET = 50         # Seconds a whole capture may take; points not read by then are stored as missing
+MODBUS_RECONNECT_MIN = 1    # Seconds to wait before the first reconnect attempt, doubling on each failure
+MODBUS_RECONNECT_MAX = 300  # Longest wait between reconnect attempts, seconds
+MODBUS_BLOCK_READ = True    # True = read register maps in a few large requests, False = one request per point
+MODBUS_PIPELINE = False     # True = keep several requests in flight on the connection (helps on high latency links)
+MODBUS_PIPELINE_DEPTH = 4   # Most requests in flight at once when pipelining
+SCALE_FACTOR_TTL = 3600     # Seconds before cached SunSSF scale factors are read again
+SUNSPEC_INDEX_FILE = "sunspec_index.json"  # Cache of discovered SunSpec model addresses, relative to this directory
 
 # METER INSTALLED
 METER_INSTALLED = True
 
+# DEVICES POLLED BY asyncAcquisition.py
+DEVICES = [
+    {"name": "inverter", "type": "inv", "host": INVERTER_IP, "port": MODBUS_PORT, "unit": 0},
+    {"name": "meter",    "type": "mtr", "host": INVERTER_IP, "port": MODBUS_PORT, "unit": METER_ADDR},
+]
+DEVICE_TIMEOUT = 10         # Seconds allowed to poll one device
+DEVICE_CONCURRENCY = 200    # Most devices polled at the same time
+
 # DATABASE
-DATABASE_TYPE = "mariadb"   # Current options: mariadb
+DATABASE_TYPE = "mariadb"   # Current options: mariadb, sqlite
+DATABASE_FILE = "solar.db"  # SQLite database file, relative to this directory
 DATABASE_ADDR = "127.0.0.1"
 DATABASE_USER = "sUser"
 DATABASE_PASSWD = "sPasswd"
 DATABASE_DB = "solarMB"
+DATABASE_POOL_SIZE = 4      # Most database connections open at once
+DATABASE_POOL_CHECK = 60    # Seconds a pooled connection may sit idle before it is checked with a ping
+HISTORY_CACHE_ENTRIES = 64  # Results of database.history() kept for reuse
+IMPORT_BATCH_ROWS = 5000    # Rows checked and loaded at a time by importer.py
+RANGE_CHUNK_ROWS = 10000    # Rows fetched at a time by range queries (database.iterRange)
+WRITE_BATCH_ROWS = 500      # Rows buffered per table before they are written in one INSERT
+WRITE_BATCH_SECONDS = 60    # Longest a buffered row waits before it is written, seconds (also written on close)
+WRITE_BUFFER_ROWS = 50000   # Most rows buffered per table while the database cannot be written; the oldest are dropped
+WRITE_RETRY_BASE = 10       # Seconds before a failed write is retried, doubling with each failure
+WRITE_RETRY_MAX = 300       # Longest wait between retries of a failed write, seconds
+SPOOL_ENABLED = True        # True = samples go to an on-disk spool first, and are loaded into the database in the background
+SPOOL_DIR = "spool"         # Spool directory, relative to this directory
+SPOOL_SYNC_ROWS = 100       # Rows appended to the spool before it is fsynced
+SPOOL_SYNC_SECONDS = 5      # Longest time appended rows wait before the spool is fsynced, seconds
+SPOOL_SEGMENT_BYTES = 4194304   # Size at which a new spool file is started; drained files are deleted
+SPOOL_DRAIN_INTERVAL = 10   # Seconds between attempts to load the spool into the database
+SPOOL_DRAIN_ROWS = 5000     # Most spooled rows loaded in one transaction
+ROLLUP_INTERVAL = 600       # Seconds between updates of the hourly and monthly rollup tables
+ROLLUP_CHUNK_HOURS = 744    # Most hours rolled up per query (744 = 31 days)
+INTERVAL_RETENTION_DAYS = 0 # Days raw interval rows are kept once rolled up, 0 = forever
+SAMPLE_RETENTION_DAYS = 0   # Days raw high rate samples are kept, 0 = forever
 
 #SCHEDULER
 SCHED_INTERVAL = 1          # Minutes between recollecting new data
+SAMPLE_INTERVAL = 0         # Seconds between samples in high rate mode (e.g. 1 or 0.5), stored as SCHED_INTERVAL aggregates. 0 = off
+STORE_RAW_SAMPLES = False   # True = also store every high rate sample in the `sample` table
+SCHED_OVERRUN = "skip"      # When a capture runs past the next interval: skip, coalesce or catchup (see deadlineScheduler.py)
+SCHED_CATCHUP_MAX = 5       # Most missed intervals run back to back with catchup
+SCHED_CLOCK_STEP = 2        # Seconds the wall clock may jump before the schedule is realigned to it
 
 # DATA
 EPOCH_INVERTER = False      # False = Use compueter time, True = get time off inverter (scheduler will still use compurter time)
 POW_THERESHOLD = 10         # Watt threshold
+DAILY_STATE_FILE = "daily_state.json"  # Checkpoint of the day's running statistics, relative to this directory
 LOG_LEVEL = "ERROR"         # Levels: NONE, FATAL, ERROR, NOTICE, DEBUG
+LOG_QUEUE_SIZE = 1000       # Most log records waiting to be written; further records are dropped and counted
+LOG_BATCH_SECONDS = 10      # Seconds between writes of queued log records
+LOG_REPEAT_SECONDS = 300    # A repeated message is written once per this many seconds, with a count of repeats
 
 
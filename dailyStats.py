@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+@author:         stoberblog
+@detail:         Daily statistics kept up to date as each interval is
+                 captured, so the end of day step needs no database reads.
+                 The state is checkpointed to a file, so a restart during
+                 the day carries on where it left off.
+
+@created:     Sunday 18th October 2026
+@modified:    Sunday 18th October 2026
+@version:     0.1
+
+@change:
+
+@license:     MIT License
+
+                Copyright (c) 2017 stoberblog
+
+                Permission is hereby granted, free of charge, to any person obtaining a copy
+                of this software and associated documentation files (the "Software"), to deal
+                in the Software without restriction, including without limitation the rights
+                to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+                copies of the Software, and to permit persons to whom the Software is
+                furnished to do so, subject to the following conditions:
+
+                The above copyright notice and this permission notice shall be included in all
+                copies or substantial portions of the Software.
+
+                THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+                IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+                FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+                AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+                LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+                OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+                SOFTWARE.
+"""
+
+import json
+import os
+import time
+
+import configuration
+
+
+"""
+@brief:        Gets the local date of an epoch, as stored in the state
+"""
+def localDay(epoch):
+    return time.strftime("%Y-%m-%d", time.localtime(epoch))
+
+
+"""
+@brief:        Running statistics of one day
+@detail:       The production threshold is POW_THERESHOLD.
+               rise:    epoch production first reached the threshold
+               fall:    epoch production last reached the threshold
+               exports: intervals from rise up to fall with power
+                        exported (pow_feed below 0)
+               powMax:  highest production of the day
+@created:      18th Oct 2026
+"""
+class DailyStats:
+    def __init__(self):
+        self.reset(None)
+
+    """
+    @brief:        Starts a new day
+    @param:        Local date ("YYYY-MM-DD"), see localDay()
+    @return:       none
+    """
+    def reset(self, day):
+        self.day = day
+        self.rise = None
+        self.fall = None
+        self.samples = 0        # Intervals since rise
+        self.exports = 0        # Intervals since rise with power exported
+        self.fallSamples = 0    # samples, as at fall
+        self.fallExports = 0    # exports, as at fall
+        self.powMax = None
+
+    """
+    @brief:        Adds a captured interval
+    @detail:       Intervals with production or feed in missing are
+                   skipped. An interval of a new day starts the new day.
+    @param:        Epoch
+    @param:        Power produced
+    @param:        Power fed in (negative when exporting)
+    @return:       none
+    """
+    def add(self, epoch, powProd, powFeed):
+        if powProd is None or powFeed is None:
+            return
+        day = localDay(epoch)
+        if day != self.day:
+            self.reset(day)
+        if self.powMax is None or powProd > self.powMax:
+            self.powMax = powProd
+        if powProd >= configuration.POW_THERESHOLD:
+            if self.rise is None:
+                self.rise = epoch
+            self.fall = epoch
+            self.fallSamples = self.samples
+            self.fallExports = self.exports
+        if self.rise is not None:
+            self.samples += 1
+            if powFeed < 0:
+                self.exports += 1
+
+    """
+    @brief:        Gets the fraction of intervals from rise to fall with
+                   power exported
+    @return:       Fraction, 0.0 when production never passed the
+                   threshold
+    """
+    def percentExported(self):
+        if self.fallSamples == 0:
+            return 0.0
+        return float(self.fallExports)/self.fallSamples
+
+    """
+    @brief:        Saves the state to a file
+    @detail:       Written to a temporary file and moved into place, so
+                   a crash cannot leave a half written file.
+    @return:       none
+    """
+    def save(self, fileName):
+        tmpName = fileName+".tmp"
+        try:
+            with open(tmpName, "w") as stateFile:
+                json.dump(self.__dict__, stateFile)
+            os.replace(tmpName, fileName)
+        except OSError as error:
+            print("Error: {}".format(error))
+
+    """
+    @brief:        Loads the state saved by save()
+    @detail:       Anything unreadable is ignored, starting afresh.
+    @return:       none
+    """
+    def load(self, fileName):
+        try:
+            with open(fileName) as stateFile:
+                state = json.load(stateFile)
+        except (OSError, ValueError):
+            return
+        for name in self.__dict__:
+            if name in state:
+                setattr(self, name, state[name])
@@ -34,12 +34,21 @@
                 SOFTWARE.
 
 """
-import gc # Garbage collection - Clean close of database
+import collections
+import os
+import tempfile
+import threading
+import types
 import time 
 
 import configuration
+import eventLog
+import schema
+import spool
 if configuration.DATABASE_TYPE == "mariadb":
     import mysql.connector as mariadb
+elif configuration.DATABASE_TYPE == "sqlite":
+    import sqlite3
 
 
 class interval_struct:
@@ -56,6 +65,24 @@ class interval_struct:
     volt_feed   = 0.0
     cur_inv     = 0.0
     freq_feed = 50.0
+    pow_prod_min= 0.0
+    pow_prod_max= 0.0
+    pow_feed_min= 0.0
+    pow_feed_max= 0.0
+    DC_s1_v_min = 0.0
+    DC_s1_v_max = 0.0
+    DC_s2_v_min = 0.0
+    DC_s2_v_max = 0.0
+    pf_feed_min = 0.0
+    pf_feed_max = 0.0
+    pf_inv_min  = 0.0
+    pf_inv_max  = 0.0
+    volt_feed_min= 0.0
+    volt_feed_max= 0.0
+    cur_inv_min = 0.0
+    cur_inv_max = 0.0
+    freq_feed_min= 50.0
+    freq_feed_max= 50.0
 
 class daily_struct:
     epoch               = 0
@@ -75,8 +102,50 @@ class log_struct:
     message = ''
 
 
-databaseCursor = None
-databaseConnection = None
+'''
+ Columns written from an interval_struct, per table
+'''
+SAMPLE_FIELDS = ["epoch", "DC_s1_v", "DC_s2_v", "pf_feed", "pf_inv", "pow_prod", "pow_feed", "eng_tot_prod",
+                 "eng_tot_out", "eng_tot_in", "volt_feed", "cur_inv", "freq_feed"]
+INTERVAL_FIELDS = SAMPLE_FIELDS+["pow_prod_min", "pow_prod_max", "pow_feed_min", "pow_feed_max",
+                                 "DC_s1_v_min", "DC_s1_v_max", "DC_s2_v_min", "DC_s2_v_max", "pf_feed_min", "pf_feed_max",
+                                 "pf_inv_min", "pf_inv_max", "volt_feed_min", "volt_feed_max", "cur_inv_min", "cur_inv_max",
+                                 "freq_feed_min", "freq_feed_max"]
+TABLE_FIELDS = {"interval": INTERVAL_FIELDS, "sample": SAMPLE_FIELDS}
+DAILY_FIELDS = ["epoch", "thres_rise_epoch", "thres_fall_epoch", "thres_perc_exp", "pow_max", "eng_day",
+                "eng_tot_prod", "eng_tot_out", "eng_tot_in", "error_flag"]   # Columns of the daily table
+
+# Connection held by each thread between openConnection() and closeConnection()
+threadData = threading.local()
+pool = None
+poolLock = threading.Lock()
+
+# Rows waiting to be written, per table, see flushWrites()
+writeBuffer = {"interval": [], "sample": []}
+writeBufferSince = None     # time.monotonic() when the oldest buffered row was added
+writeFailures = 0           # Failed flushes in a row
+writeRetryAt = 0            # time.monotonic() before which a failed flush is not retried, unless forced
+writeLock = threading.RLock()
+
+schemaChecked = False       # True once the schema is known to be up to date
+schemaLock = threading.Lock()
+
+# Spool rows are appended to when SPOOL_ENABLED, see drainSpool()
+rowSpool = None
+spoolPosition = None        # Sequence number of the last spooled row stored, once known
+spoolLock = threading.Lock()
+drainLock = threading.Lock()
+drainWake = threading.Event()
+
+'''
+ Aggregate functions of history(), by name
+'''
+HISTORY_FUNCTIONS = {"avg": "AVG", "min": "MIN", "max": "MAX", "sum": "SUM", "count": "COUNT"}
+
+# Closed buckets of recent history() calls, least recently used first.
+# (table, bucket, columns): [{bucket epoch: row}, first bucket covered, end of the buckets covered]
+historyCache = collections.OrderedDict()
+historyLock = threading.Lock()
 
 """
 @brief:         Open connection to database
@@ -85,10 +154,25 @@ databaseConnection = None
                 False: Failed
 """
 def openConnection():
-    if configuration.DATABASE_TYPE == "mariadb":
-        return maria_Open()
-    else:
-        return True
+    if not backend.open():
+        return False
+    return checkSchema()
+
+"""
+@brief:         Upgrades the database schema, once per run
+@detail:        Applies the migrations in schema.py which the database
+                has not had yet, so existing databases pick up new
+                tables and indexes automatically.
+@created:       18th Oct 2026
+@return:        True: Success
+                False: Failed
+"""
+def checkSchema():
+    global schemaChecked
+    with schemaLock:
+        if not schemaChecked:
+            schemaChecked = backend.migrate()
+        return schemaChecked
 
 """
 @brief:         Close connection to database
@@ -97,24 +181,220 @@ def openConnection():
                 False: Failed
 """
 def closeConnection():
-    if configuration.DATABASE_TYPE == "mariadb":
-        return maria_Close()
-    else:
-        return True
+    flushWrites()
+    return backend.close()
 
 """
 @brief:         Store Interval Data to database
+@detail:        The row goes to the spool, or with SPOOL_ENABLED off is
+                buffered and written with others by flushWrites().
 @created:       18th Feb 2017
 @return:        True: Success
                 False: Failed
 """
 def storeInterval(dataStructure):
-    if configuration.DATABASE_TYPE == "mariadb":
-        return maria_storeInterval(dataStructure)
-    else:
+    if not hasattr(dataStructure, 'epoch'):
         return False
+    return storeRow("interval", dataStructure)
     
 
+"""
+@brief:         Store raw high rate samples to database
+@detail:        As storeInterval().
+@created:       18th Oct 2026
+@param:         List of interval_struct
+@return:        True: Success
+                False: Failed
+"""
+def storeSamples(samples):
+    ret = True
+    for sample in samples:
+        ret = storeRow("sample", sample) and ret
+    return ret
+
+
+"""
+@brief:         Sends a row to the spool or the write buffer
+@detail:        If the spool cannot be written, the row is buffered in
+                memory instead.
+@created:       18th Oct 2026
+@return:        True: Success (or buffered)
+                False: Failed
+"""
+def storeRow(table, dataStructure):
+    if configuration.SPOOL_ENABLED == True:
+        try:
+            openSpool().append(table, [getattr(dataStructure, field) for field in TABLE_FIELDS[table]])
+            return True
+        except OSError as error:
+            print("Error: {}".format(error))
+    return bufferRow(table, dataStructure)
+
+
+"""
+@brief:         Adds a row to the write buffer
+@detail:        The buffer is flushed once a table has WRITE_BATCH_ROWS
+                rows waiting. While the database cannot be written, a
+                table keeps at most WRITE_BUFFER_ROWS rows, dropping (and
+                logging) the oldest.
+@created:       18th Oct 2026
+@return:        True: Success (or buffered)
+                False: Failed
+"""
+def bufferRow(table, dataStructure):
+    global writeBufferSince
+    with writeLock:
+        if writeBufferSince is None:
+            writeBufferSince = time.monotonic()
+        rows = writeBuffer[table]
+        rows.append(tuple(getattr(dataStructure, field) for field in TABLE_FIELDS[table]))
+        if len(rows) > configuration.WRITE_BUFFER_ROWS:
+            del rows[:len(rows)-configuration.WRITE_BUFFER_ROWS]
+            eventLog.log(eventLog.LEVELS["ERROR"], "Write buffer full, oldest "+table+" rows dropped")
+        return flushWrites(False)
+
+
+"""
+@brief:         Writes the buffered rows to the database
+@detail:        Each table's rows are written with one multi-row INSERT
+                per WRITE_BATCH_ROWS rows, and committed together. Rows
+                which fail to write are kept for the next flush.
+                A forced flush also syncs the spool and wakes its
+                drainer.
+@created:       18th Oct 2026
+@param:         True: Always flush
+                False: Only when a table has WRITE_BATCH_ROWS rows or
+                the oldest row has waited WRITE_BATCH_SECONDS, and not
+                while backing off after a failed flush (WRITE_RETRY_BASE
+                doubling up to WRITE_RETRY_MAX)
+@return:        True: Success (or nothing due)
+                False: Failed (or backing off)
+"""
+def flushWrites(force=True):
+    global writeBufferSince
+    global writeFailures
+    global writeRetryAt
+    if rowSpool is not None and force:
+        rowSpool.sync()
+        drainWake.set()
+    with writeLock:
+        if writeBufferSince is None:
+            return True
+        now = time.monotonic()
+        if not force:
+            if writeFailures > 0 and now < writeRetryAt:
+                return False
+            if (now-writeBufferSince < configuration.WRITE_BATCH_SECONDS
+                    and max(len(rows) for rows in writeBuffer.values()) < configuration.WRITE_BATCH_ROWS):
+                return True
+        ret = backend.storeRows(writeBuffer)
+        if ret:
+            storedRows(writeBuffer)
+            for rows in writeBuffer.values():
+                del rows[:]
+            writeBufferSince = None
+            writeFailures = 0
+        else:
+            writeFailures += 1
+            writeRetryAt = now+min(configuration.WRITE_RETRY_BASE*2**(writeFailures-1), configuration.WRITE_RETRY_MAX)
+        return ret
+
+
+"""
+@brief:         Writes everything pending, waiting for the spool to drain
+@detail:        Used before queries, so they see every stored row.
+@created:       18th Oct 2026
+@return:        True: Success
+                False: Failed
+"""
+def syncWrites():
+    ret = flushWrites()
+    if rowSpool is not None:
+        ret = drainSpool() and ret
+    return ret
+
+
+"""
+@brief:         Opens the spool, and starts its drainer, on first use
+@created:       18th Oct 2026
+@return:        Spool
+"""
+def openSpool():
+    global rowSpool
+    if rowSpool is not None:
+        return rowSpool
+    with spoolLock:
+        if rowSpool is None:
+            directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), configuration.SPOOL_DIR)
+            rowSpool = spool.Spool(directory)
+            drainer = threading.Thread(target=spoolDrainer)
+            drainer.daemon = True # Rows left on shutdown are drained on the next start
+            drainer.start()
+    return rowSpool
+
+
+"""
+@brief:         Loads spooled rows into the database
+@detail:        Rows are stored in order, in batches of up to
+                SPOOL_DRAIN_ROWS. The sequence number of the last row is
+                committed in the same transaction as the rows, so after a
+                crash or failed batch no row is stored twice. Segments
+                are deleted once all their rows are stored.
+                A spool created new by this run, numbered below the stored
+                position, restarts the position.
+@created:       18th Oct 2026
+@return:        True: Spool empty
+                False: Failed, rows are left in the spool
+"""
+def drainSpool():
+    global spoolPosition
+    if not checkSchema():
+        return False
+    with drainLock:
+        if spoolPosition is None:
+            spoolPosition = getSpoolPosition()
+            if spoolPosition is None:
+                return False
+            if rowSpool.created is not None and spoolPosition >= rowSpool.created:
+                spoolPosition = rowSpool.created-1 # Stored for a deleted spool numbered higher (e.g. clock since set back)
+        while True:
+            records = rowSpool.read(spoolPosition, configuration.SPOOL_DRAIN_ROWS)
+            if not records:
+                return True
+            batch = dict((table, []) for table in TABLE_FIELDS)
+            for seq, table, values in records:
+                missing = len(TABLE_FIELDS[table])-len(values) # Spooled before columns were added
+                batch[table].append(tuple(values)+(None,)*missing)
+            if not backend.storeRows(batch, records[-1][0]):
+                return False
+            storedRows(batch)
+            spoolPosition = records[-1][0]
+            rowSpool.discard(spoolPosition)
+
+
+"""
+@brief:         Drainer thread, loading the spool every
+                SPOOL_DRAIN_INTERVAL seconds or when woken
+@created:       18th Oct 2026
+@return:        none
+"""
+def spoolDrainer():
+    while True:
+        drainWake.wait(configuration.SPOOL_DRAIN_INTERVAL)
+        drainWake.clear()
+        drainSpool()
+
+
+"""
+@brief:         Get the sequence number of the last spooled row stored
+@created:       18th Oct 2026
+@return:        None: Failure
+                int: sequence number, 0 when none
+"""
+def getSpoolPosition():
+    return backend.getSpoolPosition()
+
+
 """
 @brief:         Store Daily Data to database
 @created:       19th Feb 2017
@@ -122,10 +402,10 @@ def storeInterval(dataStructure):
                 False: Failed
 """
 def storeDaily(dataStructure):
-    if configuration.DATABASE_TYPE == "mariadb":
-        return maria_storeDaily(dataStructure)
-    else:
+    if not hasattr(dataStructure, 'epoch'):
         return False
+    invalidateHistory("daily", dataStructure.epoch)
+    return backend.storeDaily(dataStructure)
     
     
     
@@ -136,10 +416,8 @@ def storeDaily(dataStructure):
                 array: retuned data, in rows of [id, epoch, pow_feed]
 """
 def getPowEpoch(epochStart, epochEnd):
-    if configuration.DATABASE_TYPE == "mariadb":
-        return maria_getPowEpoch(epochStart, epochEnd)
-    else:
-        return None
+    syncWrites() # Include rows still buffered or spooled
+    return backend.getPowEpoch(epochStart, epochEnd)
 
 
 
@@ -150,10 +428,224 @@ def getPowEpoch(epochStart, epochEnd):
                 array: retuned maximum
 """
 def getMaxProduced(epochStart, epochEnd):
-    if configuration.DATABASE_TYPE == "mariadb":
-        return maria_getMaxProduced(epochStart, epochEnd)
-    else:
+    syncWrites() # Include rows still buffered or spooled
+    return backend.getMaxProduced(epochStart, epochEnd)
+
+"""
+@brief:         Reads the rows of a table within a time range, in chunks
+@detail:        Rows are streamed from the database, so only one chunk is
+                held in memory however long the range.
+@created:       18th Oct 2026
+@param:         Table name
+@param:         List of column names
+@param:         Start epoch (inclusive)
+@param:         End epoch (inclusive)
+@param:         Rows per chunk, RANGE_CHUNK_ROWS by default
+@param:         False: yield lists of row tuples
+                True: yield dictionaries of column name to list of values
+@return:        Generator of chunks, in epoch order; stops early when
+                the query fails
+"""
+def iterRange(table, fields, epochStart, epochEnd, chunkRows=None, columns=False):
+    for name in [table]+list(fields):
+        checkName(name)
+    syncWrites() # Include rows still buffered or spooled
+    sql = ("SELECT "+",".join(["`"+field+"`" for field in fields])+" FROM `"+table+"` "
+           "WHERE `epoch` BETWEEN %s AND %s ORDER BY `epoch`")
+    for rows in backend.iterQuery(sql, (epochStart, epochEnd), chunkRows or configuration.RANGE_CHUNK_ROWS):
+        if columns:
+            yield dict(zip(fields, [list(values) for values in zip(*rows)]))
+        else:
+            yield rows
+
+"""
+@brief:         Aggregates columns of a table into time buckets
+@detail:        The grouping is done by the database. Buckets are aligned
+                to multiples of the bucket size (UTC).
+                Closed buckets are cached per table, bucket size and
+                columns, up to HISTORY_CACHE_ENTRIES of them. A bucket
+                which ended more than SCHED_INTERVAL ago is closed and is
+                not queried again by a call whose range holds all of it,
+                whatever the range (e.g. a sliding "last day" only queries
+                its partial first bucket and the buckets from the first
+                open one). Rows stored into a closed bucket later (e.g.
+                drained from the spool or imported) drop it, and the
+                buckets after it, from the cache.
+@created:       18th Oct 2026
+@param:         Start epoch (inclusive)
+@param:         End epoch (inclusive)
+@param:         Bucket size (seconds)
+@param:         List of columns, each "<column>" for its average or
+                "<column>:<function>" with a function of
+                HISTORY_FUNCTIONS
+@param:         Table name
+@return:        None: Failure
+                array: rows of [bucket epoch, rows in bucket, one value
+                per column], in bucket order. Buckets without rows are
+                left out.
+"""
+def history(epochStart, epochEnd, bucket, columns, table="interval"):
+    bucket = int(bucket)
+    columns = tuple(columns)
+    checkName(table)
+    aggregates = []
+    for column in columns:
+        field, function = (column.split(":", 1)+["avg"])[:2]
+        checkName(field)
+        if function not in HISTORY_FUNCTIONS or bucket <= 0:
+            raise ValueError("Invalid history column "+column)
+        aggregates.append(HISTORY_FUNCTIONS[function]+"(`"+field+"`)")
+    syncWrites() # Include rows still buffered or spooled
+    closedBefore = int(time.time()-configuration.SCHED_INTERVAL*60)//bucket*bucket
+    firstFull = -(-epochStart//bucket)*bucket # First bucket wholly in range
+    endFull = (epochEnd+1)//bucket*bucket     # End of the last bucket wholly in range
+    key = (table, bucket, columns)
+    cached = []
+    cachedEnd = firstFull
+    with historyLock:
+        entry = historyCache.get(key)
+        if entry is not None and entry[1] <= firstFull < entry[2]:
+            cachedEnd = max(firstFull, min(endFull, entry[2]))
+            cached = [entry[0][start] for start in sorted(entry[0]) if firstFull <= start < cachedEnd]
+    rows = backend.query("SELECT `epoch` - `epoch` % "+str(bucket)+" AS `bucket`, COUNT(*), "+", ".join(aggregates)+
+                         " FROM `"+table+"` WHERE `epoch` BETWEEN %s AND %s OR `epoch` BETWEEN %s AND %s"
+                         " GROUP BY `bucket` ORDER BY `bucket`",
+                         (epochStart, min(firstFull-1, epochEnd), cachedEnd, epochEnd))
+    if rows is None:
         return None
+    rows = [tuple(row) for row in rows]
+    closedEnd = min(endFull, closedBefore)
+    if closedEnd > cachedEnd:
+        closed = dict((row[0], row) for row in rows if cachedEnd <= row[0] < closedEnd)
+        with historyLock:
+            entry = historyCache.get(key)
+            if entry is not None and entry[1] <= closedEnd and cachedEnd <= entry[2]:
+                entry[0].update(closed)
+                entry[1] = min(entry[1], cachedEnd)
+                entry[2] = max(entry[2], closedEnd)
+            else:
+                historyCache[key] = [closed, cachedEnd, closedEnd]
+            historyCache.move_to_end(key)
+            while len(historyCache) > configuration.HISTORY_CACHE_ENTRIES:
+                historyCache.popitem(last=False)
+    elif cached:
+        with historyLock:
+            if key in historyCache:
+                historyCache.move_to_end(key)
+    return sorted(cached+rows, key=lambda row: row[0])
+
+"""
+@brief:         Drops cached history() buckets which new rows fall in
+@detail:        Buckets from the one holding the given epoch onwards are
+                dropped, to be queried again. Entries whose buckets all
+                start later are kept.
+@created:       18th Oct 2026
+@param:         Table name
+@param:         Epoch of the earliest new row
+@return:        none
+"""
+def invalidateHistory(table, epoch):
+    with historyLock:
+        for key, entry in list(historyCache.items()):
+            bucketStart = epoch-epoch%key[1]
+            if key[0] != table or bucketStart < entry[1] or bucketStart >= entry[2]:
+                continue
+            if bucketStart == entry[1]:
+                del historyCache[key]
+                continue
+            for start in [start for start in entry[0] if start >= bucketStart]:
+                del entry[0][start]
+            entry[2] = bucketStart
+
+"""
+@brief:         Drops cached history() buckets of rows just stored
+@param:         Dictionary of table name to list of rows, as storeRows()
+@return:        none
+"""
+def storedRows(tables):
+    for table, rows in tables.items():
+        if rows:
+            invalidateHistory(table, min(row[0] for row in rows))
+
+"""
+@brief:         Loads many rows into a table, by the backend's fastest
+                bulk path (see importer.py)
+@detail:        MariaDB: LOAD DATA LOCAL INFILE, or a multi-row INSERT
+                when the server does not allow it.
+                SQLite: one transaction.
+@created:       18th Oct 2026
+@param:         Table name
+@param:         List of column names
+@param:         List of rows, values in column order
+@return:        True: Success
+                False: Failed
+"""
+def loadRows(table, fields, rows):
+    for name in [table]+list(fields):
+        checkName(name)
+    if not rows:
+        return True
+    if not backend.loadRows(table, fields, rows):
+        return False
+    invalidateHistory(table, min(row[0] for row in rows))
+    return True
+
+"""
+@brief:         Builds an INSERT of one row, for executeMany()
+@return:        SQL
+"""
+def insertSQL(table, fields):
+    return ("INSERT INTO `"+table+"` ("+",".join(["`"+field+"`" for field in fields])+") VALUES ("+
+            ",".join(["%s"]*len(fields))+")")
+
+"""
+@brief:         Checks a table or column name, before it is put in SQL
+@return:        none, raises ValueError when invalid
+"""
+def checkName(name):
+    if not name.replace("_", "").isalnum():
+        raise ValueError("Invalid name "+name)
+
+"""
+@brief:         Runs a query
+@detail:        For subsystems built on the tables (e.g. rollup.py). The
+                SQL uses %s placeholders, and must work on every backend.
+@created:       18th Oct 2026
+@param:         SQL
+@param:         Parameters
+@return:        None: Failure
+                array: returned rows
+"""
+def query(sql, params=()):
+    return backend.query(sql, params)
+
+"""
+@brief:         Runs a statement once for each set of parameters, in one
+                transaction
+@detail:        As query().
+@created:       18th Oct 2026
+@param:         SQL
+@param:         List of parameters
+@return:        True: Success
+                False: Failed
+"""
+def executeMany(sql, rows):
+    return backend.executeMany(sql, rows)
+
+"""
+@brief:         Stores log records, all in one commit
+@detail:        Used by the eventLog.py writer thread
+@created:       18th Oct 2026
+@param:         List of (epoch, level, message)
+@return:        True: Success
+                False: Failed
+"""
+def storeLogs(rows):
+    if not backend.open():
+        return False
+    stored = checkSchema() and backend.executeMany("INSERT INTO `log` (`epoch`,`level`,`message`) VALUES (%s,%s,%s)", rows)
+    backend.close()
+    return stored
 
 """
 @brief:         Log to database
@@ -161,10 +653,7 @@ def getMaxProduced(epochStart, epochEnd):
 @return:        None: Failure
 """
 def logMsg(level, message):
-    if configuration.DATABASE_TYPE == "mariadb":
-        maria_logMsg(level, message)
-    else:
-        return None
+    backend.logMsg(level, message)
 
 
 
@@ -176,53 +665,242 @@ def logMsg(level, message):
 
 #####################################################################
 """
+"""
+@brief:         Pool of open database connections
+@detail:        Connections are handed out one per thread and returned
+                after use, so each capture does not pay for a fresh
+                login. A connection idle for longer than
+                DATABASE_POOL_CHECK seconds is pinged before it is handed
+                out, and replaced if the server has dropped it. Once
+                DATABASE_POOL_SIZE connections are in use, acquire()
+                waits for one to be returned.
+@param:         Function opening a new connection
+@param:         Most connections open at once
+@param:         Seconds idle before a connection is checked
+@created:       18th Oct 2026
+"""
+class ConnectionPool:
+    def __init__(self, connect, size, checkAfter):
+        self.connect = connect
+        self.size = size
+        self.checkAfter = checkAfter
+        self.idle = []      # (connection, time.monotonic() returned)
+        self.inUse = 0
+        self.condition = threading.Condition()
+
+    """
+    @brief:        Takes a connection from the pool, opening one if needed
+    @return:       Connection
+    """
+    def acquire(self):
+        with self.condition:
+            while not self.idle and self.inUse >= self.size:
+                self.condition.wait()
+            self.inUse += 1
+            if self.idle:
+                connection, returned = self.idle.pop()
+            else:
+                connection, returned = None, None
+        try:
+            if connection is not None and time.monotonic()-returned > self.checkAfter:
+                try:
+                    connection.ping()
+                except Exception:
+                    self.discard(connection)
+                    connection = None   # Replaced below, so its prepared statements go with it
+            if connection is None:
+                connection = self.connect()
+        except Exception:
+            self.release(connection, broken=True)
+            raise
+        return connection
+
+    """
+    @brief:        Returns a connection to the pool
+    @param:        Connection
+    @param:        True when the connection failed, so is closed rather
+                   than reused
+    @return:       none
+    """
+    def release(self, connection, broken=False):
+        if connection is not None and broken:
+            self.discard(connection)
+        with self.condition:
+            self.inUse -= 1
+            if connection is not None and not broken:
+                self.idle.append((connection, time.monotonic()))
+            self.condition.notify()
+
+    """
+    @brief:        Closes a failed connection
+    @return:       none
+    """
+    def discard(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    """
+    @brief:        Closes every idle connection
+    @return:       none
+    """
+    def closeIdle(self):
+        with self.condition:
+            idle, self.idle = self.idle, []
+        for connection, returned in idle:
+            connection.close()
+
+
+"""
+@brief:         Gets the connection pool, creating it on first use
+@created:       18th Oct 2026
+@return:        ConnectionPool
+"""
+def maria_Pool():
+    global pool
+    with poolLock:
+        if pool is None:
+            pool = ConnectionPool(lambda: mariadb.connect(user=configuration.DATABASE_USER, password=configuration.DATABASE_PASSWD, database=configuration.DATABASE_DB),
+                                  configuration.DATABASE_POOL_SIZE, configuration.DATABASE_POOL_CHECK)
+    return pool
+
 """
 @brief:         Open connection to database
+@detail:        Takes a connection from the pool for the calling thread.
+                Calls may be nested; the connection is returned by the
+                matching maria_Close().
 @created:       18th Feb 2017
 @return:        True: Success
                 False: Failed
 """
 def maria_Open():
-    global databaseConnection
-    global databaseCursor
-    databaseConnection = mariadb.connect(user=configuration.DATABASE_USER, password=configuration.DATABASE_PASSWD, database=configuration.DATABASE_DB)
-    databaseCursor = databaseConnection.cursor(buffered=True)
-    # a try and catch are needed here
+    if getattr(threadData, "depth", 0) > 0:
+        threadData.depth += 1
+        return True
+    try:
+        threadData.connection = maria_Pool().acquire()
+    except mariadb.Error as error:
+        print("Error: {}".format(error))
+        return False
+    threadData.cursor = threadData.connection.cursor(buffered=True)
+    threadData.depth = 1
     return True
 
 """
 @brief:         Close connection to database
+@detail:        Returns the calling thread's connection to the pool.
 @created:       18th Feb 2017
 @return:        True: Success
                 False: Failed
 """
 def maria_Close():
-    ret=databaseConnection.close()
-    gc.collect() # Garbage collection - https://ianhowson.com/blog/a-quick-guide-to-using-mysql-in-python/
-    return ret
-    
+    if getattr(threadData, "depth", 0) == 0:
+        return False
+    threadData.depth -= 1
+    if threadData.depth > 0:
+        return True
+    if threadData.connection is not None:
+        threadData.cursor.close()
+        pool.release(threadData.connection)
+    threadData.connection = None
+    threadData.cursor = None
+    return True
+
 """
-@brief:         Store Interval Data to database
-@created:       18th Feb 2017
+@brief:         Gets the calling thread's connection and cursor
+@detail:        Opens one if the thread has none, which is then kept until
+                maria_Close(), and replaces one dropped by maria_Error().
+@created:       18th Oct 2026
+@return:        (connection, cursor)
+"""
+def maria_Current():
+    if getattr(threadData, "depth", 0) == 0 and not maria_Open():
+        raise mariadb.InterfaceError("No database connection")
+    if threadData.connection is None:
+        threadData.connection = pool.acquire()
+        threadData.cursor = threadData.connection.cursor(buffered=True)
+    return (threadData.connection, threadData.cursor)
+
+"""
+@brief:         Handles a failed query
+@detail:        When the connection itself failed it is dropped, so the
+                thread's next query reconnects. Otherwise anything not
+                yet committed is rolled back.
+@created:       18th Oct 2026
+@return:        none
+"""
+def maria_Error(error):
+    print("Error: {}".format(error))
+    if getattr(threadData, "connection", None) is None:
+        return
+    if isinstance(error, (mariadb.InterfaceError, mariadb.OperationalError)):
+        pool.release(threadData.connection, broken=True)
+        threadData.connection = None
+        threadData.cursor = None
+    else:
+        threadData.connection.rollback()
+        for cursor, sql in getattr(threadData.connection, "preparedStatements", {}).values():
+            cursor.close() # Prepared again on next use, in case a statement was the problem
+        threadData.connection.preparedStatements = {}
+
+"""
+@brief:         Gets a server-side prepared statement
+@detail:        Each statement is prepared once per connection, on a
+                cursor of its own, and reused for every later call.
+@created:       18th Oct 2026
+@param:         Statement name
+@param:         Function building the SQL, with %s placeholders
+@return:        (connection, cursor, SQL) - execute with this SQL object,
+                as the cursor only reuses the statement for the same one
+"""
+def maria_Statement(name, build):
+    connection = maria_Current()[0]
+    statements = getattr(connection, "preparedStatements", None)
+    if statements is None:
+        statements = connection.preparedStatements = {}
+    if name not in statements:
+        statements[name] = (connection.cursor(prepared=True), build())
+    cursor, sql = statements[name]
+    return (connection, cursor, sql)
+
+"""
+@brief:         Store buffered rows to database
+@detail:        Rows are sent with multi-row INSERTs, so each costs a
+                single round trip, and everything is committed once at
+                the end. Batches are WRITE_BATCH_ROWS rows, with any
+                remainder split into powers of two, so only a few
+                statements per table are ever prepared.
+@created:       18th Oct 2026
+@param:         Dictionary of table name to list of row tuples
+@param:         Spool sequence number to record with the rows, if any
 @return:        True: Success
                 False: Failed
 """
-def maria_storeInterval(dataStructure):
-    if not hasattr(dataStructure, 'epoch'):
-        return False
-    try:        
-        databaseCursor.execute("INSERT INTO `interval` (epoch,DC_s1_v,DC_s2_v,pf_feed,pf_inv,pow_prod,pow_feed,eng_tot_prod,eng_tot_out,eng_tot_in,volt_feed,cur_inv,freq_feed) VALUES ("+
-                           str(dataStructure.epoch)+","+str(dataStructure.DC_s1_v)+","+str(dataStructure.DC_s2_v)+","+str(dataStructure.pf_feed)+","+str(dataStructure.pf_inv)+","+str(dataStructure.pow_prod)+","+
-                            str(dataStructure.pow_feed)+","+str(dataStructure.eng_tot_prod)+","+str(dataStructure.eng_tot_out)+","+str(dataStructure.eng_tot_in)+","+
-                            str(dataStructure.volt_feed)+","+str(dataStructure.cur_inv)+","+str(dataStructure.freq_feed)+")")
-            
+def maria_storeRows(buffer, position=None):
+    try:
+        for table, rows in buffer.items():
+            fields = TABLE_FIELDS[table]
+            first = 0
+            while first < len(rows):
+                count = min(len(rows)-first, configuration.WRITE_BATCH_ROWS)
+                if count < configuration.WRITE_BATCH_ROWS:
+                    count = 2**(count.bit_length()-1)
+                databaseConnection, databaseCursor, sql = maria_Statement(table+str(count), lambda: "INSERT INTO `"+table+"` ("+",".join(fields)+") VALUES "+
+                                                                          ",".join(["("+",".join(["%s"]*len(fields))+")"]*count))
+                databaseCursor.execute(sql, [value for row in rows[first:first+count] for value in row])
+                first += count
+        if position is not None:
+            databaseConnection, databaseCursor, sql = maria_Statement("spoolPosition", lambda: "REPLACE INTO `spool_position` (`id`,`position`) VALUES (1,%s)")
+            databaseCursor.execute(sql, (position,))
+        databaseConnection, databaseCursor = maria_Current()
+        databaseConnection.commit()
     except mariadb.Error as error:
-        print("Error: {}".format(error))
+        maria_Error(error)
         return False
-    databaseConnection.commit()
     return True
-    
-    
+
+
 """
 @brief:         Store Daily Data to database
 @created:       18th Feb 2017
@@ -230,14 +908,12 @@ def maria_storeInterval(dataStructure):
                 False: Failed
 """
 def maria_storeDaily(dataStructure):
-    if not hasattr(dataStructure, 'epoch'):
-        return False
-    try:        
-        databaseCursor.execute("INSERT INTO `daily` (epoch,thres_rise_epoch,thres_fall_epoch,thres_perc_exp,pow_max,eng_day,eng_tot_prod,eng_tot_out,eng_tot_in,error_flag) VALUES ("+
-                           str(dataStructure.epoch)+","+str(dataStructure.thres_rise_epoch)+","+str(dataStructure.thres_fall_epoch)+","+str(dataStructure.thres_perc_exp)+","+str(dataStructure.pow_max)+","+str(dataStructure.eng_day)+","+
-                            str(dataStructure.eng_tot_prod)+","+str(dataStructure.eng_tot_out)+","+str(dataStructure.eng_tot_in)+","+str(dataStructure.error_flag)+")")
+    try:
+        databaseConnection, databaseCursor, sql = maria_Statement("daily", lambda: "INSERT INTO `daily` (epoch,thres_rise_epoch,thres_fall_epoch,thres_perc_exp,pow_max,eng_day,eng_tot_prod,eng_tot_out,eng_tot_in,error_flag) VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)")
+        databaseCursor.execute(sql, (dataStructure.epoch, dataStructure.thres_rise_epoch, dataStructure.thres_fall_epoch, dataStructure.thres_perc_exp, dataStructure.pow_max, dataStructure.eng_day,
+                                     dataStructure.eng_tot_prod, dataStructure.eng_tot_out, dataStructure.eng_tot_in, dataStructure.error_flag))
     except mariadb.Error as error:
-        print("Error: {}".format(error))
+        maria_Error(error)
         return False
     databaseConnection.commit()
     return True
@@ -251,9 +927,10 @@ def maria_storeDaily(dataStructure):
 """
 def maria_logMsg(level, message):
     try:
-        databaseCursor.execute( "INSERT INTO `log` (`epoch`,`level`,`message`) VALUES ("+str(time.time())+","+str(level)+",\""+str(message)+"\")" )
+        databaseConnection, databaseCursor, sql = maria_Statement("log", lambda: "INSERT INTO `log` (`epoch`,`level`,`message`) VALUES (%s,%s,%s)")
+        databaseCursor.execute(sql, (time.time(), level, str(message)))
     except mariadb.Error as error:
-        print("Error: {}".format(error))
+        maria_Error(error)
         return False
     databaseConnection.commit()
     return True
@@ -266,13 +943,15 @@ def maria_logMsg(level, message):
                 array: retuned data, in rows of [id, epoch, pow_feed]
 """
 def maria_getPowEpoch(epochStart, epochEnd):
-    try:        
-        databaseCursor.execute("SELECT `id`, `epoch`, `pow_feed`, `pow_prod` FROM `interval` WHERE `epoch` BETWEEN "+str(epochStart)+" AND "+str(epochEnd))
+    try:
+        databaseConnection, databaseCursor, sql = maria_Statement("powEpoch", lambda: "SELECT `id`, `epoch`, `pow_feed`, `pow_prod` FROM `interval` WHERE `epoch` BETWEEN %s AND %s")
+        databaseCursor.execute(sql, (epochStart, epochEnd))
+        rows = databaseCursor.fetchall()
     except mariadb.Error as error:
-        print("Error: {}".format(error))
+        maria_Error(error)
         return None
     databaseConnection.commit()
-    return databaseCursor.fetchall()
+    return rows
 
 
 """
@@ -282,25 +961,431 @@ def maria_getPowEpoch(epochStart, epochEnd):
                 array: retuned maximum
 """
 def maria_getMaxProduced(epochStart, epochEnd):
-    try:        
-        databaseCursor.execute("SELECT MAX(`pow_prod`) AS `pow_prod` FROM `interval` WHERE `epoch` BETWEEN "+str(epochStart)+" AND "+str(epochEnd))
+    try:
+        databaseConnection, databaseCursor, sql = maria_Statement("maxProduced", lambda: "SELECT MAX(`pow_prod`) AS `pow_prod` FROM `interval` WHERE `epoch` BETWEEN %s AND %s")
+        databaseCursor.execute(sql, (epochStart, epochEnd))
+        rows = databaseCursor.fetchall()
     except mariadb.Error as error:
-        print("Error: {}".format(error))
+        maria_Error(error)
         return None
     databaseConnection.commit()
-    return databaseCursor.fetchall()
+    return rows
+
+
+"""
+@brief:         Get the sequence number of the last spooled row stored
+@created:       18th Oct 2026
+@return:        None: Failure
+                int: sequence number, 0 when none
+"""
+def maria_getSpoolPosition():
+    try:
+        databaseConnection, databaseCursor, sql = maria_Statement("getSpoolPosition", lambda: "SELECT `position` FROM `spool_position` WHERE `id` = 1")
+        databaseCursor.execute(sql)
+        rows = databaseCursor.fetchall()
+    except mariadb.Error as error:
+        maria_Error(error)
+        return None
+    databaseConnection.commit()
+    if not rows:
+        return 0
+    return int(rows[0][0])
+
+"""
+@brief:         Runs a query, see query()
+@created:       18th Oct 2026
+"""
+def maria_query(sql, params):
+    try:
+        databaseConnection, databaseCursor = maria_Current()
+        databaseCursor.execute(sql, params)
+        rows = databaseCursor.fetchall()
+    except mariadb.Error as error:
+        maria_Error(error)
+        return None
+    databaseConnection.commit()
+    return rows
+
+"""
+@brief:         Streams the rows of a query, see iterRange()
+@detail:        Runs on a connection of its own with an unbuffered cursor,
+                so rows are fetched from the server a chunk at a time and
+                the thread's connection stays free for other queries. A
+                connection left with unread rows (the caller stopped
+                early) is closed rather than reused.
+@created:       18th Oct 2026
+"""
+def maria_iterQuery(sql, params, chunkRows):
+    finished = False
+    try:
+        connection = maria_Pool().acquire()
+    except mariadb.Error as error:
+        print("Error: {}".format(error))
+        return
+    try:
+        cursor = connection.cursor(buffered=False)
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(chunkRows)
+            if not rows:
+                break
+            yield rows
+        cursor.close()
+        connection.commit()
+        finished = True
+    except mariadb.Error as error:
+        print("Error: {}".format(error))
+    finally:
+        pool.release(connection, broken=not finished)
+
+"""
+@brief:         Loads rows with LOAD DATA LOCAL INFILE, see loadRows()
+@detail:        The rows are written to a temporary file, and loaded on a
+                connection of its own, as local files must be allowed
+                when connecting. Falls back to executeMany() when the
+                server refuses.
+@created:       18th Oct 2026
+"""
+def maria_loadRows(table, fields, rows):
+    with tempfile.NamedTemporaryFile("w", suffix=".tsv", delete=False) as dataFile:
+        for row in rows:
+            dataFile.write("\t".join(["\\N" if value is None else repr(value) for value in row])+"\n")
+    try:
+        connection = mariadb.connect(user=configuration.DATABASE_USER, password=configuration.DATABASE_PASSWD,
+                                     database=configuration.DATABASE_DB, allow_local_infile=True)
+        try:
+            cursor = connection.cursor()
+            cursor.execute("LOAD DATA LOCAL INFILE %s INTO TABLE `"+table+"` ("+",".join(["`"+field+"`" for field in fields])+")",
+                           (dataFile.name,))
+            connection.commit()
+        finally:
+            connection.close()
+    except mariadb.Error as error:
+        print("Error: {}, loading with INSERT instead".format(error))
+        return maria_executeMany(insertSQL(table, fields), rows)
+    finally:
+        os.remove(dataFile.name)
+    return True
+
+"""
+@brief:         Runs a statement for each set of parameters, see
+                executeMany()
+@created:       18th Oct 2026
+"""
+def maria_executeMany(sql, rows):
+    try:
+        databaseConnection, databaseCursor = maria_Current()
+        databaseCursor.executemany(sql, rows)
+        databaseConnection.commit()
+    except mariadb.Error as error:
+        maria_Error(error)
+        return False
+    return True
+
+"""
+@brief:         Applies pending schema migrations
+@detail:        Each migration is recorded as soon as it is applied, so
+                an upgrade stopped part way carries on where it left off.
+@created:       18th Oct 2026
+@return:        True: Success
+                False: Failed
+"""
+def maria_migrate():
+    try:
+        databaseConnection, databaseCursor = maria_Current()
+        databaseCursor.execute(schema.VERSION_TABLE["mariadb"])
+        databaseCursor.execute("SELECT `version` FROM `schema_version` WHERE `id` = 1")
+        rows = databaseCursor.fetchall()
+        for version, note, statements in schema.pending("mariadb", int(rows[0][0]) if rows else 0):
+            for statement in statements:
+                databaseCursor.execute(statement)
+            databaseCursor.execute("REPLACE INTO `schema_version` (`id`,`version`) VALUES (1,%s)", (version,))
+            databaseConnection.commit()
+            print("Database schema upgraded to version "+str(version)+": "+note)
+    except mariadb.Error as error:
+        maria_Error(error)
+        return False
+    return True
+
+
+
+
+"""
+#####################################################################
+
+        SQLite
+
+#####################################################################
+"""
+"""
+@brief:         Gets the calling thread's SQLite connection
+@detail:        SQLite connections cannot be shared between threads, so
+                each thread keeps one of its own. The database is switched
+                to WAL mode, so readers do not block the writer.
+@created:       18th Oct 2026
+@return:        Connection
+"""
+def sqlite_Current():
+    connection = getattr(threadData, "sqlite", None)
+    if connection is None:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), configuration.DATABASE_FILE)
+        connection = sqlite3.connect(path, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL") # Safe with WAL; the spool covers a power cut
+        threadData.sqlite = connection
+    return connection
+
+"""
+@brief:         Open connection to database
+@created:       18th Oct 2026
+@return:        True: Success
+                False: Failed
+"""
+def sqlite_Open():
+    try:
+        sqlite_Current()
+    except sqlite3.Error as error:
+        print("Error: {}".format(error))
+        return False
+    return True
+
+"""
+@brief:         Close connection to database
+@detail:        The thread's connection is kept open for its next use.
+@created:       18th Oct 2026
+@return:        True: Success
+"""
+def sqlite_Close():
+    return True
+
+"""
+@brief:         Store buffered rows to database
+@detail:        All rows, and the spool position if given, are written in
+                one transaction.
+@created:       18th Oct 2026
+@param:         Dictionary of table name to list of row tuples
+@param:         Spool sequence number to record with the rows, if any
+@return:        True: Success
+                False: Failed
+"""
+def sqlite_storeRows(buffer, position=None):
+    try:
+        with sqlite_Current() as connection:
+            for table, rows in buffer.items():
+                fields = TABLE_FIELDS[table]
+                connection.executemany("INSERT INTO `"+table+"` ("+",".join(fields)+") VALUES ("+",".join(["?"]*len(fields))+")", rows)
+            if position is not None:
+                connection.execute("REPLACE INTO `spool_position` (`id`,`position`) VALUES (1,?)", (position,))
+    except sqlite3.Error as error:
+        print("Error: {}".format(error))
+        return False
+    return True
 
+"""
+@brief:         Store Daily Data to database
+@created:       18th Oct 2026
+@return:        True: Success
+                False: Failed
+"""
+def sqlite_storeDaily(dataStructure):
+    try:
+        with sqlite_Current() as connection:
+            connection.execute("INSERT INTO `daily` (epoch,thres_rise_epoch,thres_fall_epoch,thres_perc_exp,pow_max,eng_day,eng_tot_prod,eng_tot_out,eng_tot_in,error_flag) VALUES (?,?,?,?,?,?,?,?,?,?)",
+                               (dataStructure.epoch, dataStructure.thres_rise_epoch, dataStructure.thres_fall_epoch, dataStructure.thres_perc_exp, dataStructure.pow_max, dataStructure.eng_day,
+                                dataStructure.eng_tot_prod, dataStructure.eng_tot_out, dataStructure.eng_tot_in, dataStructure.error_flag))
+    except sqlite3.Error as error:
+        print("Error: {}".format(error))
+        return False
+    return True
+
+"""
+@brief:         Log Message to database
+@created:       18th Oct 2026
+@return:        True: Success
+                False: Failed
+"""
+def sqlite_logMsg(level, message):
+    try:
+        with sqlite_Current() as connection:
+            connection.execute("INSERT INTO `log` (`epoch`,`level`,`message`) VALUES (?,?,?)", (time.time(), level, str(message)))
+    except sqlite3.Error as error:
+        print("Error: {}".format(error))
+        return False
+    return True
+
+"""
+@brief:         Get feed in power from interval database, with a specified time
+@created:       18th Oct 2026
+@return:        None: Failure
+                array: retuned data, in rows of [id, epoch, pow_feed, pow_prod]
+"""
+def sqlite_getPowEpoch(epochStart, epochEnd):
+    try:
+        return sqlite_Current().execute("SELECT `id`, `epoch`, `pow_feed`, `pow_prod` FROM `interval` WHERE `epoch` BETWEEN ? AND ?", (epochStart, epochEnd)).fetchall()
+    except sqlite3.Error as error:
+        print("Error: {}".format(error))
+        return None
+
+"""
+@brief:         Get the maximum produced energy with a time period
+@created:       18th Oct 2026
+@return:        None: Failure
+                array: retuned maximum
+"""
+def sqlite_getMaxProduced(epochStart, epochEnd):
+    try:
+        return sqlite_Current().execute("SELECT MAX(`pow_prod`) AS `pow_prod` FROM `interval` WHERE `epoch` BETWEEN ? AND ?", (epochStart, epochEnd)).fetchall()
+    except sqlite3.Error as error:
+        print("Error: {}".format(error))
+        return None
+
+"""
+@brief:         Get the sequence number of the last spooled row stored
+@created:       18th Oct 2026
+@return:        None: Failure
+                int: sequence number, 0 when none
+"""
+def sqlite_getSpoolPosition():
+    try:
+        rows = sqlite_Current().execute("SELECT `position` FROM `spool_position` WHERE `id` = 1").fetchall()
+    except sqlite3.Error as error:
+        print("Error: {}".format(error))
+        return None
+    if not rows:
+        return 0
+    return int(rows[0][0])
 
+"""
+@brief:         Converts SQL from query() to SQLite placeholders
+"""
+def sqlite_SQL(sql):
+    return sql.replace("%s", "?")
 
+"""
+@brief:         Runs a query, see query()
+@created:       18th Oct 2026
+"""
+def sqlite_query(sql, params):
+    try:
+        return sqlite_Current().execute(sqlite_SQL(sql), params).fetchall()
+    except sqlite3.Error as error:
+        print("Error: {}".format(error))
+        return None
 
+"""
+@brief:         Streams the rows of a query, see iterRange()
+@detail:        SQLite steps through the result as rows are fetched, so
+                only one chunk is held at a time.
+@created:       18th Oct 2026
+"""
+def sqlite_iterQuery(sql, params, chunkRows):
+    try:
+        cursor = sqlite_Current().execute(sqlite_SQL(sql), params)
+        while True:
+            rows = cursor.fetchmany(chunkRows)
+            if not rows:
+                break
+            yield rows
+    except sqlite3.Error as error:
+        print("Error: {}".format(error))
 
+"""
+@brief:         Loads rows in one transaction, see loadRows()
+@created:       18th Oct 2026
+"""
+def sqlite_loadRows(table, fields, rows):
+    return sqlite_executeMany(insertSQL(table, fields), rows)
 
+"""
+@brief:         Runs a statement for each set of parameters, see
+                executeMany()
+@created:       18th Oct 2026
+"""
+def sqlite_executeMany(sql, rows):
+    try:
+        with sqlite_Current() as connection:
+            connection.executemany(sqlite_SQL(sql), rows)
+    except sqlite3.Error as error:
+        print("Error: {}".format(error))
+        return False
+    return True
 
+"""
+@brief:         Applies pending schema migrations, see maria_migrate()
+@detail:        Each migration is one transaction, DDL included. SQLite
+                has no ADD COLUMN IF NOT EXISTS, so a column which is
+                already there is not added again.
+@created:       18th Oct 2026
+@return:        True: Success
+                False: Failed
+"""
+def sqlite_migrate():
+    try:
+        connection = sqlite_Current()
+        with connection:
+            connection.execute(schema.VERSION_TABLE["sqlite"])
+        rows = connection.execute("SELECT `version` FROM `schema_version` WHERE `id` = 1").fetchall()
+        for version, note, statements in schema.pending("sqlite", int(rows[0][0]) if rows else 0):
+            with connection:
+                connection.execute("BEGIN") # sqlite3 does not start one for DDL
+                for statement in statements:
+                    if sqlite_hasColumn(connection, statement):
+                        continue
+                    connection.execute(statement)
+                connection.execute("REPLACE INTO `schema_version` (`id`,`version`) VALUES (1,?)", (version,))
+            print("Database schema upgraded to version "+str(version)+": "+note)
+    except sqlite3.Error as error:
+        print("Error: {}".format(error))
+        return False
+    return True
 
+"""
+@brief:         Checks if a statement adds a column which already exists
+@param:         Connection
+@param:         SQL statement
+@return:        True: "ALTER TABLE `<table>` ADD COLUMN `<column>` ..." of
+                an existing column
+                False: Otherwise
+"""
+def sqlite_hasColumn(connection, statement):
+    parts = statement.split("`")
+    if len(parts) < 4 or parts[0].strip() != "ALTER TABLE" or parts[2].strip() != "ADD COLUMN":
+        return False
+    return parts[3] in [row[1] for row in connection.execute("PRAGMA table_info(`"+parts[1]+"`)")]
 
 
 
 
+"""
+#####################################################################
 
+        Backend Selection
 
+#####################################################################
+"""
+"""
+@brief:         Gets the functions of a database backend
+@detail:        Every backend provides the same set of functions; the
+                generic functions above call whichever backend was
+                selected when this module was loaded.
+@created:       18th Oct 2026
+@param:         Backend name, as configuration.DATABASE_TYPE
+@return:        Namespace of backend functions
+                None when the name is unknown
+"""
+def selectBackend(databaseType):
+    if databaseType == "mariadb":
+        return types.SimpleNamespace(open=maria_Open, close=maria_Close, storeRows=maria_storeRows, storeDaily=maria_storeDaily,
+                                     logMsg=maria_logMsg, getPowEpoch=maria_getPowEpoch, getMaxProduced=maria_getMaxProduced,
+                                     getSpoolPosition=maria_getSpoolPosition, migrate=maria_migrate,
+                                     query=maria_query, executeMany=maria_executeMany, iterQuery=maria_iterQuery,
+                                     loadRows=maria_loadRows)
+    if databaseType == "sqlite":
+        return types.SimpleNamespace(open=sqlite_Open, close=sqlite_Close, storeRows=sqlite_storeRows, storeDaily=sqlite_storeDaily,
+                                     logMsg=sqlite_logMsg, getPowEpoch=sqlite_getPowEpoch, getMaxProduced=sqlite_getMaxProduced,
+                                     getSpoolPosition=sqlite_getSpoolPosition, migrate=sqlite_migrate,
+                                     query=sqlite_query, executeMany=sqlite_executeMany, iterQuery=sqlite_iterQuery,
+                                     loadRows=sqlite_loadRows)
+    return None
 
+backend = selectBackend(configuration.DATABASE_TYPE)
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+@author:         stoberblog
+@detail:         Runs captures on a fixed grid of wall clock times (the
+                 multiples of the interval), timed on the monotonic clock
+                 so that neither slow captures nor clock changes shift
+                 the grid.
+
+                 When a capture runs past the next grid point, the
+                 overrun policy decides what happens to the slots that
+                 were due meanwhile:
+                   skip:     they are dropped, and the next capture waits
+                             for the next grid point
+                   coalesce: one capture is run straight away, for the
+                             latest slot due
+                   catchup:  each is run back to back, up to
+                             SCHED_CATCHUP_MAX of them
+                 Dropped slots, overruns, wall clock steps and how late
+                 each capture started are kept in metrics.
+
+@created:     Sunday 18th October 2026
+@modified:    Sunday 18th October 2026
+@version:     0.1
+
+@change:
+
+@license:     MIT License
+
+                Copyright (c) 2017 stoberblog
+
+                Permission is hereby granted, free of charge, to any person obtaining a copy
+                of this software and associated documentation files (the "Software"), to deal
+                in the Software without restriction, including without limitation the rights
+                to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+                copies of the Software, and to permit persons to whom the Software is
+                furnished to do so, subject to the following conditions:
+
+                The above copyright notice and this permission notice shall be included in all
+                copies or substantial portions of the Software.
+
+                THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+                IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+                FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+                AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+                LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+                OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+                SOFTWARE.
+"""
+
+import time
+
+import configuration
+import eventLog
+
+POLICIES = ["skip", "coalesce", "catchup"]
+CLOCK_CHECK = 1.0   # Most seconds slept before checking the wall clock again
+
+
+"""
+@brief:        Deadline schedule of one interval
+@param:        Interval (seconds)
+@param:        Overrun policy, one of POLICIES
+@created:      18th Oct 2026
+"""
+class DeadlineSchedule:
+    def __init__(self, interval, policy="skip"):
+        if policy not in POLICIES:
+            raise ValueError("Unknown overrun policy "+str(policy))
+        self.interval = interval
+        self.policy = policy
+        self.metrics = {"captures": 0,      # Slots run
+                        "missed": 0,        # Slots dropped
+                        "overruns": 0,      # Times a capture ran past the next slot
+                        "clockSteps": 0,    # Wall clock jumps the schedule was realigned to
+                        "skewLast": 0.0,    # Seconds the last capture started after its slot
+                        "skewMax": 0.0,
+                        "skewTotal": 0.0}
+        wall = time.time()
+        self.slot = (wall//interval+1)*interval    # Epoch of the next slot
+        self.deadline = time.monotonic()+self.slot-wall
+
+    """
+    @brief:        Realigns the schedule when the wall clock has jumped
+                   (e.g. stepped by NTP)
+    @detail:       The slot stays the same; only its deadline moves, so no
+                   slot is ever run twice. A slot left in the past is
+                   handled as an overrun.
+    @return:       True when the schedule was realigned
+    """
+    def checkClock(self):
+        wall = time.time()
+        deadline = time.monotonic()+self.slot-wall
+        if abs(deadline-self.deadline) < configuration.SCHED_CLOCK_STEP:
+            return False
+        self.deadline = deadline
+        self.metrics["clockSteps"] += 1
+        eventLog.log(eventLog.LEVELS["NOTICE"], "Wall clock stepped, schedule realigned")
+        return True
+
+    """
+    @brief:        Moves past slots which are due already, as the overrun
+                   policy says
+    @return:       none
+    """
+    def handleOverrun(self):
+        late = time.monotonic()-self.deadline
+        if late < 0:
+            return
+        due = int(late//self.interval)+1    # Slots whose time has come
+        if self.policy == "skip":
+            drop = due
+        elif self.policy == "coalesce":
+            drop = due-1
+        else:
+            drop = max(0, due-configuration.SCHED_CATCHUP_MAX)
+        self.metrics["overruns"] += 1
+        self.metrics["missed"] += drop
+        self.slot += drop*self.interval
+        self.deadline += drop*self.interval
+        if drop > 0:
+            eventLog.log(eventLog.LEVELS["ERROR"], "Capture overran, intervals missed ("+self.policy+")")
+
+    """
+    @brief:        Waits for the next slot
+    @detail:       Called again once its capture is done.
+    @param:        threading.Event which stops the wait when set, or None
+    @return:       Epoch of the slot, a multiple of the interval
+                   None when stopped
+    """
+    def wait(self, stop=None):
+        self.checkClock()
+        self.handleOverrun()
+        while True:
+            if stop is not None and stop.is_set():
+                return None
+            remaining = self.deadline-time.monotonic()
+            if remaining <= 0:
+                break
+            if stop is not None:
+                stop.wait(min(remaining, CLOCK_CHECK))
+            else:
+                time.sleep(min(remaining, CLOCK_CHECK))
+            if self.checkClock():
+                self.handleOverrun()
+        skew = time.monotonic()-self.deadline
+        self.metrics["captures"] += 1
+        self.metrics["skewLast"] = skew
+        self.metrics["skewMax"] = max(self.metrics["skewMax"], skew)
+        self.metrics["skewTotal"] += skew
+        eventLog.log(eventLog.LEVELS["DEBUG"], "Capture of {} started {:.3f} s late".format(self.slot, skew))
+        slot = self.slot
+        self.slot += self.interval
+        self.deadline += self.interval
+        return slot
+
+    """
+    @brief:        Summarises the metrics
+    @return:       String
+    """
+    def summary(self):
+        metrics = self.metrics
+        return "{} captures, {} intervals missed, {} overruns, {} clock steps, start skew mean {:.3f} s max {:.3f} s".format(
+            metrics["captures"], metrics["missed"], metrics["overruns"], metrics["clockSteps"],
+            metrics["skewTotal"]/max(1, metrics["captures"]), metrics["skewMax"])
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+@author:         stoberblog
+@detail:         Log pipeline. Records below LOG_LEVEL are dropped before
+                 any other work, and the rest are queued for a background
+                 writer which stores them in the log table in batches, so
+                 logging never waits on the database.
+
+                 A message repeated within LOG_REPEAT_SECONDS is only
+                 counted, and written once more with the count when the
+                 period is over, so an offline inverter logs a failure
+                 once rather than on every read.
+
+@created:     Sunday 18th October 2026
+@modified:    Sunday 18th October 2026
+@version:     0.1
+
+@change:
+
+@license:     MIT License
+
+                Copyright (c) 2017 stoberblog
+
+                Permission is hereby granted, free of charge, to any person obtaining a copy
+                of this software and associated documentation files (the "Software"), to deal
+                in the Software without restriction, including without limitation the rights
+                to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+                copies of the Software, and to permit persons to whom the Software is
+                furnished to do so, subject to the following conditions:
+
+                The above copyright notice and this permission notice shall be included in all
+                copies or substantial portions of the Software.
+
+                THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+                IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+                FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+                AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+                LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+                OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+                SOFTWARE.
+"""
+
+import queue
+import threading
+import time
+
+import configuration
+import database
+
+'''
+ Log levels, as the LOG_LEVEL setting. A record is kept when its level
+ is at or below LOG_LEVEL (FATAL is the most severe).
+'''
+LEVELS = {"NONE": 0, "FATAL": 1, "ERROR": 2, "NOTICE": 3, "DEBUG": 4}
+threshold = LEVELS.get(str(configuration.LOG_LEVEL).upper(), LEVELS["ERROR"])
+
+records = queue.Queue(configuration.LOG_QUEUE_SIZE) # (epoch, level, message) waiting for the writer
+repeats = {}            # (level, message) -> [epoch first logged, repeats since]
+repeatLock = threading.Lock()
+dropped = 0             # Records lost to a full queue, since last written
+stopping = threading.Event()
+writer = None
+
+
+"""
+@brief:        Logs a message
+@detail:       Returns straight away; the record is written by the
+               writer thread (see start()).
+@created:      18th Oct 2026
+@param:        Level (1 FATAL to 4 DEBUG, as collectData.ErrorLevels)
+@param:        Message
+@return:       none
+"""
+def log(level, message):
+    if level > threshold:
+        return
+    key = (level, str(message))
+    now = time.time()
+    with repeatLock:
+        seen = repeats.get(key)
+        if seen is not None and now-seen[0] < configuration.LOG_REPEAT_SECONDS:
+            seen[1] += 1
+            return
+        repeats[key] = [now, 0]
+    if seen is not None and seen[1] > 0:
+        summarise(key, seen)
+    enqueue(now, level, key[1])
+
+"""
+@brief:        Queues a record for the writer
+@detail:       When the queue is full the record is dropped and counted.
+@return:       none
+"""
+def enqueue(epoch, level, message):
+    global dropped
+    try:
+        records.put_nowait((int(epoch), level, message))
+    except queue.Full:
+        with repeatLock:
+            dropped += 1
+
+"""
+@brief:        Queues the count of a message's repeats
+@param:        (level, message)
+@param:        [epoch first logged, repeats since]
+@return:       none
+"""
+def summarise(key, seen):
+    enqueue(seen[0]+configuration.LOG_REPEAT_SECONDS, key[0],
+            "{} (repeated {} times in {} s)".format(key[1], seen[1], configuration.LOG_REPEAT_SECONDS))
+
+"""
+@brief:        Queues the counts of repeats whose period is over
+@param:        True to queue every count, when stopping
+@return:       none
+"""
+def flushRepeats(everything):
+    now = time.time()
+    with repeatLock:
+        over = [(key, seen) for key, seen in repeats.items() if everything or now-seen[0] >= configuration.LOG_REPEAT_SECONDS]
+        for key, seen in over:
+            del repeats[key]
+    for key, seen in over:
+        if seen[1] > 0:
+            summarise(key, seen)
+
+"""
+@brief:        Writer thread, storing queued records every
+               LOG_BATCH_SECONDS, and once more when stopped
+@detail:       Records which could not be stored are kept for the next
+               batch, up to LOG_QUEUE_SIZE of them.
+@created:      18th Oct 2026
+@return:       none
+"""
+def writerThread():
+    global dropped
+    pending = []
+    while True:
+        stopped = stopping.wait(configuration.LOG_BATCH_SECONDS)
+        flushRepeats(stopped)
+        while True:
+            try:
+                pending.append(records.get_nowait())
+            except queue.Empty:
+                break
+        with repeatLock:
+            lost, dropped = dropped, 0
+        if lost > 0:
+            pending.append((int(time.time()), LEVELS["ERROR"], "{} log records dropped, queue full".format(lost)))
+        if pending and database.storeLogs(pending):
+            pending = []
+        pending = pending[-configuration.LOG_QUEUE_SIZE:]
+        if stopped:
+            return
+
+"""
+@brief:        Starts the writer thread
+@created:      18th Oct 2026
+@return:       none
+"""
+def start():
+    global writer
+    if writer is not None or threshold == LEVELS["NONE"]:
+        return
+    writer = threading.Thread(target=writerThread)
+    writer.daemon = True
+    writer.start()
+
+"""
+@brief:        Stops the writer thread, once queued records are written
+@param:        Most seconds to wait for the writer
+@created:      18th Oct 2026
+@return:       none
+"""
+def stop(timeout=10):
+    stopping.set()
+    if writer is not None:
+        writer.join(timeout)
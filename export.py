@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+"""
+@author:         stoberblog
+@detail:         Exports the interval, daily or sample table to files,
+                 one or more per day or month: gzipped CSV, or with
+                 pyarrow installed, Parquet or Arrow IPC (zstd
+                 compressed). Rows are streamed from the database a chunk
+                 at a time, so memory use does not grow with the range.
+
+                 The epoch of the last row exported is kept in
+                 <directory>/<table>.state, and the next export carries on
+                 after it. Each run writes new files, named after their
+                 first epoch, so files already exported are never
+                 rewritten.
+
+                 python export.py interval --format parquet --partition month
+
+@created:     Sunday 18th October 2026
+@modified:    Sunday 18th October 2026
+@version:     0.1
+
+@change:
+
+@license:     MIT License
+
+                Copyright (c) 2017 stoberblog
+
+                Permission is hereby granted, free of charge, to any person obtaining a copy
+                of this software and associated documentation files (the "Software"), to deal
+                in the Software without restriction, including without limitation the rights
+                to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+                copies of the Software, and to permit persons to whom the Software is
+                furnished to do so, subject to the following conditions:
+
+                The above copyright notice and this permission notice shall be included in all
+                copies or substantial portions of the Software.
+
+                THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+                IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+                FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+                AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+                LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+                OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+                SOFTWARE.
+"""
+
+import argparse
+import csv
+import gzip
+import json
+import os
+import time
+
+import database
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None  # Only CSV can be exported
+
+FORMATS = {"csv": ".csv.gz", "parquet": ".parquet", "arrow": ".arrow"}     # File extension of each format
+TABLES = {"interval": database.INTERVAL_FIELDS, "daily": database.DAILY_FIELDS, "sample": database.SAMPLE_FIELDS}
+
+
+"""
+@brief:        Writes rows to a gzipped CSV file, with a header line
+@detail:       Missing values (None) are written as empty fields.
+@created:      18th Oct 2026
+"""
+class CsvWriter:
+    def __init__(self, path, fields):
+        self.file = gzip.open(path, "wt", newline="")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(fields)
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+
+"""
+@brief:        Writes rows to a Parquet or Arrow IPC file
+@detail:       epoch is an integer column (a float for the sample table),
+               every other column a float.
+@created:      18th Oct 2026
+"""
+class ArrowWriter:
+    def __init__(self, path, table, fields, fileFormat):
+        self.schema = pyarrow.schema([(field, pyarrow.int64() if field == "epoch" and table != "sample" else pyarrow.float64())
+                                      for field in fields])
+        if fileFormat == "parquet":
+            self.writer = pyarrow.parquet.ParquetWriter(path, self.schema, compression="zstd")
+        else:
+            self.writer = pyarrow.ipc.new_file(path, self.schema, options=pyarrow.ipc.IpcWriteOptions(compression="zstd"))
+
+    def write(self, rows):
+        columns = list(zip(*rows))
+        arrays = [pyarrow.array(columns[i], type=self.schema.field(i).type) for i in range(len(columns))]
+        self.writer.write_table(pyarrow.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+"""
+@brief:        Finds the partition an epoch falls in
+@param:        Epoch
+@param:        "day" or "month" (local time)
+@return:       (name, epoch the partition ends)
+"""
+def partitionOf(epoch, partition):
+    t = time.localtime(epoch)
+    if partition == "month":
+        return (time.strftime("%Y-%m", t), time.mktime((t.tm_year, t.tm_mon+1, 1, 0, 0, 0, 0, 0, -1)))
+    return (time.strftime("%Y-%m-%d", t), time.mktime((t.tm_year, t.tm_mon, t.tm_mday+1, 0, 0, 0, 0, 0, -1)))
+
+"""
+@brief:        Reads the epoch of the last row exported
+@return:       Epoch
+               None when nothing has been exported
+"""
+def loadState(stateFile):
+    try:
+        with open(stateFile) as state:
+            return json.load(state)["epoch"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+"""
+@brief:        Records the epoch of the last row exported
+@detail:       Written to a temporary file and moved into place, so a
+               crash cannot leave a half written file.
+@return:       none
+"""
+def saveState(stateFile, epoch):
+    with open(stateFile+".tmp", "w") as state:
+        json.dump({"epoch": epoch}, state)
+    os.replace(stateFile+".tmp", stateFile)
+
+
+"""
+@brief:        Exports a table
+@detail:       A file is written as <name>-<first epoch>.tmp and renamed
+               when complete, and the state saved after each file, so an
+               interrupted export carries on from the last complete file.
+@created:      18th Oct 2026
+@param:        Table name, a key of TABLES
+@param:        Directory to export to
+@param:        Format, a key of FORMATS
+@param:        "day" or "month"
+@param:        Start epoch (inclusive), by default after the last row
+               exported
+@param:        End epoch (inclusive), now by default
+@return:       Rows exported
+"""
+def export(table, directory, fileFormat="csv", partition="day", epochStart=None, epochEnd=None):
+    if fileFormat != "csv" and pyarrow is None:
+        raise ValueError(fileFormat+" export needs pyarrow")
+    fields = TABLES[table]
+    tableDirectory = os.path.join(directory, table)
+    if not os.path.isdir(tableDirectory):
+        os.makedirs(tableDirectory)
+    stateFile = os.path.join(directory, table+".state")
+    after = None
+    if epochStart is None:
+        after = loadState(stateFile)
+        epochStart = after if after is not None else 0
+    if epochEnd is None:
+        epochEnd = time.time()
+
+    writer = None
+    exported = 0
+    for rows in database.iterRange(table, fields, epochStart, epochEnd):
+        run = []    # Rows of the chunk in the current partition
+        for row in rows:
+            if after is not None and row[0] <= after:
+                continue    # Exported last time
+            if writer is not None and row[0] >= partitionEnd:
+                writer.write(run)
+                writer.close()
+                os.replace(tmpPath, path)
+                saveState(stateFile, lastEpoch)
+                run = []
+                writer = None
+            if writer is None:
+                name, partitionEnd = partitionOf(row[0], partition)
+                path = os.path.join(tableDirectory, "{}-{}{}".format(name, int(row[0]), FORMATS[fileFormat]))
+                tmpPath = path+".tmp"
+                if fileFormat == "csv":
+                    writer = CsvWriter(tmpPath, fields)
+                else:
+                    writer = ArrowWriter(tmpPath, table, fields, fileFormat)
+            run.append(row)
+            lastEpoch = row[0]
+            exported += 1
+        if run:
+            writer.write(run)
+    if writer is not None:
+        writer.close()
+        os.replace(tmpPath, path)
+        saveState(stateFile, lastEpoch)
+    return exported
+
+
+"""
+@brief:        Reads a time argument, an epoch or a local date
+               ("YYYY-MM-DD")
+"""
+def parseTime(text):
+    try:
+        return float(text)
+    except ValueError:
+        return time.mktime(time.strptime(text, "%Y-%m-%d"))
+
+
+"""
+@brief:        When run directly, export as given on the command line
+"""
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export interval, daily or sample history to files")
+    parser.add_argument("table", choices=sorted(TABLES))
+    parser.add_argument("--format", choices=sorted(FORMATS), default="csv", help="parquet and arrow need pyarrow")
+    parser.add_argument("--partition", choices=["day", "month"], default="day", help="files per day or month")
+    parser.add_argument("--directory", default="export")
+    parser.add_argument("--start", type=parseTime, help="epoch or YYYY-MM-DD, by default after the last export")
+    parser.add_argument("--end", type=parseTime, help="epoch or YYYY-MM-DD, now by default")
+    args = parser.parse_args()
+
+    if not database.openConnection():
+        raise SystemExit("Could not connect to the database")
+    count = export(args.table, args.directory, args.format, args.partition, args.start, args.end)
+    database.closeConnection()
+    print("Exported "+str(count)+" rows of "+args.table+" to "+args.directory)
@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+"""
+@author:         stoberblog
+@detail:         Imports CSV history (e.g. from the Fronius portal or an
+                 older logger) into the interval or daily table. Files
+                 are read a batch at a time, and each batch is checked,
+                 has rows already in the database (or earlier in the
+                 file) left out, and is loaded by the backend's bulk path
+                 (database.loadRows()).
+
+                 Columns are matched to table columns by name, or as
+                 mapped with --column. Times are read from an epoch
+                 column, or from a local date and time column with
+                 --time-column and --time-format.
+
+                 Rows are deduplicated by epoch, or by local day for the
+                 daily table. The tables hold one device, so a file with
+                 a device column must be narrowed to one with --device.
+
+                 After an interval import, the rollups of the hours
+                 imported are rebuilt, and daily rows are added for the
+                 days imported which have none.
+
+                 python importer.py interval dump.csv --time-column "Date and time" --time-format "%d.%m.%Y %H:%M"
+
+@created:     Sunday 18th October 2026
+@modified:    Sunday 18th October 2026
+@version:     0.1
+
+@change:
+
+@license:     MIT License
+
+                Copyright (c) 2017 stoberblog
+
+                Permission is hereby granted, free of charge, to any person obtaining a copy
+                of this software and associated documentation files (the "Software"), to deal
+                in the Software without restriction, including without limitation the rights
+                to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+                copies of the Software, and to permit persons to whom the Software is
+                furnished to do so, subject to the following conditions:
+
+                The above copyright notice and this permission notice shall be included in all
+                copies or substantial portions of the Software.
+
+                THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+                IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+                FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+                AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+                LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+                OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+                SOFTWARE.
+"""
+
+import argparse
+import csv
+import gzip
+import math
+import time
+
+import configuration
+import dailyStats
+import database
+import rollup
+
+TABLES = {"interval": database.INTERVAL_FIELDS, "daily": database.DAILY_FIELDS}
+
+
+"""
+@brief:        Import of one table, keeping counts across files
+@param:        Table name, a key of TABLES
+@param:        Dictionary of file column name to table column name
+@param:        Time column name, None to read epoch
+@param:        strptime() format of the time column
+@param:        Device to import, None when the file has no device column
+@created:      18th Oct 2026
+"""
+class Importer:
+    def __init__(self, table, columns=None, timeColumn=None, timeFormat=None, device=None):
+        self.table = table
+        self.fields = TABLES[table]
+        self.columns = columns or {}
+        self.timeColumn = timeColumn
+        self.timeFormat = timeFormat
+        self.device = device
+        self.loaded = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.first = None       # Range of epochs loaded
+        self.last = None
+        self.days = set()       # Local days loaded
+
+    """
+    @brief:        Works out where each table column comes from
+    @param:        Header line of the file
+    @return:       List of (table column, file column index), and the
+                   index of the time and device columns (or None)
+    """
+    def mapHeader(self, header):
+        names = [name.strip() for name in header]
+        lookup = dict((name.lower(), i) for i, name in enumerate(names))
+        for source, field in self.columns.items():
+            if source.lower() in lookup:
+                lookup[field.lower()] = lookup[source.lower()]
+        mapping = [(field, lookup[field.lower()]) for field in self.fields if field.lower() in lookup]
+        timeIndex = lookup.get((self.timeColumn or "epoch").lower())
+        if timeIndex is None:
+            raise ValueError("No "+(self.timeColumn or "epoch")+" column")
+        return mapping, timeIndex, lookup.get("device")
+
+    """
+    @brief:        Reads one line into a table row
+    @return:       Row (list in TABLE column order)
+                   None when the line is not valid
+    """
+    def parseLine(self, line, mapping, timeIndex):
+        row = dict.fromkeys(self.fields)
+        try:
+            text = line[timeIndex].strip()
+            if self.timeColumn is None:
+                row["epoch"] = int(float(text))
+            else:
+                row["epoch"] = int(time.mktime(time.strptime(text, self.timeFormat)))
+            for field, index in mapping:
+                if field != "epoch" and line[index].strip() != "":
+                    row[field] = float(line[index])
+        except (ValueError, IndexError, OverflowError):
+            return None
+        if row["epoch"] <= 0 or any(isinstance(value, float) and not math.isfinite(value) for value in row.values()):
+            return None
+        return [row[field] for field in self.fields]
+
+    """
+    @brief:        Gets the key rows are deduplicated on
+    """
+    def key(self, epoch):
+        if self.table == "daily":
+            return dailyStats.localDay(epoch)
+        return epoch
+
+    """
+    @brief:        Loads a batch, leaving out rows already stored
+    @param:        Dictionary of key to row
+    @return:       True: Success
+                   False: Failed
+    """
+    def loadBatch(self, batch):
+        if not batch:
+            return True
+        epochs = [row[0] for row in batch.values()]
+        margin = 86400 if self.table == "daily" else 0     # Rows of the same day may have other times
+        stored = database.query("SELECT `epoch` FROM `"+self.table+"` WHERE `epoch` BETWEEN %s AND %s",
+                                (min(epochs)-margin, max(epochs)+margin))
+        if stored is None:
+            return False
+        stored = set(self.key(int(row[0])) for row in stored)
+        rows = sorted([row for key, row in batch.items() if key not in stored], key=lambda row: row[0])
+        self.duplicates += len(batch)-len(rows)
+        if not rows:
+            return True
+        if not database.loadRows(self.table, self.fields, rows):
+            return False
+        self.loaded += len(rows)
+        self.first = rows[0][0] if self.first is None else min(self.first, rows[0][0])
+        self.last = rows[-1][0] if self.last is None else max(self.last, rows[-1][0])
+        self.days.update(dailyStats.localDay(row[0]) for row in rows)
+        return True
+
+    """
+    @brief:        Imports a CSV file (gzipped when named .gz)
+    @param:        File name
+    @param:        Field delimiter
+    @return:       True: Success
+                   False: Failed, rows of earlier batches stay loaded
+    """
+    def importFile(self, fileName, delimiter=","):
+        opener = gzip.open if fileName.endswith(".gz") else open
+        with opener(fileName, "rt", newline="") as dataFile:
+            reader = csv.reader(dataFile, delimiter=delimiter)
+            mapping, timeIndex, deviceIndex = self.mapHeader(next(reader))
+            device = self.device
+            batch = {}
+            for line in reader:
+                if deviceIndex is not None and deviceIndex < len(line):
+                    if device is None:
+                        device = line[deviceIndex]
+                    elif line[deviceIndex] != device:
+                        if self.device is None:
+                            raise ValueError("More than one device in "+fileName+", choose one with --device")
+                        continue
+                row = self.parseLine(line, mapping, timeIndex)
+                if row is None:
+                    self.rejected += 1
+                    continue
+                key = self.key(row[0])
+                if key in batch:
+                    self.duplicates += 1
+                    continue
+                batch[key] = row
+                if len(batch) >= configuration.IMPORT_BATCH_ROWS:
+                    if not self.loadBatch(batch):
+                        return False
+                    batch = {}
+            return self.loadBatch(batch)
+
+    """
+    @brief:        Brings the rollups and daily rows up to date with the
+                   rows imported
+    @return:       True: Success
+                   False: Failed
+    """
+    def finish(self):
+        if self.table != "interval" or self.first is None:
+            return True
+        return rollup.rebuild(self.first, self.last) and rebuildDaily(self.days)
+
+
+"""
+@brief:        Adds daily rows for days of interval data which have none
+@detail:       Each day is replayed through dailyStats.DailyStats, as when
+               captured. eng_day is the change of eng_tot_prod over the
+               day's intervals, and the counters are their last reading.
+               Days with a daily row, and today, are left alone.
+@created:      18th Oct 2026
+@param:        Set of local days ("YYYY-MM-DD")
+@return:       True: Success
+               False: Failed
+"""
+def rebuildDaily(days):
+    days = sorted(days - set([dailyStats.localDay(time.time())]))
+    if not days:
+        return True
+    start = time.mktime(time.strptime(days[0], "%Y-%m-%d"))
+    end = time.mktime(time.strptime(days[-1], "%Y-%m-%d"))+2*86400
+    stored = database.query("SELECT `epoch` FROM `daily` WHERE `epoch` BETWEEN %s AND %s", (start, end))
+    if stored is None:
+        return False
+    wanted = set(days) - set(dailyStats.localDay(int(row[0])) for row in stored)
+    fields = ["epoch", "pow_prod", "pow_feed", "eng_tot_prod", "eng_tot_out", "eng_tot_in"]
+    stats = dailyStats.DailyStats()
+    rows = []
+    day = None
+    for chunk in database.iterRange("interval", fields, start, end):
+        for epoch, powProd, powFeed, engProd, engOut, engIn in chunk:
+            if dailyStats.localDay(epoch) != day:
+                if day in wanted:
+                    rows.append(dailyRow(stats, last, firstProd))
+                day = dailyStats.localDay(epoch)
+                stats.reset(day)
+                firstProd = None
+                last = None
+            stats.add(epoch, powProd, powFeed)
+            if engProd is not None and firstProd is None:
+                firstProd = engProd
+            last = [epoch, engProd if engProd is not None or last is None else last[1],
+                    engOut if engOut is not None or last is None else last[2],
+                    engIn if engIn is not None or last is None else last[3]]
+    if day in wanted:
+        rows.append(dailyRow(stats, last, firstProd))
+    return database.loadRows("daily", database.DAILY_FIELDS, rows)
+
+"""
+@brief:        Builds a daily row, see rebuildDaily()
+@param:        DailyStats of the day
+@param:        [last epoch, eng_tot_prod, eng_tot_out, eng_tot_in], the
+               last reading of each counter
+@param:        First reading of eng_tot_prod
+@return:       Row (list in DAILY_FIELDS order)
+"""
+def dailyRow(stats, last, firstProd):
+    engDay = last[1]-firstProd if last[1] is not None and firstProd is not None else None
+    row = {"epoch": int(last[0]), "thres_rise_epoch": stats.rise or 0, "thres_fall_epoch": stats.fall or 0,
+           "thres_perc_exp": stats.percentExported(), "pow_max": stats.powMax if stats.rise is not None else None,
+           "eng_day": engDay, "eng_tot_prod": last[1], "eng_tot_out": last[2], "eng_tot_in": last[3], "error_flag": 0}
+    return [row[field] for field in database.DAILY_FIELDS]
+
+
+"""
+@brief:        Reads a --column argument, "<file column>=<table column>"
+"""
+def parseColumn(text):
+    source, sep, field = text.partition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError("expected <file column>=<table column>")
+    return (source.strip(), field.strip())
+
+
+"""
+@brief:        When run directly, import the files given on the command
+               line
+"""
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import CSV history into the interval or daily table")
+    parser.add_argument("table", choices=sorted(TABLES))
+    parser.add_argument("files", nargs="+", help="CSV files, optionally gzipped (.gz)")
+    parser.add_argument("--column", type=parseColumn, action="append", default=[], metavar="FILE=TABLE",
+                        help="read a table column from a differently named file column")
+    parser.add_argument("--time-column", help="local date and time column, instead of epoch")
+    parser.add_argument("--time-format", default="%Y-%m-%d %H:%M:%S", help="strptime() format of --time-column")
+    parser.add_argument("--device", help="device to import, when the file has a device column")
+    parser.add_argument("--delimiter", default=",")
+    args = parser.parse_args()
+
+    if not database.openConnection():
+        raise SystemExit("Could not connect to the database")
+    importer = Importer(args.table, dict(args.column), args.time_column, args.time_format, args.device)
+    for fileName in args.files:
+        if not importer.importFile(fileName, args.delimiter):
+            print("Import of "+fileName+" failed")
+            break
+    else:
+        if not importer.finish():
+            print("Rebuilding rollups and daily rows failed")
+    database.closeConnection()
+    print("Loaded "+str(importer.loaded)+" rows, "+str(importer.duplicates)+" duplicates and "+
+          str(importer.rejected)+" invalid rows left out")
@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+"""
+@author:         stoberblog
+@detail:         Maintains hourly and monthly rollups of the interval
+                 table, and removes raw rows older than the retention
+                 window. Long range reports can read the small rollup
+                 tables instead of every raw row.
+
+                 Hours are rolled up once complete, as soon as a later
+                 interval row has been stored. Rows reach the database
+                 in order (see spool.py), so no late rows are missed.
+
+@created:     Sunday 18th October 2026
+@modified:    Sunday 18th October 2026
+@version:     0.1
+
+@change:
+
+@license:     MIT License
+
+                Copyright (c) 2017 stoberblog
+
+                Permission is hereby granted, free of charge, to any person obtaining a copy
+                of this software and associated documentation files (the "Software"), to deal
+                in the Software without restriction, including without limitation the rights
+                to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+                copies of the Software, and to permit persons to whom the Software is
+                furnished to do so, subject to the following conditions:
+
+                The above copyright notice and this permission notice shall be included in all
+                copies or substantial portions of the Software.
+
+                THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+                IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+                FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+                AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+                LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+                OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+                SOFTWARE.
+"""
+
+import threading
+import time
+
+import configuration
+import database
+
+HOUR = 3600
+
+'''
+ Columns of interval_hour and interval_month, in the order written
+'''
+ROLLUP_FIELDS = ["epoch", "samples", "pow_prod_avg", "pow_prod_min", "pow_prod_max", "pow_feed_avg", "pow_feed_min", "pow_feed_max",
+                 "volt_feed_avg", "volt_feed_min", "volt_feed_max", "freq_feed_avg", "freq_feed_min", "freq_feed_max",
+                 "eng_tot_prod", "eng_tot_out", "eng_tot_in", "eng_prod", "eng_out", "eng_in"]
+COUNTERS = ["eng_tot_prod", "eng_tot_out", "eng_tot_in"]    # Energy counters, at the end of the bucket
+DELTAS = ["eng_prod", "eng_out", "eng_in"]                  # Energy over the bucket, from the counters
+
+'''
+ Aggregates one range of interval rows per hour. The counters are the
+ highest in the hour; deltas are worked out in Python from the hour
+ before.
+'''
+HOUR_QUERY = ("SELECT `epoch` - `epoch` % 3600 AS `hour`, COUNT(*), "
+              "AVG(`pow_prod`), MIN(COALESCE(`pow_prod_min`, `pow_prod`)), MAX(COALESCE(`pow_prod_max`, `pow_prod`)), "
+              "AVG(`pow_feed`), MIN(COALESCE(`pow_feed_min`, `pow_feed`)), MAX(COALESCE(`pow_feed_max`, `pow_feed`)), "
+              "AVG(`volt_feed`), MIN(COALESCE(`volt_feed_min`, `volt_feed`)), MAX(COALESCE(`volt_feed_max`, `volt_feed`)), "
+              "AVG(`freq_feed`), MIN(COALESCE(`freq_feed_min`, `freq_feed`)), MAX(COALESCE(`freq_feed_max`, `freq_feed`)), "
+              "MAX(`eng_tot_prod`), MAX(`eng_tot_out`), MAX(`eng_tot_in`) "
+              "FROM `interval` WHERE `epoch` >= %s AND `epoch` < %s GROUP BY `hour` ORDER BY `hour`")
+
+
+"""
+@brief:        Works out energy deltas from counters
+@param:        Counters at the end of this bucket
+@param:        Counters at the end of the previous bucket (or Nones)
+@created:      18th Oct 2026
+@return:       List of deltas; None where either counter is missing or
+               the counter went backwards (e.g. a replaced inverter)
+"""
+def counterDeltas(counters, previous):
+    deltas = []
+    for now, before in zip(counters, previous):
+        if now is None or before is None or now < before:
+            deltas.append(None)
+        else:
+            deltas.append(now-before)
+    return deltas
+
+"""
+@brief:        Gets the start of the local calendar month holding an epoch
+@created:      18th Oct 2026
+@return:       Epoch
+"""
+def monthStart(epoch):
+    local = time.localtime(epoch)
+    return int(time.mktime((local.tm_year, local.tm_mon, 1, 0, 0, 0, 0, 0, -1)))
+
+"""
+@brief:        Gets the start of the month after the one holding an epoch
+@created:      18th Oct 2026
+@return:       Epoch
+"""
+def nextMonthStart(epoch):
+    local = time.localtime(epoch)
+    if local.tm_mon == 12:
+        return int(time.mktime((local.tm_year+1, 1, 1, 0, 0, 0, 0, 0, -1)))
+    return int(time.mktime((local.tm_year, local.tm_mon+1, 1, 0, 0, 0, 0, 0, -1)))
+
+"""
+@brief:        Rolls up complete hours not rolled up yet
+@detail:       Works through ROLLUP_CHUNK_HOURS hours per query, so the
+               first run over years of data does not load it all at once.
+@created:      18th Oct 2026
+@return:       Set of month starts with new hours
+               None when failed
+"""
+def rollupHours():
+    last = database.query("SELECT MAX(`epoch`) FROM `interval_hour`")
+    newest = database.query("SELECT MIN(`epoch`), MAX(`epoch`) FROM `interval`")
+    if last is None or newest is None:
+        return None
+    if newest[0][1] is None:
+        return set()
+    end = int(newest[0][1]) // HOUR * HOUR      # Hours before the newest row's are complete
+    if last[0][0] is None:
+        start = int(newest[0][0]) // HOUR * HOUR
+        previous = [None]*len(COUNTERS)
+    else:
+        start = int(last[0][0])+HOUR
+        rows = database.query("SELECT `eng_tot_prod`, `eng_tot_out`, `eng_tot_in` FROM `interval_hour` WHERE `epoch` = %s", (int(last[0][0]),))
+        if rows is None:
+            return None
+        previous = list(rows[0])
+    return rollupRange(start, end, previous)
+
+"""
+@brief:        Rolls up the hours of a range, replacing any rolled up
+               already
+@param:        Start of the first hour
+@param:        End of the last hour
+@param:        Counters at the end of the hour before the range (or Nones)
+@created:      18th Oct 2026
+@return:       Set of month starts with new hours
+               None when failed
+"""
+def rollupRange(start, end, previous):
+    months = set()
+    while start < end:
+        stop = min(end, start+configuration.ROLLUP_CHUNK_HOURS*HOUR)
+        rows = database.query(HOUR_QUERY, (start, stop))
+        if rows is None:
+            return None
+        rollups = []
+        for row in rows:
+            counters = list(row[14:17])
+            rollups.append([int(row[0])]+list(row[1:])+counterDeltas(counters, previous))
+            # Keep the last known counter over hours where it was not read
+            previous = [before if now is None else now for now, before in zip(counters, previous)]
+            months.add(monthStart(int(row[0])))
+        if rollups and not storeRollups("interval_hour", rollups):
+            return None
+        start = stop
+    return months
+
+"""
+@brief:        Rolls up a range again, after rows were added to it (e.g.
+               by importer.py)
+@detail:       Only hours already rolled up are redone, and the hour after
+               the range too, as its deltas follow from the range; later
+               hours are rolled up by update() as usual.
+@param:        First epoch of the new rows
+@param:        Last epoch of the new rows
+@created:      18th Oct 2026
+@return:       True: Success
+               False: Failed
+"""
+def rebuild(epochStart, epochEnd):
+    last = database.query("SELECT MAX(`epoch`) FROM `interval_hour`")
+    if last is None:
+        return False
+    if last[0][0] is not None:
+        start = int(epochStart) // HOUR * HOUR
+        end = min(int(epochEnd) // HOUR * HOUR + 2*HOUR, int(last[0][0])+HOUR)
+        rows = database.query("SELECT `eng_tot_prod`, `eng_tot_out`, `eng_tot_in` FROM `interval_hour` "
+                              "WHERE `epoch` < %s ORDER BY `epoch` DESC LIMIT 1", (start,))
+        if rows is None:
+            return False
+        months = rollupRange(start, end, list(rows[0]) if rows else [None]*len(COUNTERS)) if start < end else set()
+        if months is None:
+            return False
+        if months and not rollupMonths(months):
+            return False
+    return update()
+
+"""
+@brief:        Rebuilds the monthly rollup of the given months from the
+               hourly rollup
+@param:        Set of month starts
+@created:      18th Oct 2026
+@return:       True: Success
+               False: Failed
+"""
+def rollupMonths(months):
+    rollups = []
+    for start in sorted(months):
+        hours = database.query("SELECT "+", ".join(["`"+field+"`" for field in ROLLUP_FIELDS])+" FROM `interval_hour` "
+                               "WHERE `epoch` >= %s AND `epoch` < %s ORDER BY `epoch`", (start, nextMonthStart(start)))
+        if hours is None:
+            return False
+        if hours:
+            rollups.append(combine(start, [dict(zip(ROLLUP_FIELDS, hour)) for hour in hours]))
+    return storeRollups("interval_month", rollups)
+
+"""
+@brief:        Combines rollup rows into one covering all of them
+@param:        Epoch of the combined row
+@param:        List of rollup rows, as dictionaries, oldest first
+@created:      18th Oct 2026
+@return:       Rollup row (list in ROLLUP_FIELDS order)
+"""
+def combine(epoch, rows):
+    combined = {"epoch": epoch, "samples": sum(row["samples"] for row in rows)}
+    for name in ["pow_prod", "pow_feed", "volt_feed", "freq_feed"]:
+        weighted = [(row[name+"_avg"], row["samples"]) for row in rows if row[name+"_avg"] is not None]
+        if weighted:
+            combined[name+"_avg"] = sum(avg*count for avg, count in weighted)/sum(count for avg, count in weighted)
+        else:
+            combined[name+"_avg"] = None
+        lows = [row[name+"_min"] for row in rows if row[name+"_min"] is not None]
+        highs = [row[name+"_max"] for row in rows if row[name+"_max"] is not None]
+        combined[name+"_min"] = min(lows) if lows else None
+        combined[name+"_max"] = max(highs) if highs else None
+    for name in COUNTERS:
+        values = [row[name] for row in rows if row[name] is not None]
+        combined[name] = values[-1] if values else None
+    for name in DELTAS:
+        values = [row[name] for row in rows if row[name] is not None]
+        combined[name] = sum(values) if values else None
+    return [combined[field] for field in ROLLUP_FIELDS]
+
+"""
+@brief:        Writes rollup rows, replacing any for the same bucket
+@created:      18th Oct 2026
+@return:       True: Success
+               False: Failed
+"""
+def storeRollups(table, rollups):
+    return database.executeMany("REPLACE INTO `"+table+"` ("+",".join(["`"+field+"`" for field in ROLLUP_FIELDS])+") VALUES ("+
+                                ",".join(["%s"]*len(ROLLUP_FIELDS))+")", rollups)
+
+"""
+@brief:        Deletes raw rows older than their retention window
+@detail:       Interval rows are only deleted once rolled up. A window
+               of 0 days keeps rows forever.
+@created:      18th Oct 2026
+@return:       True: Success
+               False: Failed
+"""
+def applyRetention():
+    ret = True
+    if configuration.INTERVAL_RETENTION_DAYS > 0:
+        last = database.query("SELECT MAX(`epoch`) FROM `interval_hour`")
+        if last is None:
+            return False
+        if last[0][0] is not None:
+            cutoff = min(time.time()-configuration.INTERVAL_RETENTION_DAYS*86400, int(last[0][0])+HOUR)
+            ret = database.executeMany("DELETE FROM `interval` WHERE `epoch` < %s", [(int(cutoff),)])
+    if configuration.SAMPLE_RETENTION_DAYS > 0:
+        cutoff = time.time()-configuration.SAMPLE_RETENTION_DAYS*86400
+        ret = database.executeMany("DELETE FROM `sample` WHERE `epoch` < %s", [(cutoff,)]) and ret
+    return ret
+
+"""
+@brief:        Brings the rollups up to date and applies retention
+@created:      18th Oct 2026
+@return:       True: Success
+               False: Failed
+"""
+def update():
+    months = rollupHours()
+    if months is None:
+        return False
+    if months and not rollupMonths(months):
+        return False
+    return applyRetention()
+
+"""
+@brief:        Rollup thread, updating every ROLLUP_INTERVAL seconds
+@created:      18th Oct 2026
+@return:       none
+"""
+def rollupThread():
+    while True:
+        database.openConnection()
+        update()
+        database.closeConnection()
+        time.sleep(configuration.ROLLUP_INTERVAL)
+
+"""
+@brief:        Starts the rollup thread
+@created:      18th Oct 2026
+@return:       none
+"""
+def start():
+    thread = threading.Thread(target=rollupThread)
+    thread.daemon = True
+    thread.start()
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+@author:         stoberblog
+@detail:         In-memory buffer for high rate sampling. Samples taken
+                 within one scheduler interval are collected here and
+                 reduced to a single interval row: the mean of
+                 instantaneous values, the last reading of energy
+                 counters, and the min/max of instantaneous values.
+
+@created:     Sunday 18th October 2026
+@modified:    Sunday 18th October 2026
+@version:     0.1
+
+@change:
+
+@license:     MIT License
+
+                Copyright (c) 2017 stoberblog
+
+                Permission is hereby granted, free of charge, to any person obtaining a copy
+                of this software and associated documentation files (the "Software"), to deal
+                in the Software without restriction, including without limitation the rights
+                to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+                copies of the Software, and to permit persons to whom the Software is
+                furnished to do so, subject to the following conditions:
+
+                The above copyright notice and this permission notice shall be included in all
+                copies or substantial portions of the Software.
+
+                THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+                IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+                FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+                AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+                LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+                OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+                SOFTWARE.
+"""
+
+import database
+
+'''
+ How each interval_struct field is reduced
+'''
+MEAN_FIELDS = ["DC_s1_v", "DC_s2_v", "pf_feed", "pf_inv", "pow_prod", "pow_feed", "volt_feed", "cur_inv", "freq_feed"]
+LAST_FIELDS = ["eng_tot_prod", "eng_tot_out", "eng_tot_in"]
+RANGE_FIELDS = MEAN_FIELDS      # Also stored as <field>_min and <field>_max
+
+
+"""
+@brief:        Collects samples and reduces them to an interval row
+@detail:       Running sums and extremes are kept as samples arrive, so
+               aggregating does not need another pass over the samples.
+               Missing values (None) are left out; a field missing from
+               every sample stays None in the row.
+@created:      18th Oct 2026
+"""
+class SampleBuffer:
+    def __init__(self):
+        self.clear()
+
+    """
+    @brief:        Empties the buffer
+    @return:       none
+    """
+    def clear(self):
+        self.count = 0
+        self.first = None
+        self.last = None
+        self.sums = dict((field, 0.0) for field in MEAN_FIELDS)
+        self.counts = dict((field, 0) for field in MEAN_FIELDS)
+        self.lasts = {}
+        self.mins = {}
+        self.maxs = {}
+
+    """
+    @brief:        Adds a sample
+    @param:        Sample (interval_struct)
+    @return:       none
+    """
+    def add(self, sample):
+        self.count += 1
+        if self.first is None:
+            self.first = sample
+        self.last = sample
+        for field in MEAN_FIELDS:
+            value = getattr(sample, field)
+            if value is not None:
+                self.sums[field] += value
+                self.counts[field] += 1
+        for field in LAST_FIELDS:
+            if getattr(sample, field) is not None:
+                self.lasts[field] = getattr(sample, field)
+        for field in RANGE_FIELDS:
+            value = getattr(sample, field)
+            if value is None:
+                continue
+            if field not in self.mins or value < self.mins[field]:
+                self.mins[field] = value
+            if field not in self.maxs or value > self.maxs[field]:
+                self.maxs[field] = value
+
+    """
+    @brief:        Reduces the buffered samples to one interval row
+    @param:        Epoch to give the row
+    @return:       interval_struct
+                   None when the buffer is empty
+    """
+    def aggregate(self, epoch):
+        if self.count == 0:
+            return None
+        row = database.interval_struct()
+        row.epoch = epoch
+        for field in MEAN_FIELDS:
+            if self.counts[field] > 0:
+                setattr(row, field, self.sums[field]/self.counts[field])
+            else:
+                setattr(row, field, None)
+        for field in LAST_FIELDS:
+            setattr(row, field, self.lasts.get(field))
+        for field in RANGE_FIELDS:
+            setattr(row, field+"_min", self.mins.get(field))
+            setattr(row, field+"_max", self.maxs.get(field))
+        return row
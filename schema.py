@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+@author:         stoberblog
+@detail:         Versioned database schema. Each migration upgrades the
+                 schema by one version, with SQL for every backend.
+                 database.py applies the migrations a database has not
+                 had yet when it first connects, and records the version
+                 reached in the `schema_version` table.
+
+@created:     Sunday 18th October 2026
+@modified:    Sunday 18th October 2026
+@version:     0.1
+
+@change:
+
+@license:     MIT License
+
+                Copyright (c) 2017 stoberblog
+
+                Permission is hereby granted, free of charge, to any person obtaining a copy
+                of this software and associated documentation files (the "Software"), to deal
+                in the Software without restriction, including without limitation the rights
+                to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+                copies of the Software, and to permit persons to whom the Software is
+                furnished to do so, subject to the following conditions:
+
+                The above copyright notice and this permission notice shall be included in all
+                copies or substantial portions of the Software.
+
+                THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+                IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+                FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+                AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+                LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+                OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+                SOFTWARE.
+"""
+
+'''
+ Columns of the rollup tables (see rollup.py): one row per bucket, keyed
+ by the epoch the bucket starts at
+'''
+MARIA_ROLLUP_COLUMNS = ("(`epoch` int unsigned NOT NULL, `samples` int unsigned, "
+                        "`pow_prod_avg` float, `pow_prod_min` float, `pow_prod_max` float, `pow_feed_avg` float, `pow_feed_min` float, `pow_feed_max` float, "
+                        "`volt_feed_avg` float, `volt_feed_min` float, `volt_feed_max` float, `freq_feed_avg` float, `freq_feed_min` float, `freq_feed_max` float, "
+                        "`eng_tot_prod` bigint unsigned, `eng_tot_out` int unsigned, `eng_tot_in` int unsigned, `eng_prod` int, `eng_out` int, `eng_in` int, "
+                        "PRIMARY KEY (`epoch`))")
+SQLITE_ROLLUP_COLUMNS = ("(`epoch` INTEGER PRIMARY KEY, `samples` INTEGER, "
+                         "`pow_prod_avg` REAL, `pow_prod_min` REAL, `pow_prod_max` REAL, `pow_feed_avg` REAL, `pow_feed_min` REAL, `pow_feed_max` REAL, "
+                         "`volt_feed_avg` REAL, `volt_feed_min` REAL, `volt_feed_max` REAL, `freq_feed_avg` REAL, `freq_feed_min` REAL, `freq_feed_max` REAL, "
+                         "`eng_tot_prod` INTEGER, `eng_tot_out` INTEGER, `eng_tot_in` INTEGER, `eng_prod` INTEGER, `eng_out` INTEGER, `eng_in` INTEGER)")
+
+'''
+ Migrations, oldest first. Migration n (counting from 1) upgrades a
+ database from version n-1 to version n. Statements must be safe to run
+ again, as a database set up from MariaDB-tables.txt may already have
+ them applied.
+'''
+'''
+ Interval columns added by migration 4, see sampleBuffer.RANGE_FIELDS
+'''
+RANGE_COLUMNS = ["DC_s1_v_min", "DC_s1_v_max", "DC_s2_v_min", "DC_s2_v_max", "pf_feed_min", "pf_feed_max", "pf_inv_min", "pf_inv_max",
+                 "volt_feed_min", "volt_feed_max", "cur_inv_min", "cur_inv_max", "freq_feed_min", "freq_feed_max"]
+
+MIGRATIONS = [
+    {
+        "note": "Base tables",
+        "mariadb": [
+            "CREATE TABLE IF NOT EXISTS `interval` (`id` int unsigned NOT NULL auto_increment, `epoch` int unsigned NOT NULL, "
+            "`DC_s1_v` float, `DC_s2_v` float, `pf_feed` float, `pf_inv` float, `pow_prod` float, `pow_feed` float, "
+            "`eng_tot_prod` int unsigned, `eng_tot_out` int unsigned, `eng_tot_in` int unsigned, `volt_feed` float, "
+            "`cur_inv` float, `freq_feed` float DEFAULT 50.0, PRIMARY KEY (`id`))",
+            "ALTER TABLE `interval` ADD COLUMN IF NOT EXISTS `pow_prod_min` float, ADD COLUMN IF NOT EXISTS `pow_prod_max` float, "
+            "ADD COLUMN IF NOT EXISTS `pow_feed_min` float, ADD COLUMN IF NOT EXISTS `pow_feed_max` float",
+            "CREATE TABLE IF NOT EXISTS `sample` (`id` int unsigned NOT NULL auto_increment, `epoch` double NOT NULL, "
+            "`DC_s1_v` float, `DC_s2_v` float, `pf_feed` float, `pf_inv` float, `pow_prod` float, `pow_feed` float, "
+            "`eng_tot_prod` int unsigned, `eng_tot_out` int unsigned, `eng_tot_in` int unsigned, `volt_feed` float, "
+            "`cur_inv` float, `freq_feed` float DEFAULT 50.0, PRIMARY KEY (`id`))",
+            "CREATE TABLE IF NOT EXISTS `daily` (`id` int unsigned NOT NULL auto_increment, `epoch` int unsigned NOT NULL, "
+            "`thres_rise_epoch` int unsigned, `thres_fall_epoch` int unsigned, `thres_perc_exp` float, `pow_max` float, "
+            "`eng_day` int unsigned, `eng_tot_prod` bigint unsigned, `eng_tot_out` int unsigned, `eng_tot_in` int unsigned, "
+            "`error_flag` bit, PRIMARY KEY (`id`))",
+            "CREATE TABLE IF NOT EXISTS `log` (`id` int unsigned NOT NULL auto_increment, `epoch` int unsigned NOT NULL, "
+            "`level` int unsigned, `message` text NOT NULL, PRIMARY KEY (`id`))",
+            "CREATE TABLE IF NOT EXISTS `spool_position` (`id` tinyint unsigned NOT NULL, `position` bigint unsigned NOT NULL, "
+            "PRIMARY KEY (`id`))",
+        ],
+        "sqlite": [
+            "CREATE TABLE IF NOT EXISTS `interval` (`id` INTEGER PRIMARY KEY, `epoch` INTEGER NOT NULL, `DC_s1_v` REAL, `DC_s2_v` REAL, "
+            "`pf_feed` REAL, `pf_inv` REAL, `pow_prod` REAL, `pow_feed` REAL, `eng_tot_prod` INTEGER, `eng_tot_out` INTEGER, "
+            "`eng_tot_in` INTEGER, `volt_feed` REAL, `cur_inv` REAL, `freq_feed` REAL DEFAULT 50.0, "
+            "`pow_prod_min` REAL, `pow_prod_max` REAL, `pow_feed_min` REAL, `pow_feed_max` REAL)",
+            "CREATE TABLE IF NOT EXISTS `sample` (`id` INTEGER PRIMARY KEY, `epoch` REAL NOT NULL, `DC_s1_v` REAL, `DC_s2_v` REAL, "
+            "`pf_feed` REAL, `pf_inv` REAL, `pow_prod` REAL, `pow_feed` REAL, `eng_tot_prod` INTEGER, `eng_tot_out` INTEGER, "
+            "`eng_tot_in` INTEGER, `volt_feed` REAL, `cur_inv` REAL, `freq_feed` REAL DEFAULT 50.0)",
+            "CREATE TABLE IF NOT EXISTS `daily` (`id` INTEGER PRIMARY KEY, `epoch` INTEGER NOT NULL, `thres_rise_epoch` INTEGER, "
+            "`thres_fall_epoch` INTEGER, `thres_perc_exp` REAL, `pow_max` REAL, `eng_day` INTEGER, `eng_tot_prod` INTEGER, "
+            "`eng_tot_out` INTEGER, `eng_tot_in` INTEGER, `error_flag` INTEGER)",
+            "CREATE TABLE IF NOT EXISTS `log` (`id` INTEGER PRIMARY KEY, `epoch` INTEGER NOT NULL, `level` INTEGER, `message` TEXT NOT NULL)",
+            "CREATE TABLE IF NOT EXISTS `spool_position` (`id` INTEGER PRIMARY KEY, `position` INTEGER NOT NULL)",
+        ],
+    },
+    {
+        "note": "Epoch indexes, so time range queries do not scan the whole table",
+        "mariadb": [
+            "CREATE INDEX IF NOT EXISTS `interval_epoch` ON `interval` (`epoch`)",
+            "CREATE INDEX IF NOT EXISTS `sample_epoch` ON `sample` (`epoch`)",
+            "CREATE INDEX IF NOT EXISTS `daily_epoch` ON `daily` (`epoch`)",
+            "CREATE INDEX IF NOT EXISTS `log_epoch` ON `log` (`epoch`)",
+        ],
+        "sqlite": [
+            "CREATE INDEX IF NOT EXISTS `interval_epoch` ON `interval` (`epoch`)",
+            "CREATE INDEX IF NOT EXISTS `sample_epoch` ON `sample` (`epoch`)",
+            "CREATE INDEX IF NOT EXISTS `daily_epoch` ON `daily` (`epoch`)",
+            "CREATE INDEX IF NOT EXISTS `log_epoch` ON `log` (`epoch`)",
+        ],
+    },
+    {
+        "note": "Hourly and monthly rollups of interval",
+        "mariadb": [
+            "CREATE TABLE IF NOT EXISTS `interval_hour` "+MARIA_ROLLUP_COLUMNS,
+            "CREATE TABLE IF NOT EXISTS `interval_month` "+MARIA_ROLLUP_COLUMNS,
+        ],
+        "sqlite": [
+            "CREATE TABLE IF NOT EXISTS `interval_hour` "+SQLITE_ROLLUP_COLUMNS,
+            "CREATE TABLE IF NOT EXISTS `interval_month` "+SQLITE_ROLLUP_COLUMNS,
+        ],
+    },
+    {
+        "note": "Minimum and maximum of every averaged interval column",
+        "mariadb": [
+            "ALTER TABLE `interval` "+", ".join(["ADD COLUMN IF NOT EXISTS `"+column+"` float" for column in RANGE_COLUMNS]),
+        ],
+        "sqlite": ["ALTER TABLE `interval` ADD COLUMN `"+column+"` REAL" for column in RANGE_COLUMNS],
+    },
+]
+
+VERSION = len(MIGRATIONS)   # Schema version of a fully upgraded database
+
+'''
+ Table recording the schema version, created before any migration runs
+'''
+VERSION_TABLE = {
+    "mariadb": "CREATE TABLE IF NOT EXISTS `schema_version` (`id` tinyint unsigned NOT NULL, `version` int unsigned NOT NULL, PRIMARY KEY (`id`))",
+    "sqlite": "CREATE TABLE IF NOT EXISTS `schema_version` (`id` INTEGER PRIMARY KEY, `version` INTEGER NOT NULL)",
+}
+
+
+"""
+@brief:        Gets the migrations a database still needs
+@param:        Backend name, as configuration.DATABASE_TYPE
+@param:        Current schema version of the database
+@created:      18th Oct 2026
+@return:       List of (version reached, note, list of SQL statements)
+"""
+def pending(backendName, version):
+    return [(number+1, MIGRATIONS[number]["note"], MIGRATIONS[number][backendName]) for number in range(version, VERSION)]
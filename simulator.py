@@ -0,0 +1,441 @@
+# -*- coding: utf-8 -*-
+"""
+@author:         stoberblog
+@detail:         Local Modbus TCP server standing in for a Fronius
+                 inverter and smart meter, for testing and benchmarking
+                 without real hardware. It serves the register map read
+                 by sunspecModbus.py: the inverter at unit 0 and the
+                 meter at configuration.METER_ADDR.
+
+                 Values come either from a synthetic daily production
+                 curve, or from register snapshots recorded off a real
+                 device with --record. Latency, jitter and errors can be
+                 injected.
+
+                 Point configuration.py at it with
+                     INVERTER_IP = "127.0.0.1"
+                     MODBUS_PORT = <--port>
+
+@created:     Sunday 18th October 2026
+@modified:    Sunday 18th October 2026
+@version:     0.1
+
+@change:
+
+@license:     MIT License
+
+                Copyright (c) 2017 stoberblog
+
+                Permission is hereby granted, free of charge, to any person obtaining a copy
+                of this software and associated documentation files (the "Software"), to deal
+                in the Software without restriction, including without limitation the rights
+                to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+                copies of the Software, and to permit persons to whom the Software is
+                furnished to do so, subject to the following conditions:
+
+                The above copyright notice and this permission notice shall be included in all
+                copies or substantial portions of the Software.
+
+                THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+                IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+                FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+                AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+                LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+                OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+                SOFTWARE.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import struct
+import time
+
+import configuration
+import sunspecModbus
+
+
+# Modbus exception codes
+EXCEPT_ILLEGAL_FUNCTION = 0x01
+EXCEPT_ILLEGAL_ADDRESS  = 0x02
+EXCEPT_ILLEGAL_VALUE    = 0x03
+EXCEPT_DEVICE_FAILURE   = 0x04
+EXCEPT_GATEWAY_TARGET   = 0x0B
+
+EPOCH_2000 = 946684800          # Seconds between 1/1/1970 and 1/1/2000
+
+'''
+ Scale factors the synthetic device reports
+'''
+SYNTHETIC_SCALES = {"inv_PFMin_SF": -3, "inv_OutPFSet_SF": -3, "inv_DCA_SF": -2, "inv_DCV_SF": -1, "inv_DCW_SF": 0}
+
+
+"""
+#####################################################################
+
+        Register Maps
+
+#####################################################################
+"""
+
+"""
+@brief:        Builds an empty register map with a SunSpec model chain
+@param:        Model index, as sunspecModbus.DEFAULT_INDEX
+@param:        True to include the Fronius site registers (500-513)
+@return:       Dictionary of address to register
+"""
+def emptyRegisters(index, siteRegisters):
+    regs = {}
+    regs[sunspecModbus.SUNSPEC_BASE] = sunspecModbus.SUNSPEC_MARKER[0]
+    regs[sunspecModbus.SUNSPEC_BASE+1] = sunspecModbus.SUNSPEC_MARKER[1]
+    for model, (address, length) in index["models"].items():
+        regs[address] = model
+        regs[address+1] = length
+        for i in range(length):
+            regs[address+2+i] = 0
+    regs[index["end"]] = sunspecModbus.SUNSPEC_END
+    regs[index["end"]+1] = 0
+    if siteRegisters:
+        for address in range(500-1, 514-1):
+            regs[address] = 0
+    return regs
+
+"""
+@brief:        Writes point values into a register map
+@detail:       Values of scaled points are divided by their scale
+               factor, which must also be present in values.
+@param:        Register map
+@param:        Device type ("inv" or "mtr")
+@param:        Model index
+@param:        Dictionary of point name to value
+@return:       none
+"""
+def writePoints(regs, device, index, values):
+    addresses = sunspecModbus.resolveAddresses(device, index["models"])
+    for name, value in values.items():
+        if name not in addresses:
+            continue
+        point = sunspecModbus.POINTS[name]
+        if point.scale is not None:
+            value = value/(10**values[point.scale])
+        if point.codec.format[-1:] not in ("f", b"f"):
+            value = int(round(value))
+        for i, reg in enumerate(sunspecModbus.encodePoint(point, value)):
+            regs[addresses[name]+i] = reg
+
+
+"""
+#####################################################################
+
+        Value Sources
+
+#####################################################################
+"""
+
+"""
+@brief:        Synthetic inverter and meter following a daily curve
+@detail:       Production follows a half sine between sunrise and sunset
+               with random cloud dips, against a noisy household load.
+               Energy counters integrate the simulated power.
+@created:      18th Oct 2026
+"""
+class SyntheticSite:
+    def __init__(self, peak, sunrise, sunset, seed=None):
+        self.peak = peak
+        self.sunrise = sunrise*3600
+        self.sunset = sunset*3600
+        self.random = random.Random(seed)
+        self.cloud = 1.0
+        self.updated = None
+        self.energyDay = 0.0
+        self.energyYear = 0.0
+        self.energyTotal = 1000000.0
+        self.exported = 100000.0
+        self.imported = 100000.0
+        self.index = {"inv": sunspecModbus.DEFAULT_INDEX["inv"], "mtr": sunspecModbus.DEFAULT_INDEX["mtr"]}
+
+    """
+    @brief:        Moves the simulation on to the given time
+    @return:       none
+    """
+    def update(self, now):
+        if self.updated is not None and now-self.updated < 1:
+            return
+        elapsed = 0 if self.updated is None else now-self.updated
+        local = time.localtime(now)
+        if self.updated is not None and time.localtime(self.updated).tm_yday != local.tm_yday:
+            self.energyDay = 0.0
+        self.updated = now
+        secondOfDay = local.tm_hour*3600+local.tm_min*60+local.tm_sec
+        if self.sunrise < secondOfDay < self.sunset:
+            sun = math.sin(math.pi*(secondOfDay-self.sunrise)/(self.sunset-self.sunrise))
+        else:
+            sun = 0.0
+        self.cloud = min(1.0, max(0.2, self.cloud+self.random.gauss(0, 0.05)))
+        self.power = self.peak*sun*self.cloud
+        self.load = 300+abs(self.random.gauss(0, 150))
+        self.energyDay += self.power*elapsed/3600
+        self.energyYear += self.power*elapsed/3600
+        self.energyTotal += self.power*elapsed/3600
+        feed = self.load-self.power     # Positive is import
+        if feed > 0:
+            self.imported += feed*elapsed/3600
+        else:
+            self.exported += -feed*elapsed/3600
+        self.feed = feed
+        self.now = now
+
+    """
+    @brief:        Gets the register map of a unit
+    @param:        Device type ("inv" or "mtr")
+    @return:       Dictionary of address to register
+    """
+    def registers(self, device, now):
+        self.update(now)
+        producing = self.power > 1
+        if device == "inv":
+            dcVoltage = 350+self.random.gauss(0, 2) if producing else 0.0
+            values = dict(SYNTHETIC_SCALES)
+            values.update({
+                "inv_SitePower_W": self.power,
+                "inv_SiteEnergyDay_Wh": self.energyDay,
+                "inv_SiteEnergyYear_Wh": self.energyYear,
+                "inv_SiteEnergyTotal_Wh": self.energyTotal,
+                "inv_ACCurrentTotal_A": self.power/240,
+                "inv_ACPower_W": self.power,
+                "inv_ACFreq_Hz": 50+self.random.gauss(0, 0.02) if producing else 0.0,
+                "inv_ACAppPwr_VA": self.power,
+                "inv_ACReacPwr_VAr": 0.0,
+                "inv_ACPF_percent": 100.0 if producing else 0.0,
+                "inv_DCPwr_W": self.power*1.03,
+                "inv_getMinPowerFactorQ1_cos": 0.8,
+                "inv_getMinPowerFactorQ4_cos": -0.8,
+                "inv_getMaxPowerFactor_cos": 1.0,
+                "inv_Time_s": int(now)-EPOCH_2000,
+                "inv_DCs1Voltage_V": dcVoltage,
+                "inv_DCs2Voltage_V": dcVoltage*0.97,
+                "inv_DCs1Current_A": self.power*0.515/dcVoltage if producing else 0.0,
+                "inv_DCs2Current_A": self.power*0.515/dcVoltage/0.97 if producing else 0.0,
+                "inv_DCs1Power_W": self.power*0.515,
+                "inv_DCs2Power_W": self.power*0.515,
+            })
+            regs = emptyRegisters(self.index["inv"], True)
+        else:
+            voltage = 240+self.random.gauss(0, 1)
+            values = {
+                "mtr_ACCurrentTotal_A": self.feed/voltage,
+                "mtr_ACVoltageAverage_V": voltage,
+                "mtr_ACFreq_Hz": 50+self.random.gauss(0, 0.02),
+                "mtr_ACPowerTotal_W": self.feed,
+                "mtr_ACAppPowerTotal_VA": abs(self.feed),
+                "mtr_ACReacPowerTotal_VAr": 0.0,
+                "mtr_ACPFAverage_cos": 0.95,
+                "mtr_ACTotalWattHoursExp_Wh": self.exported,
+                "mtr_ACTotalWattHoursImp_Wh": self.imported,
+                "mtr_ACTotalVAHoursExp_Wh": self.exported,
+                "mtr_ACTotalVAHoursImp_Wh": self.imported,
+            }
+            regs = emptyRegisters(self.index["mtr"], False)
+        writePoints(regs, device, self.index[device], values)
+        return regs
+
+"""
+@brief:        Replays register snapshots recorded with --record
+@detail:       Snapshots are played back with their recorded spacing,
+               looping at the end.
+@created:      18th Oct 2026
+"""
+class ReplaySite:
+    def __init__(self, fileName):
+        self.snapshots = []
+        with open(fileName) as snapshotFile:
+            for line in snapshotFile:
+                if line.strip():
+                    self.snapshots.append(json.loads(line))
+        if not self.snapshots:
+            raise ValueError("No snapshots in "+fileName)
+        self.started = time.time()
+        first = self.snapshots[0]["time"]
+        self.length = max(self.snapshots[-1]["time"]-first, 1)
+        self.offsets = [snapshot["time"]-first for snapshot in self.snapshots]
+        self.maps = [dict((device, self.toRegisters(snapshot[device])) for device in ("inv", "mtr") if device in snapshot)
+                     for snapshot in self.snapshots]
+
+    """
+    @brief:        Turns a recorded device snapshot into a register map
+    """
+    def toRegisters(self, recorded):
+        index = {"models": dict((int(model), place) for model, place in recorded["index"]["models"].items()),
+                 "end": recorded["index"]["end"]}
+        regs = emptyRegisters(index, False)
+        for start, values in recorded["blocks"]:
+            for i, value in enumerate(values):
+                regs[start+i] = value
+        return regs
+
+    def registers(self, device, now):
+        position = (now-self.started) % self.length
+        chosen = 0
+        for i, offset in enumerate(self.offsets):
+            if offset <= position:
+                chosen = i
+        return self.maps[chosen].get(device)
+
+
+"""
+@brief:        Records register snapshots of the configured device to
+               a file, for replay
+@param:        File name (JSON lines, appended to)
+@param:        Number of snapshots
+@param:        Seconds between snapshots
+@return:       none
+"""
+def record(fileName, count, interval):
+    devices = ["inv", "mtr"] if configuration.METER_INSTALLED == True else ["inv"]
+    with open(fileName, "a") as snapshotFile:
+        for i in range(count):
+            started = time.time()
+            if not sunspecModbus.captureDevices(devices):
+                print("Capture failed, snapshot skipped")
+            else:
+                snapshot = {"time": started}
+                for device in devices:
+                    snapshot[device] = {
+                        "index": sunspecModbus.modelIndex[device],
+                        "blocks": [[start, list(struct.unpack(">%dH" % length, buffer))]
+                                   for start, length, buffer in sunspecModbus.blocks[device]]}
+                snapshotFile.write(json.dumps(snapshot)+"\n")
+                snapshotFile.flush()
+            sunspecModbus.releaseBlocks()
+            time.sleep(max(0, started+interval-time.time()))
+    sunspecModbus.closeSession()
+
+
+"""
+#####################################################################
+
+        Server
+
+#####################################################################
+"""
+
+"""
+@brief:        Modbus TCP server answering Read Holding Registers
+@detail:       Each request is answered on its own task, after the
+               configured latency and jitter, so pipelined requests may
+               be answered out of order just as on a slow link.
+@created:      18th Oct 2026
+"""
+class Simulator:
+    def __init__(self, site, latency=0.0, jitter=0.0, errorRate=0.0, dropRate=0.0, seed=None):
+        self.site = site
+        self.latency = latency
+        self.jitter = jitter
+        self.errorRate = errorRate
+        self.dropRate = dropRate
+        self.random = random.Random(seed)
+        self.units = {0: "inv", configuration.METER_ADDR: "mtr"}
+        self.requests = 0
+        self.errors = 0
+        self.dropped = 0
+
+    """
+    @brief:        Works out the response PDU to a request PDU
+    @return:       bytes
+    """
+    def respond(self, unitID, pdu):
+        function = pdu[0]
+        if function != sunspecModbus.FC_READ_HOLDING:
+            return struct.pack(">BB", function | 0x80, EXCEPT_ILLEGAL_FUNCTION)
+        if len(pdu) != 5:
+            return struct.pack(">BB", function | 0x80, EXCEPT_ILLEGAL_VALUE)
+        address, count = struct.unpack(">HH", pdu[1:5])
+        if not (1 <= count <= sunspecModbus.MODBUS_MAX_REGS):
+            return struct.pack(">BB", function | 0x80, EXCEPT_ILLEGAL_VALUE)
+        device = self.units.get(unitID)
+        regs = self.site.registers(device, time.time()) if device is not None else None
+        if regs is None:
+            return struct.pack(">BB", function | 0x80, EXCEPT_GATEWAY_TARGET)
+        if self.random.random() < self.errorRate:
+            self.errors += 1
+            return struct.pack(">BB", function | 0x80, EXCEPT_DEVICE_FAILURE)
+        values = []
+        for i in range(count):
+            if address+i not in regs:
+                return struct.pack(">BB", function | 0x80, EXCEPT_ILLEGAL_ADDRESS)
+            values.append(regs[address+i])
+        return struct.pack(">BB%dH" % count, function, count*2, *values)
+
+    """
+    @brief:        Answers one request after the simulated delay
+    """
+    async def answer(self, writer, transactionID, unitID, pdu):
+        delay = self.latency+self.random.uniform(0, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self.random.random() < self.dropRate:
+            self.dropped += 1
+            return
+        response = self.respond(unitID, pdu)
+        writer.write(sunspecModbus.MBAP.pack(transactionID, 0, len(response)+1, unitID)+response)
+
+    """
+    @brief:        Serves one client connection
+    """
+    async def serve(self, reader, writer):
+        try:
+            while True:
+                header = await reader.readexactly(sunspecModbus.MBAP.size)
+                transactionID, protocolID, length, unitID = sunspecModbus.MBAP.unpack(header)
+                pdu = await reader.readexactly(length-1)
+                self.requests += 1
+                asyncio.ensure_future(self.answer(writer, transactionID, unitID, pdu))
+        except (asyncio.IncompleteReadError, OSError):
+            pass
+        finally:
+            writer.close()
+
+
+"""
+@brief:        When run directly, serve the simulated devices, or record
+               snapshots of a real one
+"""
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SunSpec Modbus TCP simulator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=configuration.MODBUS_PORT)
+    parser.add_argument("--replay", metavar="FILE", help="replay snapshots recorded with --record")
+    parser.add_argument("--record", metavar="FILE", help="record snapshots of the configured device and exit")
+    parser.add_argument("--count", type=int, default=60, help="snapshots to record")
+    parser.add_argument("--interval", type=float, default=60, help="seconds between recorded snapshots")
+    parser.add_argument("--peak", type=float, default=5000, help="synthetic peak production [W]")
+    parser.add_argument("--sunrise", type=float, default=6, help="synthetic sunrise [hour]")
+    parser.add_argument("--sunset", type=float, default=18, help="synthetic sunset [hour]")
+    parser.add_argument("--latency", type=float, default=0, help="response delay [ms]")
+    parser.add_argument("--jitter", type=float, default=0, help="random extra delay, up to [ms]")
+    parser.add_argument("--error-rate", type=float, default=0, help="fraction of requests answered with an exception")
+    parser.add_argument("--drop-rate", type=float, default=0, help="fraction of requests never answered")
+    parser.add_argument("--seed", type=int, help="random seed, for repeatable runs")
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.record, args.count, args.interval)
+    else:
+        if args.replay:
+            site = ReplaySite(args.replay)
+        else:
+            site = SyntheticSite(args.peak, args.sunrise, args.sunset, args.seed)
+        simulator = Simulator(site, args.latency/1000, args.jitter/1000, args.error_rate, args.drop_rate, args.seed)
+        loop = asyncio.new_event_loop()
+        server = loop.run_until_complete(asyncio.start_server(simulator.serve, args.host, args.port))
+        print("Simulating inverter (unit 0) and meter (unit "+str(configuration.METER_ADDR)+") on "+args.host+":"+str(args.port))
+        try:
+            loop.run_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.close()
+            loop.close()
+            print("Served "+str(simulator.requests)+" requests, "+str(simulator.errors)+" errors injected, "+str(simulator.dropped)+" dropped")
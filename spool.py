@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""
+@author:         stoberblog
+@detail:         Append-only on-disk spool of rows waiting to be written
+                 to the database. Rows are appended here first, so a slow
+                 or unreachable database does not hold up acquisition,
+                 and are loaded into the database later by a drainer
+                 (see database.py).
+
+                 Each row is one line, "<sequence>\t<table>\t<JSON
+                 values>", in segment files named after their first
+                 sequence number. Sequence numbers only ever increase,
+                 which lets the drainer skip rows it has already stored.
+
+@created:     Sunday 18th October 2026
+@modified:    Sunday 18th October 2026
+@version:     0.1
+
+@change:
+
+@license:     MIT License
+
+                Copyright (c) 2017 stoberblog
+
+                Permission is hereby granted, free of charge, to any person obtaining a copy
+                of this software and associated documentation files (the "Software"), to deal
+                in the Software without restriction, including without limitation the rights
+                to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+                copies of the Software, and to permit persons to whom the Software is
+                furnished to do so, subject to the following conditions:
+
+                The above copyright notice and this permission notice shall be included in all
+                copies or substantial portions of the Software.
+
+                THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+                IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+                FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+                AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+                LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+                OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+                SOFTWARE.
+"""
+
+import json
+import os
+import threading
+import time
+
+import configuration
+
+SEGMENT_SUFFIX = ".spool"
+
+
+"""
+@brief:        Parses a spool line
+@return:       (sequence, table, values)
+               None when the line is incomplete (e.g. torn by a crash)
+"""
+def parseLine(line):
+    if not line.endswith(b"\n"):
+        return None
+    try:
+        seq, table, values = line.decode("utf-8").rstrip("\n").split("\t", 2)
+        return (int(seq), table, json.loads(values))
+    except ValueError:
+        return None
+
+
+"""
+@brief:        Append-only spool in a directory of segment files
+@detail:       Appends are written straight away but only fsynced every
+               SPOOL_SYNC_ROWS rows or SPOOL_SYNC_SECONDS, or on sync().
+               Only synced rows are handed to readers, so nothing reaches
+               the database that could still be lost from the spool.
+@param:        Directory holding the segment files
+@created:      18th Oct 2026
+"""
+class Spool:
+    def __init__(self, directory):
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.file = None
+        self.fileStart = None   # First sequence number of the open segment
+        self.seq = 0            # Last sequence number appended
+        self.syncedSeq = 0      # Last sequence number fsynced
+        self.syncedAt = time.monotonic()
+        self.created = None     # First sequence number, when the spool was new on opening
+        self.open()
+
+    """
+    @brief:        Lists the segment files, oldest first
+    @return:       List of (first sequence number, path)
+    """
+    def segments(self):
+        found = []
+        for name in os.listdir(self.directory):
+            if name.endswith(SEGMENT_SUFFIX):
+                found.append((int(name[:-len(SEGMENT_SUFFIX)]), os.path.join(self.directory, name)))
+        return sorted(found)
+
+    """
+    @brief:        Opens the newest segment for appending
+    @detail:       A line torn by a crash is cut off. A new spool starts
+                   numbering at the current time in milliseconds, so it
+                   usually carries on past a spool which was deleted;
+                   when the clock was behind, the drainer sees from
+                   created that the stored position is an older spool's.
+    @return:       none
+    """
+    def open(self):
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        segments = self.segments()
+        if not segments:
+            self.seq = int(time.time()*1000)
+            self.created = self.seq+1
+            self.newSegment()
+            return
+        self.fileStart, path = segments[-1]
+        self.seq = self.fileStart-1
+        good = 0
+        with open(path, "rb") as segment:
+            for line in segment:
+                record = parseLine(line)
+                if record is None:
+                    break
+                self.seq = record[0]
+                good += len(line)
+        self.file = open(path, "ab")
+        self.file.truncate(good)
+        self.syncedSeq = self.seq
+
+    """
+    @brief:        Starts a new segment file after the last row
+    @return:       none
+    """
+    def newSegment(self):
+        if self.file is not None:
+            self.file.close()
+        self.fileStart = self.seq+1
+        self.file = open(os.path.join(self.directory, "%020d%s" % (self.fileStart, SEGMENT_SUFFIX)), "ab")
+        self.syncedSeq = self.seq
+        self.syncedAt = time.monotonic()
+
+    """
+    @brief:        Appends a row
+    @param:        Table name
+    @param:        List of values (numbers, strings or None)
+    @return:       Sequence number of the row
+    """
+    def append(self, table, values):
+        with self.lock:
+            self.seq += 1
+            self.file.write(("%d\t%s\t%s\n" % (self.seq, table, json.dumps(values))).encode("utf-8"))
+            if self.seq-self.syncedSeq >= configuration.SPOOL_SYNC_ROWS or time.monotonic()-self.syncedAt >= configuration.SPOOL_SYNC_SECONDS:
+                self.syncLocked()
+            return self.seq
+
+    """
+    @brief:        Makes every appended row durable
+    @return:       none
+    """
+    def sync(self):
+        with self.lock:
+            self.syncLocked()
+
+    """
+    @brief:        sync(), with the lock already held
+    """
+    def syncLocked(self):
+        if self.syncedSeq != self.seq:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.syncedSeq = self.seq
+        self.syncedAt = time.monotonic()
+        if self.file.tell() >= configuration.SPOOL_SEGMENT_BYTES:
+            self.newSegment()
+
+    """
+    @brief:        Reads synced rows, in order
+    @param:        Sequence number of the last row already stored
+    @param:        Most rows to return
+    @return:       List of (sequence, table, values)
+    """
+    def read(self, after, limit):
+        with self.lock:
+            synced = self.syncedSeq
+            if self.file is not None:
+                self.file.flush()
+        rows = []
+        segments = self.segments()
+        for i, (start, path) in enumerate(segments):
+            if i+1 < len(segments) and segments[i+1][0] <= after+1:
+                continue    # Entirely stored already
+            with open(path, "rb") as segment:
+                for line in segment:
+                    record = parseLine(line)
+                    if record is None or record[0] > synced:
+                        return rows
+                    if record[0] <= after:
+                        continue
+                    rows.append(record)
+                    if len(rows) >= limit:
+                        return rows
+        return rows
+
+    """
+    @brief:        Deletes segments whose rows have all been stored
+    @param:        Sequence number of the last row stored
+    @return:       none
+    """
+    def discard(self, upto):
+        with self.lock:
+            current = self.fileStart
+        segments = self.segments()
+        for i, (start, path) in enumerate(segments):
+            if start >= current or i+1 >= len(segments) or segments[i+1][0] > upto+1:
+                break
+            os.remove(path)
+
+    """
+    @brief:        Closes the spool, syncing it first
+    @return:       none
+    """
+    def close(self):
+        with self.lock:
+            self.syncLocked()
+            self.file.close()
+            self.file = None
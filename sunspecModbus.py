@@ -10,7 +10,7 @@
 
 @change:     
                  
-@note:        This file is NOT endien safe!
+@note:        Values are decoded with struct, so this file is endian safe
 
 @license:     MIT License
 
@@ -36,47 +36,1129 @@
 """
 
 from pyModbusTCP.client import ModbusClient
-import ctypes
-#import time
+from pyModbusTCP import constants as mbConst
+import json
+import math
+import os
+import random
+import select
+import socket
+import struct
+import threading
+import time
 
 import configuration
 
+"""
+#####################################################################
+
+        Modbus Sessions
+
+#####################################################################
+"""
+
 '''
- These classes/structures/unions, allow easy conversion between
- modbus 16bit registers and ctypes (a useful format)
+ Errors after which the socket can no longer be trusted, as a reply
+ may still be in flight or the far end has dropped the connection
 '''
-
-# Single register (16 bit) based types
-class convert1(ctypes.Union):
-    _fields_ = [("u16", ctypes.c_uint16),
-                ("s16", ctypes.c_int16)]
-    
-# Two register (32 bit) based types
-class x2u16Struct(ctypes.Structure):
-    _fields_ = [("h", ctypes.c_uint16),
-                ("l", ctypes.c_uint16)]
-class convert2(ctypes.Union):
-    _fields_ = [("float", ctypes.c_float),
-                ("u16", x2u16Struct),
-                ("sint32", ctypes.c_int32),
-                ("uint32", ctypes.c_uint32)]
-    
-# Four register (64 bit) based types
-class x4u16Struct(ctypes.Structure):
-    _fields_ = [("hh", ctypes.c_uint16),
-                ("hl", ctypes.c_uint16),
-                ("lh", ctypes.c_uint16),
-                ("ll", ctypes.c_uint16)]
-class convert4(ctypes.Union):
-    _fields_ = [("u16", x4u16Struct),
-                ("sint64", ctypes.c_int64),
-                ("uint64", ctypes.c_uint64)]
+STALE_ERRORS = (mbConst.MB_SEND_ERR, mbConst.MB_RECV_ERR, mbConst.MB_TIMEOUT_ERR, mbConst.MB_FRAME_ERR)
+
+"""
+@brief:        Reads a ModbusClient status value
+@detail:       Older pyModbusTCP releases expose these as methods,
+               newer ones as properties.
+"""
+def clientValue(client, name):
+    value = getattr(client, name)
+    if callable(value):
+        return value()
+    return value
+
+"""
+@brief:        Sets a ModbusClient setting, see clientValue()
+"""
+def setClientValue(client, name, value):
+    if callable(getattr(client, name)):
+        getattr(client, name)(value)
+    else:
+        setattr(client, name, value)
+
+"""
+@brief:        Long lived Modbus TCP connection, shared by every unit ID
+               behind the same address and port
+@detail:       The socket is opened on first use and kept open between
+               captures. When it goes stale it is closed and reopened on
+               the next read. Failed connection attempts back off
+               exponentially, from MODBUS_RECONNECT_MIN up to
+               MODBUS_RECONNECT_MAX seconds, so an offline inverter is
+               not hammered with connection attempts.
+
+               During a capture (see startCapture()) reads share a
+               deadline. Each attempt is limited to MODBUS_ATTEMPT_TIMEOUT,
+               and failed attempts are retried after a jittered backoff
+               while the deadline allows. Outside a capture each read
+               gets a single attempt of MODBUS_TIMEOUT.
+@created:      18th Oct 2026
+"""
+class ModbusSession:
+    def __init__(self, host, port, timeout, pipelined=False):
+        self.client = ModbusClient(host=host, port=port, auto_open=False, auto_close=False, timeout=timeout)
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.pipelined = pipelined
+        self.sock = None        # Socket used instead of the client when pipelined
+        self.transactionID = 0
+        self.deadline = None    # time.monotonic() by which the current capture must finish
+        self.lock = threading.RLock()
+        self.retryDelay = 0
+        self.retryAt = 0
+        self.connectCount = 0   # Incremented on every successful (re)connect
+
+    """
+    @brief:        Checks if the socket is open
+    """
+    def isOpen(self):
+        if self.pipelined:
+            return self.sock is not None
+        return clientValue(self.client, "is_open")
+
+    """
+    @brief:        Opens the socket if needed, honouring the reconnect backoff
+    @return:       True: Connected
+                   False: Not connected
+    """
+    def connect(self, timeout):
+        with self.lock:
+            if self.isOpen():
+                return True
+            if time.monotonic() < self.retryAt:
+                return False
+            if self.pipelined:
+                try:
+                    self.sock = socket.create_connection((self.host, self.port), timeout)
+                except OSError:
+                    self.sock = None
+                opened = self.sock is not None
+            else:
+                setClientValue(self.client, "timeout", timeout)
+                opened = self.client.open()
+            if opened:
+                self.retryDelay = 0
+                self.retryAt = 0
+                self.connectCount += 1
+                return True
+            self.retryDelay = min(max(self.retryDelay*2, configuration.MODBUS_RECONNECT_MIN), configuration.MODBUS_RECONNECT_MAX)
+            self.retryAt = time.monotonic()+self.retryDelay
+            return False
+
+    """
+    @brief:        Closes the socket
+    @return:       none
+    """
+    def close(self):
+        with self.lock:
+            self.client.close()
+            if self.sock is not None:
+                self.sock.close()
+                self.sock = None
+
+    """
+    @brief:        Works out how long the next attempt may take
+    @return:       Seconds
+                   None when the capture deadline has passed
+    """
+    def attemptTimeout(self):
+        if self.deadline is None:
+            return self.timeout
+        remaining = self.deadline-time.monotonic()
+        if remaining <= 0:
+            return None
+        return min(configuration.MODBUS_ATTEMPT_TIMEOUT, remaining)
+
+    """
+    @brief:        Waits before retrying a failed attempt
+    @detail:       Exponential backoff with jitter, so retries from
+               several loggers do not line up.
+    @param:        Number of attempts made so far
+    @return:       True: Retry
+                   False: No time left (or not in a capture)
+    """
+    def backoff(self, attempt):
+        if self.deadline is None:
+            return False
+        delay = min(configuration.MODBUS_RETRY_BASE*(2**(attempt-1)), configuration.MODBUS_RETRY_MAX)
+        delay *= random.uniform(0.5, 1.0)
+        if time.monotonic()+delay >= self.deadline:
+            return False
+        time.sleep(delay)
+        return True
+
+    """
+    @brief:        Reads holding registers from one unit on this connection
+    @return:       (registers or None, last error, last exception)
+    """
+    def read(self, unitID, address, count):
+        if self.pipelined:
+            return self.readMany([(unitID, address, count)])[0]
+        with self.lock:
+            attempt = 0
+            while True:
+                timeout = self.attemptTimeout()
+                if timeout is None:
+                    return (None, mbConst.MB_TIMEOUT_ERR, 0)
+                result = self.readOnce(unitID, address, count, timeout)
+                attempt += 1
+                if result[0] is not None or result[1] not in STALE_ERRORS or not self.backoff(attempt):
+                    return result
+
+    """
+    @brief:        Makes one attempt at reading holding registers
+    @detail:       A socket left open by an earlier capture may have been
+                   dropped by the datamanager in the meantime, so a failed
+                   read on such a socket is retried once on a fresh
+                   connection.
+    @return:       (registers or None, last error, last exception)
+    """
+    def readOnce(self, unitID, address, count, timeout):
+        for attempt in range(2):
+            wasOpen = self.isOpen()
+            if not self.connect(timeout):
+                return (None, mbConst.MB_CONNECT_ERR, 0)
+            setClientValue(self.client, "timeout", timeout)
+            setClientValue(self.client, "unit_id", unitID)
+            regs = self.client.read_holding_registers(address, count)
+            error = clientValue(self.client, "last_error")
+            if regs is not None or error not in STALE_ERRORS:
+                break
+            self.client.close()
+            timeout = self.attemptTimeout()
+            if not wasOpen or timeout is None:
+                break
+        return (regs, error, clientValue(self.client, "last_except"))
+
+    """
+    @brief:        Reads several register ranges
+    @detail:       When pipelined, up to MODBUS_PIPELINE_DEPTH requests are
+                   in flight at once, each with its own transaction ID, so
+                   a batch costs roughly one round trip rather than one
+                   per request. Requests which fail are retried, as for
+                   read(). Without pipelining the requests are read in turn.
+    @param:        List of (unit ID, address, count)
+    @return:       List of (registers or None, last error, last exception),
+                   in request order
+    """
+    def readMany(self, requests):
+        if not self.pipelined:
+            return [self.read(unitID, address, count) for unitID, address, count in requests]
+        with self.lock:
+            results = [(None, mbConst.MB_TIMEOUT_ERR, 0)]*len(requests)
+            todo = list(range(len(requests)))
+            attempt = 0
+            while todo:
+                timeout = self.attemptTimeout()
+                if timeout is None:
+                    break
+                for index, result in zip(todo, self.transactOnce([requests[i] for i in todo], timeout)):
+                    results[index] = result
+                todo = [i for i in todo if results[i][0] is None and results[i][1] in STALE_ERRORS]
+                attempt += 1
+                if todo and not self.backoff(attempt):
+                    break
+            return results
+
+    """
+    @brief:        Makes one attempt at a pipelined batch, see transact()
+    @detail:       As readOnce(), a batch which fails on a socket left
+                   over from an earlier capture is retried once on a
+                   fresh connection.
+    """
+    def transactOnce(self, requests, timeout):
+        for attempt in range(2):
+            wasOpen = self.isOpen()
+            if not self.connect(timeout):
+                return [(None, mbConst.MB_CONNECT_ERR, 0)]*len(requests)
+            results = self.transact(requests, timeout)
+            if not any(result[1] in STALE_ERRORS for result in results):
+                break
+            self.close()
+            timeout = self.attemptTimeout()
+            if not wasOpen or timeout is None:
+                break
+        return results
+
+    """
+    @brief:        Sends pipelined requests and matches up the responses
+    @detail:       Responses are matched by transaction ID, so they may
+                   arrive in any order. Replies to requests from an
+                   earlier, abandoned batch are discarded.
+                   With MODBUS_HEDGE_DELAY set, a request with no reply
+                   after that long is sent a second time, and whichever
+                   reply arrives first is used.
+    @return:       List of (registers or None, last error, last exception)
+    """
+    def transact(self, requests, timeout):
+        results = [None]*len(requests)
+        pending = {}        # Transaction ID -> request index
+        sentAt = {}         # Request index -> time.monotonic() first sent
+        hedged = set()
+        hedgeDelay = configuration.MODBUS_HEDGE_DELAY
+        nextRequest = 0
+        deadline = time.monotonic()+timeout
+        try:
+            while nextRequest < len(requests) or pending:
+                frames = []
+                while nextRequest < len(requests) and len(sentAt) < configuration.MODBUS_PIPELINE_DEPTH:
+                    frames.append(self.frame(pending, nextRequest, requests[nextRequest]))
+                    sentAt[nextRequest] = time.monotonic()
+                    nextRequest += 1
+                now = time.monotonic()
+                wait = deadline-now
+                if hedgeDelay > 0:
+                    for index in sentAt:
+                        if index in hedged:
+                            continue
+                        if now-sentAt[index] >= hedgeDelay:
+                            frames.append(self.frame(pending, index, requests[index]))
+                            hedged.add(index)
+                        else:
+                            wait = min(wait, sentAt[index]+hedgeDelay-now)
+                if frames:
+                    self.sock.sendall(b"".join(frames))
+                if deadline-now <= 0:
+                    raise socket.timeout()
+                if not select.select([self.sock], [], [], max(wait, 0))[0]:
+                    continue    # Nothing yet; time to hedge, or to give up
+                transactionID, protocolID, length, unit = MBAP.unpack(self.receive(MBAP.size, deadline))
+                pdu = self.receive(length-1, deadline)
+                if transactionID in pending:
+                    index = pending.pop(transactionID)
+                    if results[index] is None:
+                        results[index] = parseReadResponse(pdu, requests[index][2])
+                        del sentAt[index]
+                    for other in [tid for tid, i in pending.items() if i == index]:
+                        del pending[other]  # The hedged twin, if any
+        except socket.timeout:
+            error = mbConst.MB_TIMEOUT_ERR
+        except OSError:
+            error = mbConst.MB_RECV_ERR
+        else:
+            return results
+        return [result or (None, error, 0) for result in results]
+
+    """
+    @brief:        Builds the frame of a request under a new transaction ID
+    @return:       bytes
+    """
+    def frame(self, pending, index, request):
+        self.transactionID = (self.transactionID+1) & 0xFFFF
+        pending[self.transactionID] = index
+        unitID, address, count = request
+        return buildReadRequest(self.transactionID, unitID, address, count)
+
+    """
+    @brief:        Receives an exact number of bytes before the deadline
+    @return:       bytes
+    """
+    def receive(self, size, deadline):
+        data = b""
+        while len(data) < size:
+            remaining = deadline-time.monotonic()
+            if remaining <= 0:
+                raise socket.timeout()
+            self.sock.settimeout(remaining)
+            chunk = self.sock.recv(size-len(data))
+            if not chunk:
+                raise ConnectionResetError()
+            data += chunk
+        return data
+
+"""
+@brief:        One Modbus device (unit ID) on a shared session
+@detail:       Provides the parts of the ModbusClient interface used by
+               this file, with errors tracked per unit.
+@created:      18th Oct 2026
+"""
+class ModbusUnit:
+    def __init__(self, session, unitID):
+        self.session = session
+        self.unitID = unitID
+        self.error = 0
+        self.excep = 0
+
+    def read_holding_registers(self, address, count):
+        regs, self.error, self.excep = self.session.read(self.unitID, address, count)
+        return regs
+
+    def last_error(self):
+        return self.error
+
+    def last_except(self):
+        return self.excep
 
 
 # Modbus instances
-mb_inverter = ModbusClient(host=configuration.INVERTER_IP, port=configuration.MODBUS_PORT, auto_open=True, auto_close=True, timeout=configuration.MODBUS_TIMEOUT, unit_id=0) # As directly connecting to inverter, its addr is 0
-mb_meter = ModbusClient(host=configuration.INVERTER_IP, port=configuration.MODBUS_PORT, auto_open=True, auto_close=True, timeout=configuration.MODBUS_TIMEOUT, unit_id=configuration.METER_ADDR) # Smart Meter unit ID (device addr) is 240
+mb_session = ModbusSession(configuration.INVERTER_IP, configuration.MODBUS_PORT, configuration.MODBUS_TIMEOUT, configuration.MODBUS_PIPELINE) # Inverter and meter share one connection
+mb_inverter = ModbusUnit(mb_session, 0) # As directly connecting to inverter, its addr is 0
+mb_meter = ModbusUnit(mb_session, configuration.METER_ADDR) # Smart Meter unit ID (device addr) is 240
+
+"""
+@brief:        Closes the Modbus connection, e.g. on shutdown
+@created:      18th Oct 2026
+@return:       none
+"""
+def closeSession():
+    mb_session.close()
+
+"""
+@brief:        Starts a capture with a total time budget
+@detail:       Until endCapture(), reads retry failures while the budget
+               allows, and once it is spent they fail straight away with
+               MB_TIMEOUT_ERR, so their points come back as None.
+@param:        Seconds the capture may take
+@created:      18th Oct 2026
+@return:       none
+"""
+def startCapture(budget):
+    mb_session.deadline = time.monotonic()+budget
+
+"""
+@brief:        Ends the capture started by startCapture()
+@created:      18th Oct 2026
+@return:       none
+"""
+def endCapture():
+    mb_session.deadline = None
+
+
+
 
+"""
+#####################################################################
+
+        Modbus TCP Framing
+
+#####################################################################
+"""
+
+'''
+ For clients which talk Modbus TCP directly rather than through
+ pyModbusTCP, e.g. asyncAcquisition.py
+'''
+MBAP = struct.Struct(">HHHB")               # Transaction ID, protocol ID, length, unit ID
+READ_REQUEST = struct.Struct(">HHHBBHH")    # MBAP, function code, address, count
+FC_READ_HOLDING = 0x03
+
+"""
+@brief:        Builds a Read Holding Registers request frame
+@return:       bytes
+"""
+def buildReadRequest(transactionID, unitID, address, count):
+    return READ_REQUEST.pack(transactionID, 0, 6, unitID, FC_READ_HOLDING, address, count)
+
+"""
+@brief:        Parses the PDU of a Read Holding Registers response
+@param:        PDU (the frame after the MBAP header)
+@param:        Number of registers requested
+@return:       (registers or None, error, exception), with error and
+               exception codes as used by pyModbusTCP
+"""
+def parseReadResponse(pdu, count):
+    if len(pdu) >= 2 and pdu[0] == FC_READ_HOLDING|0x80:
+        return (None, mbConst.MB_EXCEPT_ERR, pdu[1])
+    if len(pdu) != 2+2*count or pdu[0] != FC_READ_HOLDING or pdu[1] != 2*count:
+        return (None, mbConst.MB_FRAME_ERR, 0)
+    return (list(struct.unpack_from(">%dH" % count, pdu, 2)), mbConst.MB_NO_ERR, 0)
+
+
+
+"""
+#####################################################################
+
+        Point Table
+
+#####################################################################
+"""
+
+WORD_MSW = "msw"                # Most significant word first (SunSpec)
+WORD_LSW = "lsw"                # Least significant word first
+
+# SunSpec model IDs, grouped where the layouts match
+MODEL_INVERTER  = (111, 112, 113)   # Inverter, single/split/three phase (float)
+MODEL_SETTINGS  = (121,)            # Basic settings
+MODEL_STATUS    = (122,)            # Measurements/status
+MODEL_CONTROLS  = (123,)            # Immediate controls
+MODEL_MPPT      = (160,)            # Multiple MPPT
+MODEL_METER     = (211, 212, 213)   # Meter, single/split/three phase (float)
+
+"""
+@brief:        Describes where a value lives and how to decode it
+@param:        Device the point is read from ("inv" or "mtr")
+@param:        SunSpec model IDs the point belongs to, or None for
+               registers outside the SunSpec map
+@param:        Offset from the model ID register (as in the SunSpec
+               model tables), or the address when model is None
+@param:        Number of registers
+@param:        struct format, including byte order (e.g. ">f")
+@param:        Word order, WORD_MSW or WORD_LSW
+@param:        Name of the SunSSF point scaling this value, or None
+@param:        Engineering unit
+@created:      18th Oct 2026
+"""
+class Point:
+    def __init__(self, device, model, offset, length, fmt, wordOrder, scale, unit):
+        self.device = device
+        self.model = model
+        self.offset = offset
+        self.length = length
+        self.codec = struct.Struct(fmt)
+        self.wordOrder = wordOrder
+        self.scale = scale
+        self.unit = unit
+
+'''
+ Every value read by this file. Names match the functions which return
+ them; the *_SF entries are the SunSSF scale factors. Model addresses
+ are found with discoverModels(); the Fronius site registers are fixed
+ (register number less one).
+'''
+POINTS = {
+    # Fronius site registers
+    "inv_SitePower_W":              Point("inv", None, 500-1, 2, ">I", WORD_MSW, None, "W"),
+    "inv_SiteEnergyDay_Wh":         Point("inv", None, 502-1, 4, ">Q", WORD_MSW, None, "Wh"),
+    "inv_SiteEnergyYear_Wh":        Point("inv", None, 506-1, 4, ">Q", WORD_MSW, None, "Wh"),
+    "inv_SiteEnergyTotal_Wh":       Point("inv", None, 510-1, 4, ">Q", WORD_MSW, None, "Wh"),
+    # Inverter model
+    "inv_SunspecID":                Point("inv", MODEL_INVERTER, 0,  1, ">H", WORD_MSW, None, ""),
+    "inv_ACCurrentTotal_A":         Point("inv", MODEL_INVERTER, 2,  2, ">f", WORD_MSW, None, "A"),
+    "inv_ACPower_W":                Point("inv", MODEL_INVERTER, 22, 2, ">f", WORD_MSW, None, "W"),
+    "inv_ACFreq_Hz":                Point("inv", MODEL_INVERTER, 24, 2, ">f", WORD_MSW, None, "Hz"),
+    "inv_ACAppPwr_VA":              Point("inv", MODEL_INVERTER, 26, 2, ">f", WORD_MSW, None, "VA"),
+    "inv_ACReacPwr_VAr":            Point("inv", MODEL_INVERTER, 28, 2, ">f", WORD_MSW, None, "VAr"),
+    "inv_ACPF_percent":             Point("inv", MODEL_INVERTER, 30, 2, ">f", WORD_MSW, None, "%"),
+    "inv_DCPwr_W":                  Point("inv", MODEL_INVERTER, 38, 2, ">f", WORD_MSW, None, "W"),
+    # Settings model
+    "inv_getMinPowerFactorQ1_cos":  Point("inv", MODEL_SETTINGS, 13, 1, ">h", WORD_MSW, "inv_PFMin_SF", "cos"),
+    "inv_getMinPowerFactorQ4_cos":  Point("inv", MODEL_SETTINGS, 16, 1, ">h", WORD_MSW, "inv_PFMin_SF", "cos"),
+    "inv_PFMin_SF":                 Point("inv", MODEL_SETTINGS, 29, 1, ">h", WORD_MSW, None, ""),
+    # Status model
+    "inv_Time_s":                   Point("inv", MODEL_STATUS,   41, 2, ">I", WORD_MSW, None, "s"),
+    # Controls model
+    "inv_getMaxPowerFactor_cos":    Point("inv", MODEL_CONTROLS, 10, 1, ">h", WORD_MSW, "inv_OutPFSet_SF", "cos"),
+    "inv_OutPFSet_SF":              Point("inv", MODEL_CONTROLS, 24, 1, ">h", WORD_MSW, None, ""),
+    # Multiple MPPT model
+    "inv_DCA_SF":                   Point("inv", MODEL_MPPT, 2,  1, ">h", WORD_MSW, None, ""),
+    "inv_DCV_SF":                   Point("inv", MODEL_MPPT, 3,  1, ">h", WORD_MSW, None, ""),
+    "inv_DCW_SF":                   Point("inv", MODEL_MPPT, 4,  1, ">h", WORD_MSW, None, ""),
+    "inv_DCs1Current_A":            Point("inv", MODEL_MPPT, 19, 1, ">h", WORD_MSW, "inv_DCA_SF", "A"),
+    "inv_DCs1Voltage_V":            Point("inv", MODEL_MPPT, 20, 1, ">h", WORD_MSW, "inv_DCV_SF", "V"),
+    "inv_DCs1Power_W":              Point("inv", MODEL_MPPT, 21, 1, ">h", WORD_MSW, "inv_DCW_SF", "W"),
+    "inv_DCs2Current_A":            Point("inv", MODEL_MPPT, 39, 1, ">h", WORD_MSW, "inv_DCA_SF", "A"),
+    "inv_DCs2Voltage_V":            Point("inv", MODEL_MPPT, 40, 1, ">h", WORD_MSW, "inv_DCV_SF", "V"),
+    "inv_DCs2Power_W":              Point("inv", MODEL_MPPT, 41, 1, ">h", WORD_MSW, "inv_DCW_SF", "W"),
+    # Meter model
+    "mtr_SunspecID":                Point("mtr", MODEL_METER, 0,  1, ">H", WORD_MSW, None, ""),
+    "mtr_ACCurrentTotal_A":         Point("mtr", MODEL_METER, 2,  2, ">f", WORD_MSW, None, "A"),
+    "mtr_ACVoltageAverage_V":       Point("mtr", MODEL_METER, 10, 2, ">f", WORD_MSW, None, "V"),
+    "mtr_ACFreq_Hz":                Point("mtr", MODEL_METER, 26, 2, ">f", WORD_MSW, None, "Hz"),
+    "mtr_ACPowerTotal_W":           Point("mtr", MODEL_METER, 28, 2, ">f", WORD_MSW, None, "W"),
+    "mtr_ACAppPowerTotal_VA":       Point("mtr", MODEL_METER, 36, 2, ">f", WORD_MSW, None, "VA"),
+    "mtr_ACReacPowerTotal_VAr":     Point("mtr", MODEL_METER, 44, 2, ">f", WORD_MSW, None, "VAr"),
+    "mtr_ACPFAverage_cos":          Point("mtr", MODEL_METER, 52, 2, ">f", WORD_MSW, None, "cos"),
+    "mtr_ACTotalWattHoursExp_Wh":   Point("mtr", MODEL_METER, 60, 2, ">I", WORD_MSW, None, "Wh"),
+    "mtr_ACTotalWattHoursImp_Wh":   Point("mtr", MODEL_METER, 68, 2, ">I", WORD_MSW, None, "Wh"),
+    "mtr_ACTotalVAHoursExp_Wh":     Point("mtr", MODEL_METER, 76, 2, ">I", WORD_MSW, None, "VAh"),
+    "mtr_ACTotalVAHoursImp_Wh":     Point("mtr", MODEL_METER, 84, 2, ">I", WORD_MSW, None, "VAh"),
+}
+
+"""
+@brief:        Packs registers into a big-endian byte buffer for decoding
+@return:       bytes
+"""
+def packRegs(regs):
+    return struct.pack(">%dH" % len(regs), *regs)
+
+"""
+@brief:        Decodes one point from a register buffer, without scaling
+@param:        Point
+@param:        Register buffer (from packRegs())
+@param:        Byte offset of the point within the buffer
+@return:       Raw value
+"""
+def decodePoint(point, buffer, offset):
+    if point.wordOrder == WORD_LSW and point.length > 1:
+        data = bytes(buffer[offset:offset+2*point.length])
+        buffer = b"".join(data[i:i+2] for i in range(len(data)-2, -1, -2))
+        offset = 0
+    return point.codec.unpack_from(buffer, offset)[0]
+
+"""
+@brief:        Encodes a raw (unscaled) value into registers, the reverse
+               of decodePoint()
+@param:        Point
+@param:        Raw value
+@return:       List of registers
+"""
+def encodePoint(point, value):
+    regs = list(struct.unpack(">%dH" % point.length, point.codec.pack(value)))
+    if point.wordOrder == WORD_LSW:
+        regs.reverse()
+    return regs
+
+
+
+"""
+#####################################################################
+
+        Model Discovery
+
+#####################################################################
+"""
+
+SUNSPEC_BASE = 40000            # Address of the "SunS" marker (register 40001)
+SUNSPEC_MARKER = [0x5375, 0x6E53]
+SUNSPEC_END = 0xFFFF            # Model ID marking the end of the model chain
+SUNSPEC_MAX_MODELS = 64         # Stop walking a chain which never ends
+
+'''
+ Model layout used when discovery is not possible, as found on Fronius
+ datamanagers in float mode. Each model maps to [address, length] of
+ its ID register and data; "end" is the address of the end marker.
+'''
+DEFAULT_INDEX = {
+    "inv": {"models": {1: [40002, 65], 113: [40069, 60], 120: [40131, 26], 121: [40159, 30],
+                       122: [40191, 44], 123: [40237, 24], 160: [40263, 48]},
+            "end": 40313},
+    "mtr": {"models": {1: [40002, 65], 213: [40069, 124]},
+            "end": 40195},
+}
+
+# Model index in use per device, and the point addresses resolved from it
+modelIndex = {"inv": None, "mtr": None}
+modelConnect = {"inv": -1, "mtr": -1}     # mb_session.connectCount when last checked
+pointAddresses = {"inv": None, "mtr": None}
+
+"""
+@brief:        Gets the path of the model index cache file
+"""
+def indexFile():
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), configuration.SUNSPEC_INDEX_FILE)
+
+"""
+@brief:        Gets the key identifying a device in the index cache file
+"""
+def indexKey(host, port, unitID):
+    return "%s:%d:%d" % (host, port, unitID)
+
+"""
+@brief:        Gets the cache file key of this file's devices
+"""
+def deviceKey(device):
+    return indexKey(configuration.INVERTER_IP, configuration.MODBUS_PORT, deviceClient(device).unitID)
+
+"""
+@brief:        Walks the SunSpec model chain
+@detail:       Starting after the "SunS" marker, reads each model header
+               (ID and length) and skips to the next, until the end
+               marker.
+               Shared by this file and asyncAcquisition.py, so it does no
+               I/O itself: it yields (address, count) for each read it
+               needs and is sent the registers read (None when failed),
+               see runReads().
+@created:      18th Oct 2026
+@return:       Index, {"models": {ID: [address, length]}, "end": address}
+               None when discovery failed
+"""
+def walkModels():
+    marker = yield (SUNSPEC_BASE, 2)
+    if marker is None or list(marker) != SUNSPEC_MARKER:
+        return None
+    models = {}
+    address = SUNSPEC_BASE+2
+    for i in range(SUNSPEC_MAX_MODELS):
+        header = yield (address, 2)
+        if header is None or len(header) != 2:
+            return None
+        if header[0] == SUNSPEC_END:
+            return {"models": models, "end": address}
+        models[header[0]] = [address, header[1]]
+        address += 2+header[1]
+    return None
+
+"""
+@brief:        Checks a cached index still matches the device
+@detail:       Each model's ID and length header is read at its cached
+               address, and the end marker after the last, so models
+               changing length are caught even when the chain keeps its
+               total length. Reads as walkModels().
+@created:      18th Oct 2026
+@return:       True: Valid
+               False: Stale or could not be read
+"""
+def checkIndex(index):
+    for model, (address, length) in index["models"].items():
+        header = yield (address, 2)
+        if header is None or list(header) != [model, length]:
+            return False
+    header = yield (index["end"], 2)
+    return header is not None and len(header) == 2 and header[0] == SUNSPEC_END
+
+"""
+@brief:        Runs walkModels() or checkIndex() with a read function
+@param:        Generator
+@param:        Function reading (address, count), returning registers or
+               None
+@return:       The generator's result
+"""
+def runReads(reader, read):
+    try:
+        request = next(reader)
+        while True:
+            request = reader.send(read(*request))
+    except StopIteration as stop:
+        return stop.value
+
+"""
+@brief:        Discovers the model chain of a device, see walkModels()
+@param:        Device ("inv" or "mtr")
+@return:       Index
+               None when discovery failed
+"""
+def discoverModels(device):
+    return runReads(walkModels(), deviceClient(device).read_holding_registers)
+
+"""
+@brief:        Checks a cached index still matches a device, see
+               checkIndex()
+@return:       True: Valid
+               False: Stale or could not be read
+"""
+def validateIndex(device, index):
+    return runReads(checkIndex(index), deviceClient(device).read_holding_registers)
+
+"""
+@brief:        Reads the index cache file
+@return:       Dictionary of key to index
+"""
+def readIndexFile():
+    try:
+        with open(indexFile()) as cacheFile:
+            stored = json.load(cacheFile)
+    except (OSError, ValueError):
+        return {}
+    for index in stored.values():
+        index["models"] = dict((int(model), place) for model, place in index["models"].items())
+    return stored
+
+"""
+@brief:        Stores an index in the cache file
+@return:       none
+"""
+def writeIndexFile(key, index):
+    stored = readIndexFile()
+    stored[key] = index
+    tmpName = indexFile()+".tmp"
+    try:
+        with open(tmpName, "w") as cacheFile:
+            json.dump(stored, cacheFile)
+        os.replace(tmpName, indexFile())
+    except OSError as error:
+        print("Error: {}".format(error))
+
+"""
+@brief:        Loads the model index of a device
+@detail:       The cached index is used when it validates. Otherwise the
+               model chain is discovered and cached. If the device cannot
+               be reached, the last known index (or the Fronius default)
+               is used until the next reconnect.
+@param:        Device ("inv" or "mtr")
+@created:      18th Oct 2026
+@return:       none
+"""
+def loadModelIndex(device):
+    cached = readIndexFile().get(deviceKey(device))
+    if cached is not None and validateIndex(device, cached):
+        index = cached
+    else:
+        index = discoverModels(device)
+        if index is not None:
+            writeIndexFile(deviceKey(device), index)
+        else:
+            index = cached or modelIndex[device] or DEFAULT_INDEX[device]
+    modelIndex[device] = index
+    modelConnect[device] = mb_session.connectCount
+    pointAddresses[device] = None
+
+"""
+@brief:        Works out the address of every point of a device type
+@param:        Device type ("inv" or "mtr")
+@param:        Models from an index, {ID: [address, length]}
+@return:       Dictionary of point name to address; points whose model
+               the device does not have are left out
+"""
+def resolveAddresses(device, models):
+    addresses = {}
+    for name, point in POINTS.items():
+        if point.device != device:
+            continue
+        if point.model is None:
+            addresses[name] = point.offset
+            continue
+        for model in point.model:
+            if model in models:
+                addresses[name] = models[model][0]+point.offset
+                break
+    return addresses
+
+"""
+@brief:        Gets the address of every point of a device
+@detail:       The model index is checked again after each reconnect, as
+               the device may have been updated in the meantime.
+@param:        Device ("inv" or "mtr")
+@return:       Dictionary of point name to address; points whose model
+               the device does not have are left out
+"""
+def deviceAddresses(device):
+    if modelIndex[device] is None or modelConnect[device] != mb_session.connectCount:
+        loadModelIndex(device)
+    if pointAddresses[device] is None:
+        pointAddresses[device] = resolveAddresses(device, modelIndex[device]["models"])
+    return pointAddresses[device]
+
+
+
+"""
+#####################################################################
+
+        Block Reads
+
+#####################################################################
+"""
+
+MODBUS_MAX_REGS = 125           # Most registers allowed in one read request
+
+# Captured blocks per device, as a list of (start address, register count, buffer)
+blocks = {"inv": [], "mtr": []}
+
+"""
+@brief:        Works out the fewest read requests covering a set of points
+@detail:       Points are packed whole into requests of at most
+               MODBUS_MAX_REGS registers, so no value is ever split
+               across two requests.
+@param:        Dictionary of point name to address
+@return:       List of (start address, register count)
+"""
+def planReads(addresses):
+    spans = sorted((address, address+POINTS[name].length) for name, address in addresses.items())
+    plan = []
+    for start, end in spans:
+        if plan and end-plan[-1][0] <= MODBUS_MAX_REGS:
+            plan[-1][1] = max(plan[-1][1], end)
+        else:
+            plan.append([start, end])
+    return [(start, end-start) for start, end in plan]
+
+"""
+@brief:        Works out the read requests for a device
+@param:        Device ("inv" or "mtr")
+@return:       List of (start address, register count)
+"""
+def readPlan(device):
+    return planReads(deviceAddresses(device))
+
+"""
+@brief:        Gets the Modbus instance for a device
+"""
+def deviceClient(device):
+    if device == "inv":
+        return mb_inverter
+    return mb_meter
+
+"""
+@brief:        Captures the register maps of several devices for later
+               decoding
+@detail:       All the reads go to the session as one batch, so with
+               MODBUS_PIPELINE they are in flight together. The scale
+               factors are part of the inverter map, so they are
+               refreshed from the same batch.
+               Until releaseBlocks() is called, points are decoded from
+               the captured registers rather than read one at a time. If
+               capture of a device fails, its points fall back to being
+               read one at a time, so the usual error reporting still
+               applies.
+@param:        List of devices ("inv" and/or "mtr")
+@created:      18th Oct 2026
+@return:       True: Success
+               False: Failed
+"""
+def captureDevices(devices):
+    requests = []
+    places = []
+    for device in devices:
+        for start, count in readPlan(device):
+            requests.append((deviceClient(device).unitID, start, count))
+            places.append((device, start, count))
+    results = mb_session.readMany(requests)
+    captured = dict((device, []) for device in devices)
+    errors = {}
+    for (device, start, count), (regs, error, excep) in zip(places, results):
+        if regs is None or len(regs) != count:
+            captured[device] = None
+            errors.setdefault(device, (error or mbConst.MB_FRAME_ERR, excep))
+        elif captured[device] is not None:
+            captured[device].append((start, count, packRegs(regs)))
+    for device in devices:
+        client = deviceClient(device)
+        client.error, client.excep = errors.get(device, (0, 0))  # As seen by inv_lastError()/mtr_lastError()
+        blocks[device] = captured[device] or []
+    return all(captured[device] for device in devices)
+
+"""
+@brief:        Captures a device's register map, see captureDevices()
+@created:      18th Oct 2026
+@return:       True: Success
+               False: Failed
+"""
+def captureBlocks(device):
+    return captureDevices([device])
+
+"""
+@brief:        Captures the inverter register map
+@created:      18th Oct 2026
+@return:       True: Success
+               False: Failed
+"""
+def inv_captureBlocks():
+    return captureBlocks("inv")
+
+"""
+@brief:        Captures the smart meter register map
+@created:      18th Oct 2026
+@return:       True: Success
+               False: Failed
+"""
+def mtr_captureBlocks():
+    return captureBlocks("mtr")
+
+"""
+@brief:        Discards captured blocks, so values are read live again
+@created:      18th Oct 2026
+@return:       none
+"""
+def releaseBlocks():
+    for device in blocks:
+        blocks[device] = []
+
+"""
+@brief:        Finds registers, from captured blocks where possible
+@param:        Device ("inv" or "mtr")
+@param:        Address of first register
+@param:        Number of registers
+@return:       (buffer, byte offset)
+               None when the registers could not be read
+"""
+def readBuffer(device, address, count):
+    for start, length, buffer in blocks[device]:
+        if start <= address and address+count <= start+length:
+            return (buffer, (address-start)*2)
+    regs = deviceClient(device).read_holding_registers(address, count)
+    if regs is None or len(regs) != count:
+        return None
+    return (packRegs(regs), 0)
+
+"""
+@brief:        Reads and decodes a point, applying its scale factor
+@param:        Point name, see POINTS
+@created:      18th Oct 2026
+@return:       Value
+               None when it could not be read
+"""
+def readPoint(name):
+    point = POINTS[name]
+    address = deviceAddresses(point.device).get(name)
+    if address is None:
+        return None
+    found = readBuffer(point.device, address, point.length)
+    if found is None:
+        return None
+    value = decodePoint(point, found[0], found[1])
+    if point.scale is not None:
+        value = scaleValue(value, point.scale)
+    return value
+
+"""
+@brief:        Decodes points from captured blocks, without scaling
+@detail:       Points not covered by the blocks are left out.
+@param:        Dictionary of point name to address
+@param:        List of (start address, register count, buffer)
+@return:       Dictionary of point name to raw value
+"""
+def decodeBlocks(addresses, captured):
+    values = {}
+    for name, address in addresses.items():
+        point = POINTS[name]
+        for start, length, buffer in captured:
+            if start <= address and address+point.length <= start+length:
+                values[name] = decodePoint(point, buffer, (address-start)*2)
+                break
+    return values
+
+"""
+@brief:        Scales decoded points
+@detail:       Shared with asyncAcquisition.py. The scale factor points
+               themselves are left out, and NaN (not implemented) is
+               None.
+@param:        Dictionary of point name to raw value, from decodeBlocks()
+@param:        Function scaling (value, scale factor point name), as
+               scaleValue()
+@created:      18th Oct 2026
+@return:       Dictionary of point name to value
+"""
+def scaleValues(values, scale):
+    scaled = {}
+    for name, value in values.items():
+        point = POINTS[name]
+        if name in SCALE_POINTS:
+            continue
+        if isinstance(value, float) and math.isnan(value):
+            value = None
+        if value is not None and point.scale is not None:
+            value = scale(value, point.scale)
+        scaled[name] = value
+    return scaled
+
+"""
+@brief:        Decodes every point of a device from its captured blocks
+@detail:       Points not covered by the captured blocks are left out.
+@param:        Device ("inv" or "mtr")
+@created:      18th Oct 2026
+@return:       Dictionary of point name to value
+"""
+def decodeSnapshot(device):
+    return scaleValues(decodeBlocks(deviceAddresses(device), blocks[device]), scaleValue)
+
+
+
+"""
+#####################################################################
+
+        Scale Factors
+
+#####################################################################
+"""
+
+'''
+ SunSSF values hardly ever change, so they are read together and cached
+ until SCALE_FACTOR_TTL expires, the Modbus session reconnects, or a
+ value looks wrong.
+'''
+SCALE_POINTS = sorted(set(p.scale for p in POINTS.values() if p.scale is not None))
+SCALE_MIN = -10                 # Valid SunSSF range, per the SunSpec specification
+SCALE_MAX = 10
+
+scaleCache = {}
+scaleLoaded = -float("inf")     # time.monotonic() of last load
+scaleConnect = -1               # mb_session.connectCount at last load
+scaleRechecked = -float("inf")  # time.monotonic() of last reload for an out of range value
+
+"""
+@brief:        Reads all scale factors into the cache
+@detail:       Neighbouring registers are fetched in one request.
+@created:      18th Oct 2026
+@return:       True: Success
+               False: Failed
+"""
+def loadScaleFactors():
+    global scaleCache
+    global scaleLoaded
+    global scaleConnect
+    cache = {}
+    places = []
+    for name in SCALE_POINTS:
+        address = deviceAddresses(POINTS[name].device).get(name)
+        if address is not None:
+            places.append((POINTS[name].device, address, name))
+    places.sort()
+    first = 0
+    while first < len(places):
+        device, start = places[first][0], places[first][1]
+        last = first
+        while last+1 < len(places) and places[last+1][0] == device and places[last+1][1]-start < 16:
+            last += 1
+        found = readBuffer(device, start, places[last][1]-start+1)
+        if found is None:
+            scaleCache = {}
+            return False
+        for device, address, name in places[first:last+1]:
+            cache[name] = decodePoint(POINTS[name], found[0], found[1]+(address-start)*2)
+        first = last+1
+    scaleCache = cache
+    scaleLoaded = time.monotonic()
+    scaleConnect = mb_session.connectCount
+    return True
+
+"""
+@brief:        Forces scale factors to be read again on next use
+@created:      18th Oct 2026
+@return:       none
+"""
+def invalidateScaleFactors():
+    global scaleCache
+    global scaleLoaded
+    scaleCache = {}
+    scaleLoaded = -float("inf")
+
+"""
+@brief:        Gets a cached scale factor
+@param:        Scale factor point name
+@created:      18th Oct 2026
+@return:       Scale factor (int16)
+               None when it could not be read
+"""
+def scaleFactor(name):
+    if (time.monotonic()-scaleLoaded > configuration.SCALE_FACTOR_TTL
+            or scaleConnect != mb_session.connectCount):
+        loadScaleFactors()
+    return scaleCache.get(name)
+
+"""
+@brief:        Applies a scale factor to a raw value
+@detail:       Shared with asyncAcquisition.py. A scale factor outside
+               the SunSpec range (e.g. 0x8000, not implemented) gives no
+               value rather than a wrong one.
+@param:        Raw value
+@param:        Scale factor
+@created:      18th Oct 2026
+@return:       Scaled value
+               None when the value or scale factor is missing or invalid
+"""
+def applyScale(value, scale):
+    if value is None or scale is None or not (SCALE_MIN <= scale <= SCALE_MAX):
+        return None
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value*(10**(scale))
+
+"""
+@brief:        Applies a cached scale factor to a raw value
+@detail:       A scale factor outside the SunSpec range may mean the
+               cached copy is no longer valid, so the cache is reloaded,
+               at most once per SCALE_FACTOR_TTL; a scale factor still
+               out of range gives no value.
+@param:        Raw value
+@param:        Scale factor point name
+@created:      18th Oct 2026
+@return:       Scaled value
+               None when the scale factor is missing or invalid
+"""
+def scaleValue(value, name):
+    global scaleRechecked
+    scale = scaleFactor(name)
+    if (scale is None or not (SCALE_MIN <= scale <= SCALE_MAX)) and time.monotonic()-scaleRechecked > configuration.SCALE_FACTOR_TTL:
+        scaleRechecked = time.monotonic()
+        invalidateScaleFactors()
+        scale = scaleFactor(name)
+    return applyScale(value, scale)
 
 
 
@@ -97,9 +1179,7 @@ mb_meter = ModbusClient(host=configuration.INVERTER_IP, port=configuration.MODBU
 @return:       Sunspec ID (uint16) 
 """
 def inv_SunspecID():
-    regs = mb_inverter.read_holding_registers(40070-1, 1)
-    return regs[0]
-    #print("Inverter ID="+str(regs[0]))
+    return readPoint("inv_SunspecID")
 
 """
 @brief:        Site Energy Produced so far in current day [Watt-hours] from Inverter
@@ -107,14 +1187,7 @@ def inv_SunspecID():
 @return:       Site Energy for the day (uint64) 
 """
 def inv_SiteEnergyDay_Wh():
-    regs = mb_inverter.read_holding_registers(502-1, 4)
-    Translate=convert4()
-    Translate.u16.hh = regs[3]
-    Translate.u16.hl = regs[2]
-    Translate.u16.lh = regs[1]
-    Translate.u16.ll = regs[0]
-    return Translate.uint64
-    #print("Site Energy Day="+str(Translate.uint64))
+    return readPoint("inv_SiteEnergyDay_Wh")
 
 """
 @brief:        Site Energy Produced so far in current year [Watt-hours] from Inverter
@@ -122,14 +1195,7 @@ def inv_SiteEnergyDay_Wh():
 @return:       Site Energy for the year (uint64) 
 """
 def inv_SiteEnergyYear_Wh():
-    regs = mb_inverter.read_holding_registers(506-1, 4)
-    Translate=convert4()
-    Translate.u16.hh = regs[3]
-    Translate.u16.hl = regs[2]
-    Translate.u16.lh = regs[1]
-    Translate.u16.ll = regs[0]
-    return Translate.uint64
-    #print("Site Energy Year="+str(Translate.uint64))
+    return readPoint("inv_SiteEnergyYear_Wh")
 
 """
 @brief:        Instantanious Site Energy Total Produced [Watt-hours] from Inverter
@@ -137,14 +1203,7 @@ def inv_SiteEnergyYear_Wh():
 @return:       Site Energy Total Produced (uint64) 
 """
 def inv_SiteEnergyTotal_Wh():
-    regs = mb_inverter.read_holding_registers(510-1, 4)
-    Translate=convert4()
-    Translate.u16.hh = regs[3]
-    Translate.u16.hl = regs[2]
-    Translate.u16.lh = regs[1]
-    Translate.u16.ll = regs[0]
-    return Translate.uint64
-    #print("Site Energy Total="+str(Translate.uint64))
+    return readPoint("inv_SiteEnergyTotal_Wh")
 
 """
 @brief:        Instantanious Site Power [Watts] from Inverter
@@ -152,12 +1211,7 @@ def inv_SiteEnergyTotal_Wh():
 @return:       Current Site Power (uint32) 
 """
 def inv_SitePower_W():
-    regs = mb_inverter.read_holding_registers(500-1, 2)
-    Translate=convert2()
-    Translate.u16.h = regs[1]
-    Translate.u16.l = regs[0]
-    return Translate.uint32
-    #print("Site Power="+str(Translate.uint32))
+    return readPoint("inv_SitePower_W")
 
 
 """
@@ -166,15 +1220,7 @@ def inv_SitePower_W():
 @return:       Max Power Factor (int16) 
 """
 def inv_getMaxPowerFactor_cos():
-    Translate=convert1()
-    TranslateScale=convert1()
-    regs = mb_inverter.read_holding_registers(40248-1, 1)
-    scale = mb_inverter.read_holding_registers(40262-1, 1) # Sunssf Scale factor
-    TranslateScale.u16 = scale[0]
-    Translate.u16=regs[0]
-    maxPF=Translate.s16*(10**(TranslateScale.s16))
-    return maxPF
-    #print("Inverter ID="+str(maxPf))
+    return readPoint("inv_getMaxPowerFactor_cos")
 
 
 """
@@ -183,15 +1229,7 @@ def inv_getMaxPowerFactor_cos():
 @return:       Max Power Factor in Q1 (int16) 
 """
 def inv_getMinPowerFactorQ1_cos():
-    Translate=convert1()
-    TranslateScale=convert1()
-    regs = mb_inverter.read_holding_registers(40173-1, 1)
-    scale = mb_inverter.read_holding_registers(40189-1, 1) # Sunssf Scale factor
-    TranslateScale.u16 = scale[0]
-    Translate.u16=regs[0]
-    minPF=Translate.s16*(10**(TranslateScale.s16))
-    return minPF
-    #print("Min Power Factor in Quadrent 1="+str(regs[0]))
+    return readPoint("inv_getMinPowerFactorQ1_cos")
     
 """
 @brief:        Min Power Factor in Quadrent 4 of Inverter
@@ -199,15 +1237,7 @@ def inv_getMinPowerFactorQ1_cos():
 @return:       Max Power Factor in Q4 (int16) 
 """
 def inv_getMinPowerFactorQ4_cos():
-    Translate=convert1()
-    TranslateScale=convert1()
-    regs = mb_inverter.read_holding_registers(40173-1, 1)
-    scale = mb_inverter.read_holding_registers(40189-1, 1) # Sunssf Scale factor
-    TranslateScale.u16 = scale[0]
-    Translate.u16=regs[0]
-    minPF=Translate.s16*(10**(TranslateScale.s16))
-    return minPF
-    #print("Min Power Factor in Quadrent 4="+str(regs[0]))
+    return readPoint("inv_getMinPowerFactorQ4_cos")
 
 
 """
@@ -216,12 +1246,7 @@ def inv_getMinPowerFactorQ4_cos():
 @return:       Current Site Power (float32) 
 """
 def inv_ACCurrentTotal_A():
-    regs = mb_inverter.read_holding_registers(40072-1, 2)
-    Translate=convert2()
-    Translate.u16.h = regs[1]
-    Translate.u16.l = regs[0]
-    return Translate.float
-    #print("AC Total Current="+str(Translate.float))
+    return readPoint("inv_ACCurrentTotal_A")
 
 
 """
@@ -231,12 +1256,7 @@ def inv_ACCurrentTotal_A():
 @return:       Current AC Power (float32) 
 """
 def inv_ACPower_W():
-    regs = mb_inverter.read_holding_registers(40092-1, 2)
-    Translate=convert2()
-    Translate.u16.h = regs[1]
-    Translate.u16.l = regs[0]
-    return Translate.float
-    #print("AC Power="+str(Translate.float))
+    return readPoint("inv_ACPower_W")
     
 """
 @brief:        Instantanious Frequency being producted for AC Output [Hz] at the Inverter
@@ -245,12 +1265,7 @@ def inv_ACPower_W():
 @return:       Current AC Frequency (float32) 
 """
 def inv_ACFreq_Hz():
-    regs = mb_inverter.read_holding_registers(40094-1, 2)
-    Translate=convert2()
-    Translate.u16.h = regs[1]
-    Translate.u16.l = regs[0]
-    return Translate.float
-    #print("AC Frequency="+str(Translate.float))
+    return readPoint("inv_ACFreq_Hz")
     
 """
 @brief:        Instantanious AC Apparent Power being Produced [VA] from Inverter
@@ -258,12 +1273,7 @@ def inv_ACFreq_Hz():
 @return:       Current AC Power (float32)
 """
 def inv_ACAppPwr_VA():
-    regs = mb_inverter.read_holding_registers(40096-1, 2)
-    Translate=convert2()
-    Translate.u16.h = regs[1]
-    Translate.u16.l = regs[0]
-    return Translate.float
-    #print("AC Apparent Power="+str(Translate.float))
+    return readPoint("inv_ACAppPwr_VA")
     
 """
 @brief:        Instantanious AC Reactive Power being Produced [VAr] from Inverter
@@ -271,12 +1281,7 @@ def inv_ACAppPwr_VA():
 @return:       Current AC Power (float32)
 """
 def inv_ACReacPwr_VAr():
-    regs = mb_inverter.read_holding_registers(40098-1, 2)
-    Translate=convert2()
-    Translate.u16.h = regs[1]
-    Translate.u16.l = regs[0]
-    return Translate.float
-    #print("AC Reactive Power="+str(Translate.float))
+    return readPoint("inv_ACReacPwr_VAr")
 
 """
 @brief:        Instantanious AC Power Factor being Produced [%] from Inverter
@@ -284,12 +1289,7 @@ def inv_ACReacPwr_VAr():
 @return:       Current AC Power Factor (float32)
 """
 def inv_ACPF_percent():
-    regs = mb_inverter.read_holding_registers(40100-1, 2)
-    Translate=convert2()
-    Translate.u16.h = regs[1]
-    Translate.u16.l = regs[0]
-    return Translate.float
-    #print("AC Power Factor="+str(Translate.float))
+    return readPoint("inv_ACPF_percent")
 
 """
 @brief:        Instantanious DC Power Total being Produced [Watts] from Inverter
@@ -298,12 +1298,7 @@ def inv_ACPF_percent():
 @return:       Current DC String Power Total (float32)
 """
 def inv_DCPwr_W():
-    regs = mb_inverter.read_holding_registers(40108-1, 2)
-    Translate=convert2()
-    Translate.u16.h = regs[1]
-    Translate.u16.l = regs[0]
-    return Translate.float
-    #print("DC String Power Total="+str(Translate.float))
+    return readPoint("inv_DCPwr_W")
 
 """
 @brief:        Gets the time which is set on the inverter [seconds] from Inverter
@@ -315,15 +1310,10 @@ def inv_DCPwr_W():
 @return:       Current Inverter Time (uint32) 
 """
 def inv_Time_s():
-    regs = mb_inverter.read_holding_registers(40233-1, 2)
-    
-    Translate=convert2()
-    Translate.u16.h = regs[1]
-    Translate.u16.l = regs[0]
-    epoch = Translate.uint32+946684800 # Add seconds between 1/1/1970 and 1/1/2000 
-    return epoch
-    #SampleTime = time.gmtime(epoch)
-    #print("Time: "+time.strftime('%d-%m-%Y %H:%M:%S',SampleTime))
+    epoch = readPoint("inv_Time_s")
+    if epoch is None:
+        return None
+    return epoch+946684800 # Add seconds between 1/1/1970 and 1/1/2000 
 
 
 """
@@ -332,15 +1322,7 @@ def inv_Time_s():
 @return:       DC Current for String 1 (uint16) 
 """
 def inv_DCs1Current_A():
-    Translate=convert1()
-    TranslateScale=convert1()
-    regs = mb_inverter.read_holding_registers(40283-1, 1)
-    scale = mb_inverter.read_holding_registers(40266-1, 1) # Sunssf Scale factor
-    TranslateScale.u16 = scale[0]
-    Translate.u16=regs[0]
-    DCcurrent=Translate.s16*(10**(TranslateScale.s16))
-    return DCcurrent
-    #print("DC Current for String 1="+str(regs[0]))
+    return readPoint("inv_DCs1Current_A")
     
 """
 @brief:        String 2 DC Current
@@ -348,15 +1330,7 @@ def inv_DCs1Current_A():
 @return:       DC Current for String 2 (uint16) 
 """
 def inv_DCs2Current_A():
-    Translate=convert1()
-    TranslateScale=convert1()
-    regs = mb_inverter.read_holding_registers(40303-1, 1)
-    scale = mb_inverter.read_holding_registers(40266-1, 1) # Sunssf Scale factor
-    TranslateScale.u16 = scale[0]
-    Translate.u16=regs[0]
-    DCcurrent=Translate.s16*(10**(TranslateScale.s16))
-    return DCcurrent
-    #print("DC Current for String 2="+str(regs[0]))
+    return readPoint("inv_DCs2Current_A")
 
 """
 @brief:        String 1 DC Voltage
@@ -364,15 +1338,7 @@ def inv_DCs2Current_A():
 @return:       DC Voltage for String 1 (uint16) 
 """
 def inv_DCs1Voltage_V():
-    Translate=convert1()
-    TranslateScale=convert1()
-    regs = mb_inverter.read_holding_registers(40284-1, 1)
-    scale = mb_inverter.read_holding_registers(40267-1, 1) # Sunssf Scale factor
-    TranslateScale.u16 = scale[0]
-    Translate.u16=regs[0]
-    DCcurrent=Translate.s16*(10**(TranslateScale.s16))
-    return DCcurrent
-    #print("DC Voltage for String 1="+str(regs[0]))
+    return readPoint("inv_DCs1Voltage_V")
 
 """
 @brief:        String 2 DC Voltage
@@ -380,15 +1346,7 @@ def inv_DCs1Voltage_V():
 @return:       DC Voltage for String 2 (uint16) 
 """
 def inv_DCs2Voltage_V():
-    Translate=convert1()
-    TranslateScale=convert1()
-    regs = mb_inverter.read_holding_registers(40304-1, 1)
-    scale = mb_inverter.read_holding_registers(40267-1, 1) # Sunssf Scale factor
-    TranslateScale.u16 = scale[0]
-    Translate.u16=regs[0]
-    DCcurrent=Translate.s16*(10**(TranslateScale.s16))
-    return DCcurrent
-    #print("DC Voltage for String 2="+str(regs[0]))
+    return readPoint("inv_DCs2Voltage_V")
     
 """
 @brief:        String 1 DC Power
@@ -396,15 +1354,7 @@ def inv_DCs2Voltage_V():
 @return:       DC Power for String 1 (uint16) 
 """
 def inv_DCs1Power_W():
-    Translate=convert1()
-    TranslateScale=convert1()
-    regs = mb_inverter.read_holding_registers(40285-1, 1)
-    scale = mb_inverter.read_holding_registers(40268-1, 1) # Sunssf Scale factor
-    TranslateScale.u16 = scale[0]
-    Translate.u16=regs[0]
-    DCcurrent=Translate.s16*(10**(TranslateScale.s16))
-    return DCcurrent
-    #print("DC Power for String 1="+str(regs[0]))
+    return readPoint("inv_DCs1Power_W")
     
 """
 @brief:        String 2 DC Power
@@ -412,16 +1362,7 @@ def inv_DCs1Power_W():
 @return:       DC Power for String 2 (uint16) 
 """
 def inv_DCs2Power_W():
-    Translate=convert1()
-    TranslateScale=convert1()
-    regs = mb_inverter.read_holding_registers(40305-1, 1)
-    scale = mb_inverter.read_holding_registers(40268-1, 1) # Sunssf Scale factor
-    TranslateScale.u16 = scale[0]
-    Translate.u16=regs[0]
-    DCcurrent=Translate.s16*(10**(TranslateScale.s16))
-    return DCcurrent
-    #print("DC Power for String 2="+str(regs[0]))
-    
+    return readPoint("inv_DCs2Power_W")
 
 """
 #####################################################################
@@ -441,9 +1382,7 @@ def inv_DCs2Power_W():
 @return:       Sunspec ID (uint16) 
 """
 def mtr_SunspecID():
-    regs = mb_meter.read_holding_registers(40070-1, 1)
-    return regs[0]
-    #print("Inverter ID="+str(regs[0]))
+    return readPoint("mtr_SunspecID")
 
 
 """
@@ -454,12 +1393,7 @@ def mtr_SunspecID():
 @return:       Instantanious AC Current (float32) 
 """
 def mtr_ACCurrentTotal_A():
-    regs = mb_meter.read_holding_registers(40072-1, 2)
-    Translate=convert2()
-    Translate.u16.h = regs[1]
-    Translate.u16.l = regs[0]
-    return Translate.float
-    #print("Feed-in AC Current="+str(Translate.float))
+    return readPoint("mtr_ACCurrentTotal_A")
 
 """
 @brief:        Instantanious AC Voltage at Feed-in Point [Volts] via Smart Meter
@@ -468,12 +1402,7 @@ def mtr_ACCurrentTotal_A():
 @return:       Instantanious AC Voltage (float32) 
 """
 def mtr_ACVoltageAverage_V():
-    regs = mb_meter.read_holding_registers(40080-1, 2)
-    Translate=convert2()
-    Translate.u16.h = regs[1]
-    Translate.u16.l = regs[0]
-    return Translate.float
-    #print("Feed-in AC Voltage="+str(Translate.float))
+    return readPoint("mtr_ACVoltageAverage_V")
 
 """
 @brief:        Instantanious AC Frequency at Feed-in Point [Volts] via Smart Meter
@@ -481,12 +1410,7 @@ def mtr_ACVoltageAverage_V():
 @return:       Instantanious AC Frequency (float32) 
 """
 def mtr_ACFreq_Hz():
-    regs = mb_meter.read_holding_registers(40096-1, 2)
-    Translate=convert2()
-    Translate.u16.h = regs[1]
-    Translate.u16.l = regs[0]
-    return Translate.float
-    #print("Feed-in AC Frequency="+str(Translate.float))
+    return readPoint("mtr_ACFreq_Hz")
 
 """
 @brief:        Instantanious Total AC Power at Feed-in Point [Watts] via Smart Meter
@@ -496,12 +1420,7 @@ def mtr_ACFreq_Hz():
 @return:       Instantanious AC Power (float32) 
 """
 def mtr_ACPowerTotal_W():
-    regs = mb_meter.read_holding_registers(40098-1, 2)
-    Translate=convert2()
-    Translate.u16.h = regs[1]
-    Translate.u16.l = regs[0]
-    return Translate.float
-    #print("Feed-in AC Power="+str(Translate.float))
+    return readPoint("mtr_ACPowerTotal_W")
 
 """
 @brief:        Instantanious Total AC Apparent Power at Feed-in Point [Volt-Amps] 
@@ -512,12 +1431,7 @@ def mtr_ACPowerTotal_W():
 @return:       Instantanious AC Apparent Power (float32) 
 """
 def mtr_ACAppPowerTotal_VA():
-    regs = mb_meter.read_holding_registers(40106-1, 2)
-    Translate=convert2()
-    Translate.u16.h = regs[1]
-    Translate.u16.l = regs[0]
-    return Translate.float
-    #print("Feed-in AC Apparent Power="+str(Translate.float))
+    return readPoint("mtr_ACAppPowerTotal_VA")
     
 """
 @brief:        Instantanious Total AC Reactive Power at Feed-in Point 
@@ -528,12 +1442,7 @@ def mtr_ACAppPowerTotal_VA():
 @return:       Instantanious AC reactive Power (float32) 
 """
 def mtr_ACReacPowerTotal_VAr():
-    regs = mb_meter.read_holding_registers(40114-1, 2)
-    Translate=convert2()
-    Translate.u16.h = regs[1]
-    Translate.u16.l = regs[0]
-    return Translate.float
-    #print("Feed-in AC Reactive Power="+str(Translate.float))
+    return readPoint("mtr_ACReacPowerTotal_VAr")
     
 """
 @brief:        Instantanious Average AC Power Factor at Feed-in Point [Percentage]
@@ -544,12 +1453,7 @@ def mtr_ACReacPowerTotal_VAr():
 @return:       Instantanious AC Power Factor (float32) 
 """
 def mtr_ACPFAverage_cos():
-    regs = mb_meter.read_holding_registers(40122-1, 2)
-    Translate=convert2()
-    Translate.u16.h = regs[1]
-    Translate.u16.l = regs[0]
-    return Translate.float
-    #print("Feed-in AC Power Factor="+str(Translate.float))
+    return readPoint("mtr_ACPFAverage_cos")
     
 """
 @brief:        Instantanious Total Watt-hours Exported [Watt-hours] via Smart Meter
@@ -560,12 +1464,7 @@ def mtr_ACPFAverage_cos():
 @return:       Total Watt-hours Exported (uint32) 
 """
 def mtr_ACTotalWattHoursExp_Wh():
-    regs = mb_meter.read_holding_registers(40130-1, 2)
-    Translate=convert2()
-    Translate.u16.h = regs[1]
-    Translate.u16.l = regs[0]
-    return Translate.uint32
-    #print("Total Watt-hours Exported="+str(Translate.uint32))
+    return readPoint("mtr_ACTotalWattHoursExp_Wh")
 
 """
 @brief:        Instantanious Total Watt-hours Imported [Watt-hours] via Smart Meter
@@ -576,12 +1475,7 @@ def mtr_ACTotalWattHoursExp_Wh():
 @return:       Total Watt-hours Imported (uint32) 
 """
 def mtr_ACTotalWattHoursImp_Wh():
-    regs = mb_meter.read_holding_registers(40138-1, 2)
-    Translate=convert2()
-    Translate.u16.h = regs[1]
-    Translate.u16.l = regs[0]
-    return Translate.uint32
-    #print("Total Watt-hours Imported="+str(Translate.uint32))
+    return readPoint("mtr_ACTotalWattHoursImp_Wh")
 
 """
 @brief:        Instantanious Total VA-hours Exported [VA-hours] via Smart Meter
@@ -592,12 +1486,7 @@ def mtr_ACTotalWattHoursImp_Wh():
 @return:       Total VA-hours Exported (uint32) 
 """
 def mtr_ACTotalVAHoursExp_Wh():
-    regs = mb_meter.read_holding_registers(40146-1, 2)
-    Translate=convert2()
-    Translate.u16.h = regs[1]
-    Translate.u16.l = regs[0]
-    return Translate.uint32
-    #print("Total VA-hours Exported="+str(Translate.uint32))
+    return readPoint("mtr_ACTotalVAHoursExp_Wh")
 
 """
 @brief:        Instantanious Total VA-hours Imported [VA-hours] via Smart Meter
@@ -608,12 +1497,7 @@ def mtr_ACTotalVAHoursExp_Wh():
 @return:       Total VA-hours Imported (uint32) 
 """
 def mtr_ACTotalVAHoursImp_Wh():
-    regs = mb_meter.read_holding_registers(40154-1, 2)
-    Translate=convert2()
-    Translate.u16.h = regs[1]
-    Translate.u16.l = regs[0]
-    return Translate.uint32
-    #print("Total VA-hours Imported="+str(Translate.uint32))
+    return readPoint("mtr_ACTotalVAHoursImp_Wh")
 
 
 """